@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import json
+import time
+
+from . import debug
+from .lib.baseapi import attributes
+from .lib.files import token_key, atomic_write
+
+cache_dir = os.path.join(
+    os.environ.get('XDG_CACHE_HOME')
+    or os.path.join(os.path.expanduser('~'), '.cache'), 'pontoon')
+
+# Seconds a cached Droplet is trusted without asking the API again.
+default_ttl = 300
+
+# Images change far less often than Droplets.
+default_image_ttl = 3600
+
+slug_pattern = re.compile(r'^[a-z0-9]+(-[a-z0-9]+)+$')
+
+
+# File name prefixes of the caches kept in cache_dir.
+cache_kinds = ('droplets', 'images', 'responses', 'inventory')
+
+
+def cache_files(directory=None):
+    """Paths of the cache files in directory, by kind"""
+    directory = directory or cache_dir
+    files = dict((kind, []) for kind in cache_kinds)
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return files
+    for name in names:
+        kind = name.split('-', 1)[0]
+        if kind in files and name.endswith(('.json', '.sqlite')):
+            files[kind].append(os.path.join(directory, name))
+    return files
+
+
+def clear(directory=None):
+    """Remove every cache file (but not rate limit budgets)"""
+    removed = 0
+    for paths in cache_files(directory).values():
+        for path in paths:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def inventory_path(token, directory=None):
+    """Database of the local inventory of a token"""
+    return os.path.join(directory or cache_dir,
+                        'inventory-%s.sqlite' % token_key(token))
+
+
+class FileCache(object):
+    """
+    JSON file of cached API data for a single token.
+
+    Subclasses name the file with `kind`, and keep their content under
+    that key.
+    """
+
+    kind = None
+    default_ttl = default_ttl
+
+    def __init__(self, token, ttl=None, directory=None, enabled=True):
+        self.ttl = self.default_ttl if ttl is None else int(ttl)
+        self.enabled = enabled and self.ttl > 0
+        self.path = os.path.join(directory or cache_dir, '%s-%s.json' % (
+                                 self.kind, token_key(token)))
+        self._entries = None
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _read(self):
+        if not self.enabled:
+            return {}
+        try:
+            with open(self.path) as f:
+                return self._load(json.load(f))
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _load(self, data):
+        """The entries of the file's content"""
+        return data[self.kind]
+
+    def _dump(self):
+        """The file's content"""
+        return {self.kind: self._entries}
+
+    def _write(self):
+        if not self.enabled:
+            return
+        try:
+            atomic_write(self.path, json.dumps(self._dump()))
+        except (IOError, OSError):
+            pass
+
+
+class DropletCache(FileCache):
+    """
+    On-disk inventory of Droplets for a single token.
+
+    Entries are stored by id with an index from name to ids, so a name can
+    be resolved without listing every Droplet on the account.
+    """
+
+    kind = 'droplets'
+
+    def __init__(self, *args, **kwargs):
+        super(DropletCache, self).__init__(*args, **kwargs)
+        self._names = None
+
+    @property
+    def names(self):
+        """Droplet name -> ids of the cached Droplets with that name"""
+        entries = self.entries
+        if self._names is None:
+            self._names = {}
+            for droplet_id, entry in entries.items():
+                self._names.setdefault(entry['name'], []).append(droplet_id)
+        return self._names
+
+    def _load(self, data):
+        entries = data[self.kind]
+        names = data.get('names')
+        # files written before the index existed have it rebuilt
+        self._names = names if isinstance(names, dict) else None
+        return entries
+
+    def _dump(self):
+        return {self.kind: self._entries, 'names': self.names}
+
+    def lookup(self, name):
+        """Return the cached entries for a Droplet name"""
+        entries = self.entries
+        return [entries[i] for i in self.names.get(name, ())
+                if i in entries]
+
+    def fresh(self, entry):
+        """Whether an entry is recent enough to be used without the API"""
+        return time.time() - entry['cached_at'] < self.ttl
+
+    def droplet(self, entry, **kwargs):
+        """Build a Droplet from a cached entry"""
+        from .lib import Droplet
+        attrs = dict(entry['attrs'])
+        attrs.update(kwargs)
+        return Droplet(**attrs)
+
+    @debug
+    def replace(self, droplets):
+        """Replace the whole inventory with a complete Droplet listing"""
+        now = time.time()
+        entries = [self._entry(d, now) for d in droplets]
+        self._entries = dict((str(e['attrs']['id']), e) for e in entries)
+        self._names = None
+        self._write()
+
+    @debug
+    def put(self, droplet):
+        """Store or refresh a single Droplet"""
+        droplet_id = str(droplet.id)
+        entry = self._entry(droplet, time.time())
+        names = self.names
+        self._unindex(droplet_id)
+        self.entries[droplet_id] = entry
+        names.setdefault(entry['name'], []).append(droplet_id)
+        self._write()
+
+    @debug
+    def remove(self, droplet_id):
+        """Forget a Droplet, e.g. after it has been destroyed"""
+        droplet_id = str(droplet_id)
+        if droplet_id in self.entries:
+            self._unindex(droplet_id)
+            del self.entries[droplet_id]
+            self._write()
+
+    def _unindex(self, droplet_id):
+        entry = self.entries.get(droplet_id)
+        if entry is None:
+            return
+        ids = self.names.get(entry['name'], [])
+        if droplet_id in ids:
+            ids.remove(droplet_id)
+        if not ids:
+            self.names.pop(entry['name'], None)
+
+    def _entry(self, droplet, now):
+        attrs = attributes(droplet)
+        return {'name': attrs['name'], 'cached_at': now, 'attrs': attrs}
+
+
+class ImageCatalogue(FileCache):
+    """
+    On-disk catalogue of the images available to a token.
+
+    Public images (distributions and applications) and private ones
+    (snapshots and backups) are kept in separate sections that expire
+    separately: the first rarely change, the second change with every
+    snapshot. Images are indexed by name, slug and distribution, so
+    finding one doesn't mean downloading and scanning the whole list.
+    """
+
+    kind = 'images'
+    default_ttl = default_image_ttl
+    sections = ('public', 'private')
+
+    def __init__(self, *args, **kwargs):
+        super(ImageCatalogue, self).__init__(*args, **kwargs)
+        self._index = None
+
+    @property
+    def index(self):
+        """(field, value) -> attributes of the matching images"""
+        if self._index is None:
+            self._index = {}
+            for section in self.entries.values():
+                for attrs in section['images']:
+                    for field in ('name', 'slug', 'distribution'):
+                        if attrs.get(field):
+                            self._index.setdefault(
+                                (field, attrs[field]), []).append(attrs)
+        return self._index
+
+    def fresh(self, section):
+        """Whether a section is recent enough to be used without the API"""
+        entry = self.entries.get(section)
+        return entry is not None and \
+            time.time() - entry['fetched_at'] < self.ttl
+
+    def find(self, name, sections=sections):
+        """Attributes of the cached images with this name or slug"""
+        found = self.index.get(('name', name), []) or \
+            self.index.get(('slug', name), [])
+        return [a for a in found
+                if ('public' if a.get('public') else 'private') in sections]
+
+    def distributions(self, sections=sections):
+        """Distributions of the cached images, in order of appearance"""
+        seen = []
+        for section in sections:
+            for attrs in self.entries.get(section, {}).get('images', []):
+                if attrs.get('distribution') not in seen:
+                    seen.append(attrs.get('distribution'))
+        return seen
+
+    def image(self, attrs, **kwargs):
+        """Build an Image from cached attributes"""
+        from .lib import Image
+        attrs = dict(attrs)
+        attrs.update(kwargs)
+        return Image(**attrs)
+
+    def lookup(self, manager, name, sections=sections):
+        """
+        Return the Images named (or with the slug) `name`.
+
+        A slug is looked up on its own (images/<slug>) rather than by
+        fetching the public images. Otherwise stale sections are fetched
+        first, and if the name still can't be found every section is
+        fetched again, in case it was just created.
+        """
+        from .lib import DataReadError
+        stale = [s for s in sections if not self.fresh(s)]
+        if 'public' in stale and slug_pattern.match(name):
+            try:
+                return [manager.get_image(name)]
+            except DataReadError:  # not a slug after all
+                pass
+
+        for section in stale:
+            self.refresh(manager, section)
+        found = self.find(name, sections)
+        if not found and len(stale) < len(sections):
+            for section in sections:
+                if section not in stale:
+                    self.refresh(manager, section)
+            found = self.find(name, sections)
+        return [self.image(attrs, token=manager.token, mocked=manager.mocked,
+                           transport=manager.transport) for attrs in found]
+
+    def refresh(self, manager, section):
+        """Fetch a section from the API"""
+        if section == 'public':
+            images = manager.get_global_images()
+        else:
+            images = manager.get_my_images()
+        self.replace(section, images)
+
+    @debug
+    def replace(self, section, images):
+        """Replace a section with a complete listing of its images"""
+        self.entries[section] = {'fetched_at': time.time(),
+                                 'images': [attributes(i) for i in images]}
+        self._index = None
+        self._write()
+
+    @debug
+    def invalidate(self, section='private'):
+        """Forget a section, e.g. after taking or destroying a snapshot"""
+        if self.entries.pop(section, None) is not None:
+            self._index = None
+            self._write()
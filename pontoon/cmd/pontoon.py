@@ -3,11 +3,17 @@
 """Pontoon. A Python CLI for Digital Ocean.
 
 Usage:
-    pontoon <command> [<args>...]
+    pontoon [options] <command> [<args>...]
     [--version]
     [--help]
 
+Options:
+    --stats              Summarise the API requests made on stderr.
+    --prometheus=<file>  Write that summary to a Prometheus textfile.
+    --events=<file>      Append every API request to a JSON lines file.
+
 The top level pontoon commands are:
+    cache       Inspect or clear cached API data
     configure   Interactive configuration for pontoon
     droplet     Interact with Droplets
     event       Events on or around Droplets
@@ -21,30 +27,82 @@ See 'pontoon help <command>' for more information on a specific command.
 
 """
 
+import sys
+from importlib import import_module
 from subprocess import call
 from docopt import docopt
 from ..meta import __version__
 from .. import ui
 
+commands = ['cache', 'configure', 'droplet', 'event', 'image',
+            'region', 'size', 'snapshot', 'sshkey']
+
+
+def dispatch(command, argv):
+    """Run a command in this process when it's one of ours.
+
+    Anything else is looked up as a `pontoon-<command>` executable.
+    """
+    if command in commands:
+        module = import_module('.pontoon_%s' % command, __package__)
+        return module.main(argv)
+    try:
+        return call(['pontoon-%s' % command] + argv)
+    except OSError:
+        ui.message("No command '%s'" % command)
+        return 1
+
+
+def instrument(args):
+    """Attach the stats and events hooks asked for, return them"""
+    hooks = []
+    if args['--stats'] or args['--prometheus'] or args['--events']:
+        from ..lib.events import default_events, Stats, JSONLines
+        if args['--stats'] or args['--prometheus']:
+            hooks.append(Stats().attach(default_events))
+        if args['--events']:
+            hooks.append(JSONLines(args['--events']).attach(default_events))
+    return hooks
 
-def main():
+
+def report(args, hooks):
+    """Detach the hooks, print and export the stats"""
+    for hook in hooks:
+        hook.detach()
+        if not hasattr(hook, 'table'):
+            continue
+        if args['--stats']:
+            sys.stderr.write(hook.table() + '\n')
+        if args['--prometheus']:
+            hook.write_prometheus(args['--prometheus'])
+
+
+def main(argv=None):
     args = docopt(__doc__,
+                  argv=argv,
                   version=__version__,
                   options_first=True)
 
+    hooks = instrument(args)
+    try:
+        return run(args)
+    finally:
+        report(args, hooks)
+
+
+def run(args):
     argv = [args['<command>']] + args['<args>']
     try:
         if args['<command>'] in ['help', None]:
             if not args['<args>']:
-                return call(['pontoon', '--help'])
-            return call(['pontoon-%s' % args['<args>'][0], '--help'])
+                ui.message(__doc__.strip('\n'))
+                return 0
+            command = args['<args>'][0]
+            return dispatch(command, [command, '--help'])
         else:
-            return call(['pontoon-%s' % args['<command>']] + argv)
+            return dispatch(args['<command>'], argv)
     except (KeyboardInterrupt, EOFError):
         return 0
-    except OSError:
-        ui.message("No command '%s'" % args['<command>'])
-    return 1
 
 
 if __name__ == '__main__':
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+"""Usage:
+          pontoon cache stats
+          pontoon cache clear
+
+Options:
+    -h --help       Show this page.
+
+Sizes, regions, public images and kernels are kept for `catalogue_ttl`
+seconds, then revalidated with Digital Ocean. Droplet names and the image
+catalogue are kept for `cache_ttl` and `image_cache_ttl` seconds.
+"""
+
+import os
+from docopt import docopt
+from .. import configure, ui
+from .. import cache
+from ..command import Command
+from ..lib.httpcache import default_responses
+
+
+def size(nbytes):
+    return "%.1f kB" % (nbytes / 1024.0)
+
+
+class CacheCommand(Command):
+
+    def __init__(self, config, args):
+        self.config = config
+        self.args = args
+
+    def stats(self):
+        ui.message("Cache directory: %s" % cache.cache_dir)
+        endpoints = default_responses.stats()
+        if endpoints:
+            ui.message("   %-10s %8s %10s %6s %12s %8s %6s" % (
+                       "endpoint", "entries", "size", "hits", "revalidated",
+                       "fetched", "stale"))
+            ui.line(length=70)
+            for name, s in sorted(endpoints.items()):
+                ui.message(" - %-10s %8d %10s %6d %12d %8d %6d" % (
+                           name, s['entries'], size(s['bytes']), s['hits'],
+                           s['revalidated'], s['fetched'], s['stale']))
+        else:
+            ui.message("No cached responses.")
+
+        for kind, paths in sorted(cache.cache_files().items()):
+            if kind == 'responses' or not paths:
+                continue
+            ui.message(" - %-10s %d file(s), %s" % (
+                       kind, len(paths),
+                       size(sum(os.path.getsize(p) for p in paths))))
+        return 0
+
+    def clear(self):
+        removed = cache.clear()
+        ui.message("Removed %d cache file(s)." % removed)
+        return 0
+
+
+def main(argv=None):
+    try:
+        configure.logger()
+
+        config = configure.combined()
+
+        args = docopt(str(__doc__), argv=argv)
+        configure.response_cache(config)
+
+        return CacheCommand(config, args).run()
+
+    except Exception as e:
+        ui.message(str(e))
+        return 1
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -131,19 +131,22 @@ class ConfigureCommand(Command):
         return 0
 
 
-def main():
+def main(argv=None):
     try:
         configure.logger()
 
         config = configure.combined()
+        configure.ratelimit(config)
 
-        args = docopt(str(__doc__))
+        args = docopt(str(__doc__), argv=argv)
+        configure.response_cache(config)
 
-        exit(ConfigureCommand(config, args).run("interactive"))
+        return ConfigureCommand(config, args).run("interactive")
 
     except Exception as e:
         ui.message(str(e))
-        exit(1)
+        return 1
+
 
 if __name__ == '__main__':
-    main()
+    exit(main())
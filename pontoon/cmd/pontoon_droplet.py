@@ -1,8 +1,9 @@
 #!/usr/bin/env python
 
 """Usage:
-          pontoon droplet list [--detail]
-          pontoon droplet create <name> [--size=<size>] [--image=<image slug>]
+          pontoon droplet list [--detail] [--tag=<tag>]
+          pontoon droplet create <names>... [--size=<size>]
+                                        [--image=<image slug>]
                                         [--region=<region>] [--keys=<key>...]
                                         [--user-data=<userdata>]
                                         [--private-networking]
@@ -16,19 +17,21 @@
           pontoon droplet show <name> [--field=<field>]
           pontoon droplet status <name>
           pontoon droplet destroy <name>
-          pontoon droplet start <name> [--no-wait]
-          pontoon droplet shutdown <name> [--no-wait]
-          pontoon droplet reboot <name> [--no-wait]
+          pontoon droplet start (<name> | --tag=<tag>) [--no-wait]
+          pontoon droplet shutdown (<name> | --tag=<tag>) [--no-wait]
+          pontoon droplet reboot (<name> | --tag=<tag>) [--no-wait]
           pontoon droplet restore <name> <snapshot-name> [--no-wait]
           pontoon droplet rebuild <name> <image-name> [--no-wait]
-          pontoon droplet powercycle <name> [--yes] [--no-wait]
-          pontoon droplet poweroff <name> [--yes] [--no-wait]
+          pontoon droplet powercycle (<name> | --tag=<tag>) [--yes]
+                                     [--no-wait]
+          pontoon droplet poweroff (<name> | --tag=<tag>) [--yes] [--no-wait]
           pontoon droplet passwordreset <name> [--yes]
           pontoon droplet backups <name> [ --enable | --disable ]
 
 Options:
     -h --help              Show this page.
     --detail               Show full Droplet info.
+    --tag=<tag>            Only the Droplets with this tag.
     --field=<field>        Retrieve specified field from Droplet output.
                            Access with dot notation:
                               e.g., --field=networks.v4.0.ip_address
@@ -54,6 +57,9 @@ Quick guide:
         pontoon droplet list            A list of your droplets
         pontoon droplet create foo      Create a droplet called "foo"
                                         with default settings.
+        pontoon droplet create 'web-{{01..40}}'
+                                        Create web-01 to web-40, ten
+                                        per request.
         pontoon droplet ssh foo         SSH into a droplet with the
                                         configured account and SSH key.
         pontoon droplet destroy foo     Terminate a droplet and secure
@@ -64,11 +70,50 @@ import re
 from subprocess import call
 from functools import reduce
 from docopt import docopt
-from ..lib import Manager, Droplet, SSHKey
+from ..lib import Manager, Droplet, SSHKey, DataReadError, ActionWaiter
 from .. import configure, ui
+from ..cache import DropletCache, ImageCatalogue
 from ..command import Command
 from .. import MOCK
 
+brace = re.compile(r'\{([^{}]*)\}')
+brace_range = re.compile(r'^(-?\d+)\.\.(-?\d+)$')
+
+
+def expand_names(patterns):
+    """Expand shell style braces in Droplet names.
+
+    Handles ranges, zero padded or not (web-{01..40}), and lists
+    ({app,db}-1), so names can be given even where the shell doesn't
+    expand them, or when quoted.
+    """
+    names = []
+    for pattern in patterns:
+        match = brace.search(pattern)
+        if match is None:
+            names.append(pattern)
+            continue
+        body = match.group(1)
+        bounds = brace_range.match(body)
+        if bounds:
+            first, last = bounds.groups()
+            width = 0
+            if first.lstrip('-').startswith('0') or \
+                    last.lstrip('-').startswith('0'):
+                width = max(len(first), len(last))
+            step = 1 if int(last) >= int(first) else -1
+            choices = ['%0*d' % (width, n) for n in
+                       range(int(first), int(last) + step, step)]
+        elif ',' in body:
+            choices = body.split(',')
+        else:
+            names.append(pattern)
+            continue
+        names.extend(expand_names(
+            [pattern[:match.start()] + choice + pattern[match.end():]
+             for choice in choices]))
+    return names
+
 
 class DropletCommand(Command):
 
@@ -76,10 +121,30 @@ class DropletCommand(Command):
         self.config = config
         self.args = args
         self.manager = Manager(token=config['api_token'], mocked=MOCK)
-
-    def _get_droplet(self, name):
-        droplets = self.manager.get_all_droplets()
-        droplet = [droplet for droplet in droplets if droplet.name == name]
+        self.cache = DropletCache(config['api_token'],
+                                  ttl=config.get('cache_ttl'),
+                                  enabled=not MOCK)
+        self.images = ImageCatalogue(config['api_token'],
+                                     ttl=config.get('image_cache_ttl'),
+                                     enabled=not MOCK)
+        self.inventory = configure.inventory(config, self.manager)
+
+    def _get_droplet(self, name, live=False):
+        """Find a Droplet by name.
+
+        With the inventory enabled, names are looked up in it once it is
+        synced with the latest actions. Otherwise they are resolved through
+        the local Droplet cache. Either way `live` asks for up to date
+        details, fetched for that Droplet only.
+        """
+        if self.inventory is not None:
+            self.inventory.sync(kinds=('droplets',))
+            droplet = self.inventory.droplets(name=name)
+            if live and len(droplet) == 1:
+                droplet = [self.manager.get_droplet(droplet[0].id)]
+                self.inventory.put(droplet[0])
+        else:
+            droplet = self._cached_droplets(name, live)
 
         if len(droplet) > 1:
             ui.warning("Warning: multiple Droplets with identical "
@@ -92,9 +157,49 @@ class DropletCommand(Command):
 
         return droplet[0]
 
-    def _get_image(self, name):
-        resources = self.manager.get_images()
-        resource = [res for res in resources if res.name == name]
+    def _cached_droplets(self, name, live=False):
+        """The Droplets named `name`, through the local Droplet cache.
+
+        A fresh entry is used as is, unless `live` asks for up to date
+        details, in which case only that Droplet is fetched. Stale entries
+        are revalidated the same way, and unknown names refresh the whole
+        cache.
+        """
+        cached = self.cache.lookup(name)
+        if len(cached) == 1:
+            entry = cached[0]
+            if not live and self.cache.fresh(entry):
+                return [self.cache.droplet(
+                    entry, token=self.config['api_token'], mocked=MOCK)]
+            try:
+                droplet = self.manager.get_droplet(entry['attrs']['id'])
+            except DataReadError:
+                droplet = None
+            if droplet is not None and droplet.name == name:
+                self.cache.put(droplet)
+                return [droplet]
+
+        droplets = self.manager.get_all_droplets()
+        self.cache.replace(droplets)
+        return [droplet for droplet in droplets if droplet.name == name]
+
+    def _all_droplets(self, tag=None):
+        """Every Droplet (with a tag), from the inventory when enabled.
+
+        Droplets are returned as dicts with their addresses: listings only
+        print them, so no Droplet objects are built.
+        """
+        if self.inventory is not None:
+            self.inventory.sync(kinds=('droplets',))
+            return self.inventory.droplets(tag=tag, raw=True)
+        droplets = [dict(d, **Droplet.addresses(d['networks'])) for d in
+                    self.manager.get_all_droplets(tag_name=tag, raw=True)]
+        if not tag:
+            self.cache.replace(droplets)
+        return droplets
+
+    def _get_image(self, name, sections=ImageCatalogue.sections):
+        resource = self.images.lookup(self.manager, name, sections)
 
         if len(resource) > 1:
             ui.warning("Warning: multiple images with identical "
@@ -108,19 +213,49 @@ class DropletCommand(Command):
         return resource[0]
 
     def _wait(self, event, droplet, status="completed"):
+        """Wait for an action unless --no-wait, 1 if it didn't complete"""
         if not self.args['--no-wait']:
-            state = 'in-progress'
-            while state != 'completed':
-                actions = droplet.get_actions()
-                for action in actions:
-                    if action.id == event['action']['id']:
-                        state = action.status
-                ui.ticker()
+            return self._wait_for([event['action']['id']], status)
+
+    def _wait_for(self, action_ids, status="completed"):
+        """Wait for actions, 1 if any of them errored or timed out"""
+        # Poll only the actions we started, not the Droplets' history.
+        waiter = ActionWaiter(action_ids, token=self.config['api_token'],
+                              mocked=MOCK, sleep=ui.ticker)
+        result = waiter.wait()
+        if result.ok:
             ui.message(status)
+            return 0
+        if result.errored:
+            ui.message(result.errored[0].status)
+        else:
+            ui.message("timed out")
+        return 1
+
+    def _target(self):
+        """What the command acts on, for messages"""
+        if self.args['--tag']:
+            return "Droplets tagged '%s'" % self.args['--tag']
+        return self.args['<name>']
+
+    def _perform(self, method, type, status):
+        """Run an action on <name>, or on every Droplet with --tag."""
+        if not self.args['--tag']:
+            droplet = self._get_droplet(self.args['<name>'])
+            event = getattr(droplet, method)()
+            return self._wait(event, droplet, status=status)
+
+        actions = self.manager.perform_action_by_tag(self.args['--tag'],
+                                                     type)
+        if not actions:
+            ui.message("No Droplets tagged '%s'" % self.args['--tag'])
+            return 1
+        if not self.args['--no-wait']:
+            return self._wait_for([a.id for a in actions], status)
 
     def list(self):
-        droplet_list = self.manager.get_all_droplets()
-        if len(set(d.name for d in droplet_list)) != len(droplet_list):
+        droplet_list = self._all_droplets(tag=self.args['--tag'])
+        if len(set(d['name'] for d in droplet_list)) != len(droplet_list):
             ui.warning("Warning: multiple Droplets with identical "
                        "hostnames found. Actions on those Droplets "
                        "will fail until this is resolved in the web UI.")
@@ -128,42 +263,45 @@ class DropletCommand(Command):
         for machine in droplet_list:
 
             if self.args['--detail']:
-                ui.message(machine.name)
+                ui.message(machine['name'])
                 details = ui.format_droplet_info(machine)
                 ui.yaml_message(details)
             else:
                 ui.message("%-15s (%s, %s, %s, %s, %s)" % (
-                    machine.name + ':',
-                    machine.size_slug,
-                    machine.image['slug'],
-                    machine.region['slug'],
-                    machine.ip_address,
-                    machine.status,
+                    machine['name'] + ':',
+                    machine['size_slug'],
+                    machine['image']['slug'],
+                    machine['region']['slug'],
+                    machine.get('ip_address'),
+                    machine['status'],
                 ))
 
     def create(self):
-        ui.message("Creating Droplet %s "
-                   "(%s using %s in %s)..." % (self.args['<name>'],
+        names = expand_names(self.args['<names>'])
+        if len(names) == 1:
+            label = "Droplet %s" % names[0]
+        else:
+            label = "%d Droplets %s to %s" % (len(names), names[0], names[-1])
+        ui.message("Creating %s "
+                   "(%s using %s in %s)..." % (label,
                                                self.args['--size'],
                                                self.args['--image'],
                                                self.args['--region'],
                                                ))
 
-        try:
-            if self._get_droplet(self.args['<name>']):
-                ui.message("Cannot create two Droplets with same name.")
-                return 1
-        except Exception as e:
-            pass
+        droplets = self._all_droplets()
+        if len(set(names)) != len(names) or \
+                set(d['name'] for d in droplets).intersection(names):
+            ui.message("Cannot create two Droplets with same name.")
+            return 1
 
         try:
-            droplet = Droplet(token=self.config['api_token'], mocked=MOCK)
             ssh_keys = [k.id for k in
                         self.manager.get_all_sshkeys() if k.name in
                         self.args['--keys']]
 
-            droplet.create(
-                name=self.args['<name>'],
+            droplets = self.manager.create_droplets(
+                names,
                 size=self.args['--size'],
                 image=self.args['--image'],
                 region=self.args['--region'],
@@ -176,14 +314,8 @@ class DropletCommand(Command):
             return 1
 
         if not self.args['--no-wait']:
-            state = 'in-progress'
-            while state != 'completed':
-                actions = droplet.get_actions()
-                for action in actions:
-                    if action.type == 'create':
-                        state = action.status
-                ui.ticker()
-            ui.message('active')
+            return self._wait_for([d.action_ids[0] for d in droplets],
+                                  status='active')
 
     def ssh(self):
         droplet = self._get_droplet(self.args['<name>'])
@@ -219,43 +351,50 @@ class DropletCommand(Command):
             self.args['<from>'], self.args['<to>']))
         droplet = self._get_droplet(self.args['<from>'])
         droplet.rename(self.args['<to>'])
+        droplet.name = self.args['<to>']
+        self.cache.put(droplet)
 
     def resize(self):
         ui.message("Resizing %s to %s" % (
             self.args['<name>'], self.args['<size>']))
         try:
-            droplet = self._get_droplet(self.args['<name>'])
+            droplet = self._get_droplet(self.args['<name>'], live=True)
 
             # Check whether Droplet is powered off
             if droplet.status != 'off':
                 if self.args['--yes']:
                     ui.message("Shutting down Droplet...")
                     event = droplet.shutdown()
-                    self._wait(event, droplet, status="off")
+                    if self._wait(event, droplet, status="off"):
+                        return 1
                 else:
                     if ui.ask_yesno("Droplet must be shut down during "
                                     "this process, proceed?"):
                         ui.message("Shutting down Droplet...")
                         event = droplet.shutdown()
-                        self._wait(event, droplet, status="off")
+                        if self._wait(event, droplet, status="off"):
+                            return 1
                     else:
                         return
 
             # Perform the resize
             ui.message("Resizing...")
             event = droplet.resize(self.args['<size>'])
-            self._wait(event, droplet, status="resized")
+            if self._wait(event, droplet, status="resized"):
+                return 1
 
             # Boot the Droplet on completion
             if self.args['--yes']:
                 ui.message("Booting...")
                 event = droplet.power_on()
-                self._wait(event, droplet)
+                if self._wait(event, droplet):
+                    return 1
             else:
                 if ui.ask_yesno("Boot Droplet?"):
                     ui.message("Booting...")
                     event = droplet.power_on()
-                    self._wait(event, droplet)
+                    if self._wait(event, droplet):
+                        return 1
 
         except Exception as e:
             ui.message("Failed to resize: %s" % str(e))
@@ -265,44 +404,51 @@ class DropletCommand(Command):
         ui.message("Snapshotting %s as %s..." % (
                    self.args['<droplet-name>'], self.args['<snapshot-name>']))
         try:
-            droplet = self._get_droplet(self.args['<droplet-name>'])
+            droplet = self._get_droplet(self.args['<droplet-name>'],
+                                        live=True)
 
             # Check whether Droplet is powered off
             if droplet.status != 'off':
                 if self.args['--yes']:
                     ui.message("Shutting down Droplet...")
                     event = droplet.shutdown()
-                    self._wait(event, droplet, status="shutdown")
+                    if self._wait(event, droplet, status="shutdown"):
+                        return 1
                 else:
                     if ui.ask_yesno("Droplet must be shut down"
                                     " during this process, proceed?"):
                         ui.message("Shutting down Droplet...")
                         event = droplet.shutdown()
-                        self._wait(event, droplet, status="shutdown")
+                        if self._wait(event, droplet, status="shutdown"):
+                            return 1
                     else:
                         return
 
             ui.message("Beginning snapshot...")
             event = droplet.take_snapshot(self.args['<snapshot-name>'])
-            self._wait(event, droplet)
+            self.images.invalidate('private')
+            if self._wait(event, droplet):
+                return 1
 
             # Boot the Droplet on completion
             if self.args['--yes']:
                 ui.message("Booting...")
                 event = droplet.power_on()
-                self._wait(event, droplet)
+                if self._wait(event, droplet):
+                    return 1
             else:
                 if ui.ask_yesno("Boot Droplet?"):
                     ui.message("Booting...")
                     event = droplet.power_on()
-                    self._wait(event, droplet)
+                    if self._wait(event, droplet):
+                        return 1
 
         except Exception as e:
             ui.message("Failed to snapshot: %s" % str(e))
             return 1
 
     def show(self):
-        droplet = self._get_droplet(self.args['<name>'])
+        droplet = self._get_droplet(self.args['<name>'], live=True)
         details = ui.format_droplet_info(droplet)
 
         # Uses a dot notation (foo.bar.baz) to access droplet details
@@ -330,39 +476,35 @@ class DropletCommand(Command):
             ui.yaml_message(details)
 
     def status(self):
-        droplet = self._get_droplet(self.args['<name>'])
+        droplet = self._get_droplet(self.args['<name>'], live=True)
         ui.message(droplet.status)
 
     def destroy(self):
         ui.message("Destroying %s and scrubbing data..." % self.args['<name>'])
         droplet = self._get_droplet(self.args['<name>'])
         droplet.destroy()
+        self.cache.remove(droplet.id)
 
     def start(self):
-        ui.message("Starting %s..." % self.args['<name>'])
-        droplet = self._get_droplet(self.args['<name>'])
-        event = droplet.power_on()
-        self._wait(event, droplet, status="active")
+        ui.message("Starting %s..." % self._target())
+        return self._perform('power_on', 'power_on', status="active")
 
     def shutdown(self):
-        ui.message("Shutting down %s" % self.args['<name>'])
-        droplet = self._get_droplet(self.args['<name>'])
-        event = droplet.shutdown()
-        self._wait(event, droplet, status="shutdown")
+        ui.message("Shutting down %s" % self._target())
+        return self._perform('shutdown', 'shutdown', status="shutdown")
 
     def reboot(self):
-        ui.message("Rebooting %s" % self.args['<name>'])
-        droplet = self._get_droplet(self.args['<name>'])
-        event = droplet.reboot()
-        self._wait(event, droplet, status="rebooted")
+        ui.message("Rebooting %s" % self._target())
+        return self._perform('reboot', 'reboot', status="rebooted")
 
     def restore(self):
         ui.message("Restoring %s from snapshot %s..." % (
                    self.args['<name>'], self.args['<snapshot-name>']))
         droplet = self._get_droplet(self.args['<name>'])
-        image = self._get_image(self.args['<snapshot-name>'])
+        image = self._get_image(self.args['<snapshot-name>'],
+                                sections=('private',))
         event = droplet.restore(image.id)
-        self._wait(event, droplet, status="restored")
+        return self._wait(event, droplet, status="restored")
 
     def rebuild(self):
         ui.message("Rebuilding %s using %s..." % (
@@ -370,14 +512,13 @@ class DropletCommand(Command):
         droplet = self._get_droplet(self.args['<name>'])
         image = self._get_image(self.args['<image-name>'])
         event = droplet.rebuild(image.id)
-        self._wait(event, droplet, status="rebuilt")
+        return self._wait(event, droplet, status="rebuilt")
 
     def powercycle(self):
-        droplet = self._get_droplet(self.args['<name>'])
         if self.args['--yes']:
-            ui.message('Powercycling %s...' % self.args['<name>'])
-            event = droplet.power_cycle()
-            self._wait(event, droplet, status="powercycled")
+            ui.message('Powercycling %s...' % self._target())
+            return self._perform('power_cycle', 'power_cycle',
+                                 status="powercycled")
         else:
             ui.notify("Powercycling a server could cause processes not to "
                       "shut down correctly, and potentially data loss or "
@@ -385,25 +526,23 @@ class DropletCommand(Command):
                       "The 'reboot' command is the recommended way to restart "
                       "a machine.")
             if ui.ask_yesno("Do you wish to continue?"):
-                ui.message('Powercycling %s...' % self.args['<name>'])
-                event = droplet.power_cycle()
-                self._wait(event, droplet, status="powercycled")
+                ui.message('Powercycling %s...' % self._target())
+                return self._perform('power_cycle', 'power_cycle',
+                                     status="powercycled")
 
     def poweroff(self):
-        droplet = self._get_droplet(self.args['<name>'])
         if self.args['--yes']:
-            ui.message('Powering off %s...' % self.args['<name>'])
-            event = droplet.power_off()
-            self._wait(event, droplet, status="poweroff")
+            ui.message('Powering off %s...' % self._target())
+            return self._perform('power_off', 'power_off', status="poweroff")
         else:
             ui.notify("Powering off a server could cause processes not to "
                       "shut down correctly, and potentially data loss or "
                       "corruption. The 'shutdown' command is the recommended "
                       "way to turn off a machine.")
             if ui.ask_yesno("Do you wish to continue?"):
-                ui.message('Powering off %s...' % self.args['<name>'])
-                event = droplet.power_off()
-                self._wait(event, droplet, status="poweroff")
+                ui.message('Powering off %s...' % self._target())
+                return self._perform('power_off', 'power_off',
+                                     status="poweroff")
 
     def passwordreset(self):
         droplet = self._get_droplet(self.args['<name>'])
@@ -411,7 +550,8 @@ class DropletCommand(Command):
             ui.message('Resetting root password for %s...' % (
                 self.args['<name>']))
             event = droplet.reset_root_password()
-            self._wait(event, droplet, status="reset")
+            if self._wait(event, droplet, status="reset"):
+                return 1
             ui.message('You should receive an email shortly.')
         else:
             ui.notify("Resetting the root password requires a reboot.")
@@ -419,7 +559,8 @@ class DropletCommand(Command):
                 ui.message('Resetting root password for %s...' % (
                     self.args['<name>']))
                 event = droplet.reset_root_password()
-                self._wait(event, droplet, status="reset")
+                if self._wait(event, droplet, status="reset"):
+                    return 1
                 ui.message('You should receive an email shortly.')
 
     def backups(self):
@@ -438,26 +579,29 @@ class DropletCommand(Command):
         ui.message("%s backups for %s..." % (action, self.args['<name>']))
         droplet = self._get_droplet(self.args['<name>'])
         event = droplet.disable_backups()
-        self._wait(event, droplet, status="disabled")
+        return self._wait(event, droplet, status="disabled")
 
 
-def main():
+def main(argv=None):
     try:
         configure.logger()
 
         config = configure.combined()
+        configure.ratelimit(config)
 
         args = docopt(str(__doc__.format(
             size=config.get('size', None),
             image=config.get('image', None),
             region=config.get('region', None),
-            keys=config.get('auth_key_name', None))))
+            keys=config.get('auth_key_name', None))), argv=argv)
+        configure.response_cache(config)
 
-        exit(DropletCommand(config, args).run())
+        return DropletCommand(config, args).run()
 
     except Exception as e:
         ui.message(str(e))
-        exit(1)
+        return 1
+
 
 if __name__ == '__main__':
-    main()
+    exit(main())
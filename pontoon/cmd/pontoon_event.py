@@ -30,19 +30,21 @@ class EventCommand(Command):
         return 0
 
 
-def main():
+def main(argv=None):
     try:
         configure.logger()
 
         config = configure.combined()
+        configure.ratelimit(config)
 
-        args = docopt(str(__doc__))
+        args = docopt(str(__doc__), argv=argv)
 
-        exit(EventCommand(config, args).run())
+        return EventCommand(config, args).run()
 
     except Exception as e:
         ui.message(str(e))
-        exit(1)
+        return 1
+
 
 if __name__ == '__main__':
-    main()
+    exit(main())
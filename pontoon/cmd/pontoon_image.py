@@ -1,19 +1,21 @@
 #!/usr/bin/env python
 
 """Usage:
-          pontoon image list [--with-ids]
-          pontoon image oses
+          pontoon image list [--with-ids] [--refresh]
+          pontoon image oses [--refresh]
           pontoon image show <name>
 
 Options:
     --with-ids      Include ids in output. Useful for other software that uses
                     Digital Ocean ids for input (like Packer).
+    --refresh       Check with Digital Ocean instead of using cached images.
     -h --help       Show this page.
 """
 
 from docopt import docopt
 from ..lib import Manager, Image
 from .. import configure, ui
+from ..cache import ImageCatalogue
 from ..command import Command
 from .. import MOCK
 
@@ -24,10 +26,12 @@ class ImageCommand(Command):
         self.config = config
         self.args = args
         self.manager = Manager(token=config['api_token'], mocked=MOCK)
+        self.images = ImageCatalogue(config['api_token'],
+                                     ttl=config.get('image_cache_ttl'),
+                                     enabled=not MOCK)
 
     def _get_image(self, name):
-        resources = self.manager.get_all_images()
-        resource = [res for res in resources if res.name == name]
+        resource = self.images.lookup(self.manager, name)
 
         if len(resource) > 1:
             ui.warning("Warning: multiple images with identical "
@@ -40,8 +44,16 @@ class ImageCommand(Command):
 
         return resource[0]
 
+    def _fetch(self):
+        """Fetch every image at once, refreshing both catalogue sections"""
+        available = self.manager.get_all_images(raw=True)
+        self.images.replace('public', [i for i in available if i['public']])
+        self.images.replace('private',
+                            [i for i in available if not i['public']])
+        return available
+
     def list(self):
-        available = self.manager.get_all_images()
+        available = self._fetch()
         ui.message("Available images:")
         if self.args['--with-ids']:
             ui.message("   %-10s %-10s %-45s %s" % (
@@ -53,14 +65,16 @@ class ImageCommand(Command):
 
         for s in available:
             if self.args['--with-ids']:
-                name = s.name[:27] + "..." if len(s.name) > 30 else s.name
+                name = s['name']
+                name = name[:27] + "..." if len(name) > 30 else name
                 ui.message(" - %-10s %-10s %-35s %s" % (
-                           str(s.id) + ':', s.distribution, name,
-                           s.slug or ''))
+                           str(s['id']) + ':', s['distribution'], name,
+                           s.get('slug') or ''))
             else:
-                name = s.name[:37] + "..." if len(s.name) > 40 else s.name
+                name = s['name']
+                name = name[:37] + "..." if len(name) > 40 else name
                 ui.message(" - %-10s %-45s %s" % (
-                           s.distribution, name, s.slug or ''))
+                           s['distribution'], name, s.get('slug') or ''))
         return 0
 
     def show(self):
@@ -69,30 +83,31 @@ class ImageCommand(Command):
         ui.yaml_message(details)
 
     def oses(self):
-        available = self.manager.get_all_images()
+        if self.args['--refresh'] or not all(
+                self.images.fresh(s) for s in self.images.sections):
+            self._fetch()
         ui.message("Available Operating Systems:")
-        oses = []
-        for image in available:
-            if image.distribution not in oses:
-                oses.append(image.distribution)
-        for os in oses:
+        for os in self.images.distributions():
             ui.message(" - %s" % os)
         return 0
 
 
-def main():
+def main(argv=None):
     try:
         configure.logger()
 
         config = configure.combined()
+        configure.ratelimit(config)
 
-        args = docopt(str(__doc__))
+        args = docopt(str(__doc__), argv=argv)
+        configure.response_cache(config, refresh=args['--refresh'])
 
-        exit(ImageCommand(config, args).run())
+        return ImageCommand(config, args).run()
 
     except Exception as e:
         ui.message(str(e))
-        exit(1)
+        return 1
+
 
 if __name__ == '__main__':
-    main()
+    exit(main())
@@ -1,9 +1,10 @@
 #!/usr/bin/env python
 
-"""Usage: pontoon region list
+"""Usage: pontoon region list [--refresh]
 
 Options:
     -h --help       Show this page.
+    --refresh       Check with Digital Ocean instead of using cached regions.
 """
 
 from docopt import docopt
@@ -21,29 +22,32 @@ class RegionCommand(Command):
         self.manager = Manager(token=config['api_token'], mocked=MOCK)
 
     def list(self):
-        available = self.manager.get_all_regions()
+        available = self.manager.get_all_regions(raw=True)
         ui.message("Available regions:")
         ui.message("   %-20s %s" % ("name", "slug"))
         ui.line(length=30)
 
         for s in available:
-            ui.message(" - %-20s (%s)" % (s.name, s.slug))
+            ui.message(" - %-20s (%s)" % (s['name'], s['slug']))
         return 0
 
 
-def main():
+def main(argv=None):
     try:
         configure.logger()
 
         config = configure.combined()
+        configure.ratelimit(config)
 
-        args = docopt(str(__doc__))
+        args = docopt(str(__doc__), argv=argv)
+        configure.response_cache(config, refresh=args['--refresh'])
 
-        exit(RegionCommand(config, args).run())
+        return RegionCommand(config, args).run()
 
     except Exception as e:
         ui.message(str(e))
-        exit(1)
+        return 1
+
 
 if __name__ == '__main__':
-    main()
+    exit(main())
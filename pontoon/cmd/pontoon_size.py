@@ -1,9 +1,10 @@
 #!/usr/bin/env python
 
-"""Usage: pontoon size list
+"""Usage: pontoon size list [--refresh]
 
 Options:
     -h --help       Show this page.
+    --refresh       Check with Digital Ocean instead of using cached sizes.
 """
 
 from docopt import docopt
@@ -21,26 +22,29 @@ class SizeCommand(Command):
         self.manager = Manager(token=config['api_token'], mocked=MOCK)
 
     def list(self):
-        available = self.manager.get_all_sizes()
+        available = self.manager.get_all_sizes(raw=True)
         ui.message("Available sizes:")
         for s in available:
-            ui.message(" - %s" % s.slug)
+            ui.message(" - %s" % s['slug'])
         return 0
 
 
-def main():
+def main(argv=None):
     try:
         configure.logger()
 
         config = configure.combined()
+        configure.ratelimit(config)
 
-        args = docopt(str(__doc__))
+        args = docopt(str(__doc__), argv=argv)
+        configure.response_cache(config, refresh=args['--refresh'])
 
-        exit(SizeCommand(config, args).run())
+        return SizeCommand(config, args).run()
 
     except Exception as e:
         ui.message(str(e))
-        exit(1)
+        return 1
+
 
 if __name__ == '__main__':
-    main()
+    exit(main())
@@ -15,6 +15,7 @@ Options:
 from docopt import docopt
 from ..lib import Manager, Image
 from .. import configure, ui
+from ..cache import ImageCatalogue
 from ..command import Command
 from .. import MOCK
 
@@ -25,10 +26,12 @@ class SnapshotCommand(Command):
         self.config = config
         self.args = args
         self.manager = Manager(token=config['api_token'], mocked=MOCK)
+        self.images = ImageCatalogue(config['api_token'],
+                                     ttl=config.get('image_cache_ttl'),
+                                     enabled=not MOCK)
 
     def _get_image(self, name):
-        resources = self.manager.get_my_images()
-        resource = [res for res in resources if res.name == name]
+        resource = self.images.lookup(self.manager, name, ('private',))
 
         if len(resource) > 1:
             ui.warning("Warning: multiple images with identical "
@@ -42,7 +45,8 @@ class SnapshotCommand(Command):
         return resource[0]
 
     def list(self):
-        available = self.manager.get_my_images()
+        available = self.manager.get_my_images(raw=True)
+        self.images.replace('private', available)
         ui.message("Available images:")
         if self.args['--with-ids']:
             ui.message("   %-10s %-10s %s" % ("id", "distro", "name"))
@@ -54,9 +58,9 @@ class SnapshotCommand(Command):
         for s in available:
             if self.args['--with-ids']:
                 ui.message(" - %-10s %-10s %s" % (
-                           str(s.id) + ':', s.distribution, s.name))
+                           str(s['id']) + ':', s['distribution'], s['name']))
             else:
-                ui.message(" - %-10s %s" % (s.distribution, s.name))
+                ui.message(" - %-10s %s" % (s['distribution'], s['name']))
         return 0
 
     def show(self):
@@ -68,6 +72,7 @@ class SnapshotCommand(Command):
         ui.message("Destroying %s..." % self.args['<name>'])
         image = self._get_image(self.args['<name>'])
         image.destroy()
+        self.images.invalidate('private')
 
     def transfer(self):
         ui.message("Transferring %s to %s..." % (
@@ -78,19 +83,21 @@ class SnapshotCommand(Command):
         image.transfer(self.args['<region>'])
 
 
-def main():
+def main(argv=None):
     try:
         configure.logger()
 
         config = configure.combined()
+        configure.ratelimit(config)
 
-        args = docopt(str(__doc__))
+        args = docopt(str(__doc__), argv=argv)
 
-        exit(SnapshotCommand(config, args).run())
+        return SnapshotCommand(config, args).run()
 
     except Exception as e:
         ui.message(str(e))
-        exit(1)
+        return 1
+
 
 if __name__ == '__main__':
-    main()
+    exit(main())
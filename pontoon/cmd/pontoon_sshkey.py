@@ -41,10 +41,10 @@ class SSHKeyCommand(Command):
         return resource[0]
 
     def list(self):
-        keys = self.manager.get_all_sshkeys()
+        keys = self.manager.get_all_sshkeys(raw=True)
         ui.message("Available SSH keys:")
         for s in keys:
-            ui.message(" - %s" % s.name)
+            ui.message(" - %s" % s['name'])
         return 0
 
     def add(self):
@@ -77,19 +77,21 @@ class SSHKeyCommand(Command):
         sshkey.destroy()
 
 
-def main():
+def main(argv=None):
     try:
         configure.logger()
 
         config = configure.combined()
+        configure.ratelimit(config)
 
-        args = docopt(str(__doc__))
+        args = docopt(str(__doc__), argv=argv)
 
-        exit(SSHKeyCommand(config, args).run())
+        return SSHKeyCommand(config, args).run()
 
     except Exception as e:
         ui.message(str(e))
-        exit(1)
+        return 1
+
 
 if __name__ == '__main__':
-    main()
+    exit(main())
@@ -39,18 +39,86 @@ defaults['username'] = {
 }
 
 
+# The handler added by logger(), so calling it again adds no other.
+_handler = []
+
+
 def logger():
-    """Prepare interface to logging."""
+    """Prepare interface to logging.
+
+    PONTOON_TRACE turns on the structured trace (see pontoon.log.trace),
+    to stderr when set to 1, or appended to the file it names. Calling it
+    again changes nothing.
+    """
     logger = logging.getLogger('pontoon')
+    if _handler:
+        return logger
     formatter = logging.Formatter(logformat)
 
     handler = logging.StreamHandler()
     handler.setFormatter(formatter)
+    # Only the trace sees debug messages when DEBUG isn't set.
+    handler.setLevel(logging.DEBUG if debug_mode else logging.WARNING)
     logger.setLevel(logging.DEBUG if debug_mode else False)
     logger.addHandler(handler)
+    _handler.append(handler)
+
+    destination = os.environ.get('PONTOON_TRACE')
+    if destination:
+        from .log import trace
+        trace(path=None if destination in ('1', '-') else destination)
     return logger
 
 
+@debug
+def ratelimit(config):
+    """Share the API rate limit budget with other pontoon processes.
+
+    Enabled by `shared_ratelimit: true` in the config file or the
+    PONTOON_SHARED_RATELIMIT environment variable.
+    """
+    if config.get('shared_ratelimit') or \
+            os.environ.get('PONTOON_SHARED_RATELIMIT'):
+        from .cache import cache_dir
+        from .lib.ratelimit import default_limiters
+        return default_limiters.share(cache_dir)
+    return False
+
+
+@debug
+def response_cache(config, refresh=False):
+    """Keep catalogue responses (sizes, regions, public images, kernels)
+    on disk.
+
+    They're served for `catalogue_ttl` seconds (an hour by default), then
+    revalidated with the API. `refresh` revalidates them straight away,
+    and a ttl of 0 disables the cache.
+    """
+    from .cache import cache_dir
+    from .lib.httpcache import default_responses
+    ttl = int(config.get('catalogue_ttl', 3600))
+    if MOCK or ttl <= 0:
+        default_responses.disable()
+        return False
+    default_responses.enable(cache_dir, ttl=ttl, refresh=bool(refresh))
+    return True
+
+
+def inventory(config, manager):
+    """Local inventory of the account, or None when it isn't enabled.
+
+    Enabled by `inventory: true` in the config file. Kinds of resources
+    are listed again after `inventory_ttl` seconds (an hour by default),
+    in between only the actions since the last sync are fetched.
+    """
+    if MOCK or not config.get('inventory'):
+        return None
+    from .cache import inventory_path
+    from .lib import Inventory
+    return Inventory(manager, inventory_path(config['api_token']),
+                     ttl=int(config.get('inventory_ttl') or 3600))
+
+
 @debug
 def ssh_tools():
     """Checks for existance of SSH tools required for creating keys."""
@@ -0,0 +1,779 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Local stand-in for the Digital Ocean API.
+
+Usage:
+    fakeapi.py [options]
+
+Run as `python -m pontoon.fakeapi`. Serves the v2 endpoints pontoon uses
+from an in-memory account, so that pagination, caching, rate limiting and
+waiting on actions can be measured end to end on one machine. Point
+pontoon at it with:
+
+    Manager(token='fake', end_point='http://127.0.0.1:<port>/v2/')
+
+Options:
+    -h --help               Show this page.
+    --port=<port>           Port to listen on, 0 for any. [default: 8765]
+    --droplets=<n>          Droplets on the account. [default: 100]
+    --latency=<seconds>     Delay added to every response. [default: 0]
+    --jitter=<seconds>      Random extra delay, up to. [default: 0]
+    --action-time=<secs>    Seconds an action stays in-progress.
+                            [default: 1]
+    --rate-limit=<n>        Requests allowed per hour. [default: 5000]
+    --throttle-rate=<p>     Probability of an unprovoked 429. [default: 0]
+    --error-rate=<p>        Probability of a 500. [default: 0]
+    --seed=<n>              Seed for the random failures and delays.
+"""
+
+from __future__ import print_function
+
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+try:
+    from urlparse import urlparse, parse_qsl
+    from urllib import urlencode
+except ImportError:
+    from urllib.parse import urlparse, parse_qsl, urlencode
+
+from .lib.transport import default_fixtures
+
+# What a completed action does to its Droplet.
+action_status = {
+    'power_off': 'off',
+    'shutdown': 'off',
+    'power_on': 'active',
+    'power_cycle': 'active',
+    'reboot': 'active',
+    'create': 'active',
+}
+
+
+def fixture(path, key):
+    return json.loads(default_fixtures.load(path))[key]
+
+
+def timestamp(when):
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(when))
+
+
+class NotFound(Exception):
+    pass
+
+
+class Account(object):
+    """
+        The resources of the fake account, and what requests do to them.
+
+        Actions start in-progress and complete `action_time` seconds later,
+        when their effect (a new status, name, snapshot...) is applied.
+        Every method is called with the lock held.
+
+        Args:
+            droplets: int - Droplets generated on the account
+            action_time: float - seconds before an action completes
+            tags: tuple - tags given in turn to the generated Droplets
+    """
+
+    def __init__(self, droplets=100, action_time=1.0, tags=('web', 'db')):
+        self.action_time = action_time
+        self.lock = threading.RLock()
+        self.next_id = 4000000
+
+        self.regions = fixture('regions/all.json', 'regions')
+        self.sizes = fixture('sizes/all.json', 'sizes')
+        self.kernels = fixture('kernels/list.json', 'kernels')
+        # Public images are listed by the API's type filter, which the
+        # fixtures don't carry: each file holds a single type.
+        self.images = [dict(image, type=type) for path, type in (
+            ('images/distro.json', 'distribution'),
+            ('images/app.json', 'application'),
+            ('images/private.json', 'snapshot'))
+            for image in fixture(path, 'images')]
+        self.keys = fixture('keys/all.json', 'ssh_keys')
+        self.domains = fixture('domains/all.json', 'domains')
+        self.records = dict((d['name'], fixture('domains/records.json',
+                                                'domain_records'))
+                            for d in self.domains)
+        self.floating_ips = fixture('floatingip/list.json', 'floating_ips')
+        self.account = fixture('account/account.json', 'account')
+
+        self.droplets = {}
+        self.actions = []
+        self.pending = []
+        image = self.images[0]
+        for i in range(droplets):
+            droplet = self.droplet(
+                'droplet-%05d' % i, self.regions[i % len(self.regions)],
+                self.sizes[i % len(self.sizes)], image,
+                tags=[tags[i % len(tags)]] if tags else [])
+            droplet['status'] = 'active'
+            droplet['networks'] = self.networks(droplet['id'])
+
+    def new_id(self):
+        self.next_id += 1
+        return self.next_id
+
+    def droplet(self, name, region, size, image, tags=()):
+        """Add a Droplet that is still being created"""
+        droplet = {
+            'id': self.new_id(), 'name': name, 'memory': size['memory'],
+            'vcpus': size['vcpus'], 'disk': size['disk'], 'locked': False,
+            'status': 'new', 'kernel': self.kernels[0],
+            'created_at': timestamp(time.time()), 'features': ['virtio'],
+            'backup_ids': [], 'snapshot_ids': [], 'image': image,
+            'size_slug': size['slug'], 'size': size,
+            'networks': {'v4': [], 'v6': []}, 'region': region,
+            'tags': list(tags),
+        }
+        self.droplets[droplet['id']] = droplet
+        return droplet
+
+    @staticmethod
+    def networks(droplet_id):
+        n = droplet_id % (1 << 24)
+        return {'v4': [{'ip_address': '10.%d.%d.%d' % (
+                        n >> 16, n >> 8 & 255, n & 255),
+                        'netmask': '255.0.0.0', 'gateway': '10.0.0.1',
+                        'type': 'public'}],
+                'v6': []}
+
+    def get_droplet(self, droplet_id):
+        try:
+            return self.droplets[int(droplet_id)]
+        except (KeyError, ValueError):
+            raise NotFound()
+
+    def get_image(self, image_id):
+        for image in self.images:
+            if str(image['id']) == image_id or image.get('slug') == image_id:
+                return image
+        raise NotFound()
+
+    def start(self, type, resource, resource_type='droplet', **params):
+        """Record a new in-progress action"""
+        now = time.time()
+        region = resource.get('region') or {}
+        action = {
+            'id': self.new_id(), 'status': 'in-progress', 'type': type,
+            'started_at': timestamp(now), 'completed_at': None,
+            'resource_id': resource.get('id') or resource.get('ip'),
+            'resource_type': resource_type,
+            'region': region, 'region_slug': region.get('slug'),
+        }
+        self.actions.append(action)
+        self.pending.append((now + self.action_time, action, resource,
+                             params))
+        return action
+
+    def settle(self):
+        """Complete the actions whose time has come"""
+        now = time.time()
+        done = [p for p in self.pending if p[0] <= now]
+        if not done:
+            return
+        self.pending = [p for p in self.pending if p[0] > now]
+        for completes_at, action, resource, params in done:
+            action['status'] = 'completed'
+            action['completed_at'] = timestamp(completes_at)
+            self.apply(action, resource, params)
+
+    def apply(self, action, resource, params):
+        type = action['type']
+        if action['resource_type'] == 'floating_ip':
+            resource['droplet'] = params.get('droplet')
+            return
+        if type in action_status:
+            resource['status'] = action_status[type]
+        if type == 'create':
+            resource['networks'] = self.networks(resource['id'])
+        elif type == 'destroy':
+            self.droplets.pop(resource['id'], None)
+            for ip in self.floating_ips:
+                if (ip.get('droplet') or {}).get('id') == resource['id']:
+                    ip['droplet'] = None
+        elif type == 'rename':
+            resource['name'] = params['name']
+        elif type == 'resize':
+            resource['size_slug'] = params['size']
+        elif type == 'snapshot':
+            name = params.get('name') or '%s-snapshot' % resource['name']
+            image = dict(self.images[0], id=self.new_id(), public=False,
+                         slug=None, type='snapshot', name=name,
+                         created_at=action['completed_at'])
+            self.images.append(image)
+            resource['snapshot_ids'].append(image['id'])
+
+
+def paginate(values, params, url):
+    """One page of a listing, with the API's links and meta"""
+    per_page = min(int(params.get('per_page', 20)), 200)
+    page = max(int(params.get('page', 1)), 1)
+    pages = max((len(values) + per_page - 1) // per_page, 1)
+    links = {}
+    if pages > 1:
+        def link(n):
+            return '%s?%s' % (url, urlencode(sorted(
+                dict(params, page=n, per_page=per_page).items())))
+        links['pages'] = {'first': link(1), 'last': link(pages)}
+        if page > 1:
+            links['pages']['prev'] = link(page - 1)
+        if page < pages:
+            links['pages']['next'] = link(page + 1)
+    start = (page - 1) * per_page
+    return values[start:start + per_page], {'links': links,
+                                            'meta': {'total': len(values)}}
+
+
+class FakeAPI(object):
+    """
+        The request handling of the fake API, independent of HTTP.
+
+        handle() takes a method, path, query parameters, JSON body and
+        headers and returns a status, headers and JSON body, applying the
+        configured latency, failures and rate limit on the way.
+
+        Args:
+            account: Account - resources served
+            latency: float - seconds added to every response
+            jitter: float - random extra delay, up to this many seconds
+            rate_limit: int - requests allowed per rate_window
+            rate_window: int - seconds before the rate limit is reset
+            throttle_rate: float - probability of an unprovoked 429
+            retry_after: float - Retry-After sent with an unprovoked 429
+            error_rate: float - probability of a 500
+            seed: int - seed for the random delays and failures
+    """
+
+    def __init__(self, account=None, latency=0, jitter=0, rate_limit=5000,
+                 rate_window=3600, throttle_rate=0, retry_after=1,
+                 error_rate=0, seed=None):
+        self.account = account or Account()
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.base_url = 'http://127.0.0.1/v2/'
+        self.requests = {}
+        self._window = None
+        self._remaining = rate_limit
+        self._routes = [(method, re.compile('^%s$' % path), handler)
+                        for method, path, handler in self.routes()]
+
+    def routes(self):
+        return [
+            ('GET', r'account/?', self.get_account),
+            ('GET', r'droplets/?', self.list_droplets),
+            ('POST', r'droplets/?', self.create_droplets),
+            ('DELETE', r'droplets/?', self.destroy_tagged),
+            ('POST', r'droplets/actions/?', self.tagged_action),
+            ('GET', r'droplets/(\d+)/?', self.show_droplet),
+            ('DELETE', r'droplets/(\d+)/?', self.destroy_droplet),
+            ('GET', r'droplets/(\d+)/actions/?', self.droplet_actions),
+            ('POST', r'droplets/(\d+)/actions/?', self.droplet_action),
+            ('GET', r'droplets/\d+/actions/(\d+)/?', self.show_action),
+            ('GET', r'droplets/\d+/kernels/?', self.list_kernels),
+            ('GET', r'actions/?', self.list_actions),
+            ('GET', r'actions/(\d+)/?', self.show_action),
+            ('GET', r'images/?', self.list_images),
+            ('GET', r'images/([^/]+)/?', self.show_image),
+            ('PUT', r'images/([^/]+)/?', self.update_image),
+            ('DELETE', r'images/([^/]+)/?', self.destroy_image),
+            ('POST', r'images/([^/]+)/actions/?', self.image_action),
+            ('GET', r'regions/?', self.list_regions),
+            ('GET', r'sizes/?', self.list_sizes),
+            ('GET', r'domains/?', self.list_domains),
+            ('POST', r'domains/?', self.create_domain),
+            ('GET', r'domains/([^/]+)/?', self.show_domain),
+            ('DELETE', r'domains/([^/]+)/?', self.destroy_domain),
+            ('GET', r'domains/([^/]+)/records/?', self.list_records),
+            ('POST', r'domains/([^/]+)/records/?', self.create_record),
+            ('GET', r'domains/([^/]+)/records/(\d+)/?', self.show_record),
+            ('PUT', r'domains/([^/]+)/records/(\d+)/?', self.update_record),
+            ('DELETE', r'domains/([^/]+)/records/(\d+)/?',
+             self.destroy_record),
+            ('GET', r'account/keys/?', self.list_keys),
+            ('POST', r'account/keys/?', self.create_key),
+            ('GET', r'account/keys/([^/]+)/?', self.show_key),
+            ('PUT', r'account/keys/([^/]+)/?', self.update_key),
+            ('DELETE', r'account/keys/([^/]+)/?', self.destroy_key),
+            ('GET', r'floating_ips/?', self.list_floating_ips),
+            ('POST', r'floating_ips/?', self.create_floating_ip),
+            ('GET', r'floating_ips/([^/]+)/?', self.show_floating_ip),
+            ('DELETE', r'floating_ips/([^/]+)/?', self.destroy_floating_ip),
+            ('POST', r'floating_ips/([^/]+)/actions/?',
+             self.floating_ip_action),
+        ]
+
+    def handle(self, method, path, params, body, headers):
+        """Answer a request: (status, headers, body or None)"""
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if path.startswith('/v2/'):
+            path = path[len('/v2/'):]
+        auth = headers.get('Authorization') or ''
+        with self.account.lock:
+            key = '%s %s' % (method, re.sub(r'/\d+', '/<id>',
+                                            path.rstrip('/')))
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            limit_headers, throttled = self._spend()
+            if not auth.startswith('Bearer ') or not auth[7:].strip():
+                return self._error(401, 'unauthorized',
+                                   'Unable to authenticate you.',
+                                   limit_headers)
+            if not throttled and \
+                    self.random.random() < self.throttle_rate:
+                limit_headers['Retry-After'] = str(self.retry_after)
+                throttled = True
+            if throttled:
+                return self._error(429, 'too_many_requests',
+                                   'API Rate limit exceeded.', limit_headers)
+            if self.random.random() < self.error_rate:
+                return self._error(500, 'server_error',
+                                   'Server was unable to give you a '
+                                   'response.', limit_headers)
+
+            self.account.settle()
+            for route_method, pattern, handler in self._routes:
+                match = pattern.match(path)
+                if route_method == method and match:
+                    break
+            else:
+                return self._error(404, 'not_found', 'The resource you '
+                                   'were accessing could not be found.',
+                                   limit_headers)
+            try:
+                status, data = handler(params, body or {}, *match.groups())
+            except NotFound:
+                return self._error(404, 'not_found', 'The resource you '
+                                   'were accessing could not be found.',
+                                   limit_headers)
+            except (KeyError, ValueError, TypeError) as e:
+                return self._error(422, 'unprocessable_entity',
+                                   'Invalid request: %s' % e, limit_headers)
+
+        if data is None:
+            return status, limit_headers, None
+        payload = json.dumps(data, sort_keys=True)
+        if method == 'GET':
+            etag = '"%s"' % hashlib.md5(payload.encode('UTF-8')).hexdigest()
+            limit_headers['ETag'] = etag
+            if headers.get('If-None-Match') == etag:
+                return 304, limit_headers, None
+        return status, limit_headers, payload
+
+    def stats(self):
+        """Requests received so far, by method and path"""
+        with self.account.lock:
+            return dict(self.requests)
+
+    def _spend(self):
+        now = time.time()
+        if self._window is None or now >= self._window + self.rate_window:
+            self._window = int(now)
+            self._remaining = self.rate_limit
+        throttled = self._remaining <= 0
+        self._remaining = max(self._remaining - 1, 0)
+        return {'RateLimit-Limit': str(self.rate_limit),
+                'RateLimit-Remaining': str(self._remaining),
+                'RateLimit-Reset': str(self._window + self.rate_window)}, \
+            throttled
+
+    @staticmethod
+    def _error(status, id, message, headers):
+        return status, headers, json.dumps({'id': id, 'message': message})
+
+    def _listing(self, key, values, params, path):
+        page, extra = paginate(values, params, self.base_url + path)
+        return 200, dict(extra, **{key: page})
+
+    # Account, catalogue
+
+    def get_account(self, params, body):
+        return 200, {'account': self.account.account}
+
+    def list_regions(self, params, body):
+        return self._listing('regions', self.account.regions, params,
+                             'regions')
+
+    def list_sizes(self, params, body):
+        return self._listing('sizes', self.account.sizes, params, 'sizes')
+
+    def list_kernels(self, params, body):
+        return self._listing('kernels', self.account.kernels, params,
+                             'kernels')
+
+    # Droplets
+
+    def list_droplets(self, params, body):
+        droplets = sorted(self.account.droplets.values(),
+                          key=lambda d: d['id'])
+        if params.get('tag_name'):
+            droplets = [d for d in droplets
+                        if params['tag_name'] in d['tags']]
+        return self._listing('droplets', droplets, params, 'droplets')
+
+    def show_droplet(self, params, body, droplet_id):
+        return 200, {'droplet': self.account.get_droplet(droplet_id)}
+
+    def create_droplets(self, params, body):
+        account = self.account
+        region = [r for r in account.regions
+                  if r['slug'] == body['region']][0]
+        size = [s for s in account.sizes
+                if s['slug'] == body.get('size', body.get('size_slug'))][0]
+        image = account.get_image(str(body['image']))
+        names = body['names'] if 'names' in body else [body['name']]
+
+        droplets, actions = [], []
+        for name in names:
+            droplet = account.droplet(name, region, size, image,
+                                      body.get('tags') or ())
+            action = account.start('create', droplet)
+            droplets.append(droplet)
+            actions.append({'id': action['id'], 'rel': 'create',
+                            'href': '%sactions/%s' % (self.base_url,
+                                                      action['id'])})
+        if 'names' in body:
+            return 202, {'droplets': droplets,
+                         'links': {'actions': actions}}
+        return 202, {'droplet': droplets[0], 'links': {'actions': actions}}
+
+    def destroy_droplet(self, params, body, droplet_id):
+        self.account.start('destroy', self.account.get_droplet(droplet_id))
+        return 204, None
+
+    def destroy_tagged(self, params, body):
+        for droplet in list(self.account.droplets.values()):
+            if params['tag_name'] in droplet['tags']:
+                self.account.start('destroy', droplet)
+        return 204, None
+
+    def droplet_actions(self, params, body, droplet_id):
+        droplet_id = int(droplet_id)
+        actions = [a for a in reversed(self.account.actions)
+                   if a['resource_type'] == 'droplet'
+                   and a['resource_id'] == droplet_id]
+        return self._listing('actions', actions, params,
+                             'droplets/%s/actions' % droplet_id)
+
+    def droplet_action(self, params, body, droplet_id):
+        droplet = self.account.get_droplet(droplet_id)
+        params = dict(body)
+        type = params.pop('type')
+        return 201, {'action': self.account.start(type, droplet, **params)}
+
+    def tagged_action(self, params, body):
+        body = dict(body)
+        type = body.pop('type')
+        actions = [self.account.start(type, droplet, **body)
+                   for droplet in sorted(self.account.droplets.values(),
+                                         key=lambda d: d['id'])
+                   if params['tag_name'] in droplet['tags']]
+        return 201, {'actions': actions}
+
+    # Actions
+
+    def list_actions(self, params, body):
+        return self._listing('actions', self.account.actions[::-1], params,
+                             'actions')
+
+    def show_action(self, params, body, action_id):
+        for action in self.account.actions:
+            if action['id'] == int(action_id):
+                return 200, {'action': action}
+        raise NotFound()
+
+    # Images
+
+    def list_images(self, params, body):
+        images = self.account.images
+        if params.get('private') == 'true':
+            images = [i for i in images if not i['public']]
+        if params.get('type'):
+            images = [i for i in images
+                      if i['public'] and i['type'] == params['type']]
+        return self._listing('images', images, params, 'images')
+
+    def show_image(self, params, body, image_id):
+        return 200, {'image': self.account.get_image(image_id)}
+
+    def update_image(self, params, body, image_id):
+        image = self.account.get_image(image_id)
+        image['name'] = body['name']
+        return 200, {'image': image}
+
+    def destroy_image(self, params, body, image_id):
+        self.account.images.remove(self.account.get_image(image_id))
+        return 204, None
+
+    def image_action(self, params, body, image_id):
+        image = self.account.get_image(image_id)
+        body = dict(body)
+        return 201, {'action': self.account.start(
+            body.pop('type'), image, resource_type='image', **body)}
+
+    # Domains and records
+
+    def list_domains(self, params, body):
+        return self._listing('domains', self.account.domains, params,
+                             'domains')
+
+    def _domain(self, name):
+        for domain in self.account.domains:
+            if domain['name'] == name:
+                return domain
+        raise NotFound()
+
+    def create_domain(self, params, body):
+        domain = {'name': body['name'], 'ttl': 1800, 'zone_file': None}
+        self.account.domains.append(domain)
+        self.account.records[domain['name']] = [{
+            'id': self.account.new_id(), 'type': 'A', 'name': '@',
+            'data': body['ip_address'], 'priority': None, 'port': None,
+            'weight': None}]
+        return 201, {'domain': domain}
+
+    def show_domain(self, params, body, name):
+        return 200, {'domain': self._domain(name)}
+
+    def destroy_domain(self, params, body, name):
+        self.account.domains.remove(self._domain(name))
+        self.account.records.pop(name, None)
+        return 204, None
+
+    def list_records(self, params, body, name):
+        self._domain(name)
+        return self._listing('domain_records', self.account.records[name],
+                             params, 'domains/%s/records' % name)
+
+    def _record(self, name, record_id):
+        for record in self.account.records.get(name, []):
+            if record['id'] == int(record_id):
+                return record
+        raise NotFound()
+
+    def create_record(self, params, body, name):
+        self._domain(name)
+        record = dict((k, body.get(k)) for k in (
+            'type', 'name', 'data', 'priority', 'port', 'weight'))
+        record['id'] = self.account.new_id()
+        self.account.records[name].append(record)
+        return 201, {'domain_record': record}
+
+    def show_record(self, params, body, name, record_id):
+        return 200, {'domain_record': self._record(name, record_id)}
+
+    def update_record(self, params, body, name, record_id):
+        record = self._record(name, record_id)
+        record.update((k, v) for k, v in body.items() if k != 'id')
+        return 200, {'domain_record': record}
+
+    def destroy_record(self, params, body, name, record_id):
+        self.account.records[name].remove(self._record(name, record_id))
+        return 204, None
+
+    # SSH keys
+
+    def list_keys(self, params, body):
+        return self._listing('ssh_keys', self.account.keys, params,
+                             'account/keys')
+
+    def _key(self, key_id):
+        for key in self.account.keys:
+            if str(key['id']) == key_id or key['fingerprint'] == key_id:
+                return key
+        raise NotFound()
+
+    def create_key(self, params, body):
+        digest = hashlib.md5(body['public_key'].encode('UTF-8')).hexdigest()
+        key = {'id': self.account.new_id(), 'name': body['name'],
+               'public_key': body['public_key'],
+               'fingerprint': ':'.join(digest[i:i + 2]
+                                       for i in range(0, 32, 2))}
+        self.account.keys.append(key)
+        return 201, {'ssh_key': key}
+
+    def show_key(self, params, body, key_id):
+        return 200, {'ssh_key': self._key(key_id)}
+
+    def update_key(self, params, body, key_id):
+        key = self._key(key_id)
+        key['name'] = body['name']
+        return 200, {'ssh_key': key}
+
+    def destroy_key(self, params, body, key_id):
+        self.account.keys.remove(self._key(key_id))
+        return 204, None
+
+    # Floating IPs
+
+    def list_floating_ips(self, params, body):
+        return self._listing('floating_ips', self.account.floating_ips,
+                             params, 'floating_ips')
+
+    def _floating_ip(self, ip):
+        for floating_ip in self.account.floating_ips:
+            if floating_ip['ip'] == ip:
+                return floating_ip
+        raise NotFound()
+
+    def create_floating_ip(self, params, body):
+        n = self.account.new_id() % (1 << 16)
+        if 'droplet_id' in body:
+            droplet = self.account.get_droplet(body['droplet_id'])
+            region = droplet['region']
+        else:
+            droplet = None
+            region = [r for r in self.account.regions
+                      if r['slug'] == body['region']][0]
+        floating_ip = {'ip': '192.0.%d.%d' % (n >> 8, n & 255),
+                       'region': region, 'droplet': droplet}
+        self.account.floating_ips.append(floating_ip)
+        return 202, {'floating_ip': floating_ip}
+
+    def show_floating_ip(self, params, body, ip):
+        return 200, {'floating_ip': self._floating_ip(ip)}
+
+    def destroy_floating_ip(self, params, body, ip):
+        self.account.floating_ips.remove(self._floating_ip(ip))
+        return 204, None
+
+    def floating_ip_action(self, params, body, ip):
+        floating_ip = self._floating_ip(ip)
+        droplet = None
+        if body['type'] == 'assign':
+            droplet = self.account.get_droplet(body['droplet_id'])
+        return 201, {'action': self.account.start(
+            body['type'], floating_ip, resource_type='floating_ip',
+            droplet=droplet)}
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, don't let them wait on
+    # delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        url = urlparse(self.path)
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        body = None
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length).decode('UTF-8'))
+            except ValueError:
+                body = None
+        status, headers, payload = self.server.api.handle(
+            self.command, url.path, params, body, self.headers)
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        data = payload.encode('UTF-8') if payload is not None else b''
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class FakeServer(ThreadingMixIn, HTTPServer):
+    """
+        Serves a FakeAPI over HTTP on a background thread.
+
+            with FakeServer(FakeAPI(Account(droplets=10000))) as server:
+                manager = Manager(token='fake', end_point=server.url)
+
+        Args:
+            api: FakeAPI - requests handler, a default one when None
+            host: str - address to listen on
+            port: int - port to listen on, 0 for any free port
+            verbose: bool - log every request on stderr
+    """
+
+    daemon_threads = True
+
+    def __init__(self, api=None, host='127.0.0.1', port=0, verbose=False):
+        HTTPServer.__init__(self, (host, port), Handler)
+        self.api = api or FakeAPI()
+        self.api.base_url = self.url
+        self.verbose = verbose
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://%s:%d/v2/' % (host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    from docopt import docopt
+    args = docopt(__doc__, argv=argv)
+    api = FakeAPI(
+        Account(droplets=int(args['--droplets']),
+                action_time=float(args['--action-time'])),
+        latency=float(args['--latency']), jitter=float(args['--jitter']),
+        rate_limit=int(args['--rate-limit']),
+        throttle_rate=float(args['--throttle-rate']),
+        error_rate=float(args['--error-rate']),
+        seed=int(args['--seed']) if args['--seed'] else None)
+    server = FakeServer(api, port=int(args['--port']), verbose=True)
+    print("Serving the fake API on %s (Ctrl-C to stop)" % server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
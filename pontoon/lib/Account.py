@@ -3,6 +3,9 @@ from .baseapi import BaseAPI
 
 
 class Account(BaseAPI):
+    __slots__ = ('droplet_limit', 'email', 'uuid', 'email_verified', 'status',
+                 'status_message')
+
     def __init__(self, *args, **kwargs):
         self.droplet_limit = None
         self.email = None
@@ -14,12 +17,11 @@ class Account(BaseAPI):
         super(Account, self).__init__(*args, **kwargs)
 
     @classmethod
-    def get_object(cls, api_token, mocked):
+    def get_object(cls, api_token, mocked, **kwargs):
         """
             Class method that will return an Account object.
         """
-        acct = cls(token=api_token, mocked=mocked)
-        acct.mock_data = "account/account.json"
+        acct = cls(token=api_token, mocked=mocked, **kwargs)
         acct.load()
         return acct
 
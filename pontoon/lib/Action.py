@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
-from time import sleep
-
 from .baseapi import BaseAPI
 
 
 class Action(BaseAPI):
+    __slots__ = ('id', 'status', 'type', 'started_at', 'completed_at',
+                 'resource_id', 'resource_type', 'region', 'region_slug',
+                 'droplet_id')
+
     def __init__(self, *args, **kwargs):
         self.id = None
         self.token = None
@@ -22,17 +24,15 @@ class Action(BaseAPI):
         super(Action, self).__init__(*args, **kwargs)
 
     @classmethod
-    def get_object(cls, api_token, action_id, mocked):
+    def get_object(cls, api_token, action_id, mocked, **kwargs):
         """
             Class method that will return a Action object by ID.
         """
-        action = cls(token=api_token, id=action_id, mocked=mocked)
-        action.mock_data = "actions/ipv6_completed.json"
+        action = cls(token=api_token, id=action_id, mocked=mocked, **kwargs)
         action.load_directly()
         return action
 
     def load_directly(self):
-        self.mock_data = "actions/ipv6_completed.json"
         action = self.get_data("actions/%s" % self.id)
         if action:
             action = action[u'action']
@@ -41,7 +41,9 @@ class Action(BaseAPI):
                 setattr(self, attr, action[attr])
 
     def load(self):
-        self.mock_data = "actions/ipv6_completed.json"
+        if self.droplet_id is None:
+            return self.load_directly()
+
         action = self.get_data(
             "droplets/%s/actions/%s" % (
                 self.droplet_id,
@@ -54,19 +56,23 @@ class Action(BaseAPI):
             for attr in action.keys():
                 setattr(self, attr, action[attr])
 
-    def wait(self, update_every_seconds=1):
+    def wait(self, update_every_seconds=1, timeout=None):
         """
             Wait until the action is marked as completed or with an error.
             It will return True in case of success, otherwise False.
 
             Optional Args:
                 update_every_seconds - int : number of seconds to wait before
-                    checking if the action is completed.
+                    the first check, doubling (with jitter) after each one.
+                timeout - int : number of seconds before giving up.
         """
-        while self.status == u'in-progress':
-            sleep(update_every_seconds)
-            self.load()
+        from .waiter import ActionWaiter
 
+        waiter = ActionWaiter([self], token=self.token, mocked=self.mocked,
+                              client=self._client,
+                              initial_delay=update_every_seconds,
+                              timeout=timeout)
+        waiter.wait()
         return self.status == u'completed'
 
     def __str__(self):
@@ -4,6 +4,8 @@ from .baseapi import BaseAPI, GET, POST, DELETE
 
 
 class Domain(BaseAPI):
+    __slots__ = ('name', 'ttl', 'zone_file', 'ip_address')
+
     def __init__(self, *args, **kwargs):
         self.name = None
         self.ttl = None
@@ -13,12 +15,12 @@ class Domain(BaseAPI):
         super(Domain, self).__init__(*args, **kwargs)
 
     @classmethod
-    def get_object(cls, api_token, domain_name, mocked):
+    def get_object(cls, api_token, domain_name, mocked, **kwargs):
         """
             Class method that will return a Domain object by ID.
         """
-        domain = cls(token=api_token, name=domain_name, mocked=mocked)
-        domain.mock_data = "domains/single.json"
+        domain = cls(token=api_token, name=domain_name,
+                     mocked=mocked, **kwargs)
         domain.load()
         return domain
 
@@ -34,7 +36,6 @@ class Domain(BaseAPI):
         """
             Destroy the domain by name
         """
-        self.mock_status = 204
         # URL https://api.digitalocean.com/v2/domains/[NAME]
         return self.get_data("domains/%s" % self.name, type=DELETE)
 
@@ -71,8 +72,6 @@ class Domain(BaseAPI):
         if kwargs.get("weight", None):
             data['weight'] = kwargs.get("weight", None)
 
-        self.mock_data = "domains/create_record.json"
-        self.mock_status = 201
         return self.get_data(
             "domains/%s/records" % self.name,
             type=POST,
@@ -89,8 +88,6 @@ class Domain(BaseAPI):
             "ip_address": self.ip_address,
         }
 
-        self.mock_data = "domains/create.json"
-        self.mock_status = 201
         domain = self.get_data("domains", type=POST, params=data)
         return domain
 
@@ -101,7 +98,6 @@ class Domain(BaseAPI):
         if params is None:
             params = {}
 
-        self.mock_data = "domains/records.json"
         # URL https://api.digitalocean.com/v2/domains/[NAME]/records/
         records = []
         data = self.get_data("domains/%s/records/" % self.name, type=GET,
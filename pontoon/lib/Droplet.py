@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 import re
-import responses
 
 from .Action import Action
 from .Image import Image
@@ -61,6 +60,13 @@ class Droplet(BaseAPI):
         end_point: str - url of api endpoint used
     """
 
+    __slots__ = ('id', 'name', 'memory', 'vcpus', 'disk', 'region', 'status',
+                 'image', 'size_slug', 'locked', 'created_at', 'networks',
+                 'kernel', 'backup_ids', 'snapshot_ids', 'action_ids',
+                 'features', 'ip_address', 'private_ip_address',
+                 'ip_v6_address', 'ssh_keys', 'backups', 'ipv6',
+                 'private_networking', 'user_data', 'tags', 'size')
+
     def __init__(self, *args, **kwargs):
         # Defining default values
         self.id = None
@@ -89,12 +95,13 @@ class Droplet(BaseAPI):
         self.ipv6 = None
         self.private_networking = None
         self.user_data = None
+        self.tags = []
 
         # This will load also the values passed
         super(Droplet, self).__init__(*args, **kwargs)
 
     @classmethod
-    def get_object(cls, api_token, droplet_id, mocked):
+    def get_object(cls, api_token, droplet_id, mocked, **kwargs):
         """Class method that will return a Droplet object by ID.
 
         Args:
@@ -102,8 +109,7 @@ class Droplet(BaseAPI):
             droplet_id: int - droplet id
             mocked: bool - mocked
         """
-        droplet = cls(token=api_token, id=droplet_id, mocked=mocked)
-        droplet.mock_data = "droplets/single.json"
+        droplet = cls(token=api_token, id=droplet_id, mocked=mocked, **kwargs)
         droplet.load()
         return droplet
 
@@ -128,21 +134,33 @@ class Droplet(BaseAPI):
         """
            Fetch data about droplet - use this instead of get_data()
         """
-        self.mock_data = "droplets/single.json"
         droplets = self.get_data("droplets/%s" % self.id)
         droplet = droplets['droplet']
 
         for attr in droplet.keys():
             setattr(self, attr, droplet[attr])
 
-        for net in self.networks['v4']:
+        for attr, address in self.addresses(self.networks).items():
+            setattr(self, attr, address)
+        return self
+
+    @staticmethod
+    def addresses(networks):
+        """
+            The addresses found in a Droplet's networks, by attribute:
+            ip_address, private_ip_address and ip_v6_address.
+        """
+        addresses = {}
+        # Droplets that are still being created have no networks yet.
+        networks = networks or {}
+        for net in networks.get('v4', []):
             if net['type'] == 'private':
-                self.private_ip_address = net['ip_address']
+                addresses['private_ip_address'] = net['ip_address']
             if net['type'] == 'public':
-                self.ip_address = net['ip_address']
-        if self.networks['v6']:
-            self.ip_v6_address = self.networks['v6'][0]['ip_address']
-        return self
+                addresses['ip_address'] = net['ip_address']
+        if networks.get('v6'):
+            addresses['ip_v6_address'] = networks['v6'][0]['ip_address']
+        return addresses
 
     def _perform_action(self, params, return_dict=True):
         """
@@ -166,7 +184,9 @@ class Droplet(BaseAPI):
             return action
         else:
             action = action[u'action']
-            return_action = Action(token=self.token)
+            return_action = Action(token=self.token, mocked=self.mocked,
+                                   client=self._client,
+                                   droplet_id=self.id)
             # Loading attributes
             for attr in action.keys():
                 setattr(return_action, attr, action[attr])
@@ -182,7 +202,6 @@ class Droplet(BaseAPI):
 
             Returns dict or Action
         """
-        self.mock_data = "droplet_actions/power_on.json"
         return self._perform_action({'type': 'power_on'}, return_dict)
 
     def shutdown(self, return_dict=True):
@@ -195,7 +214,6 @@ class Droplet(BaseAPI):
 
             Returns dict or Action
         """
-        self.mock_data = "droplet_actions/shutdown.json"
         return self._perform_action({'type': 'shutdown'}, return_dict)
 
     def reboot(self, return_dict=True):
@@ -208,7 +226,6 @@ class Droplet(BaseAPI):
 
             Returns dict or Action
         """
-        self.mock_data = "droplet_actions/reboot.json"
         return self._perform_action({'type': 'reboot'}, return_dict)
 
     def power_cycle(self, return_dict=True):
@@ -221,7 +238,6 @@ class Droplet(BaseAPI):
 
             Returns dict or Action
         """
-        self.mock_data = "droplet_actions/power_cycle.json"
         return self._perform_action({'type': 'power_cycle'}, return_dict)
 
     def power_off(self, return_dict=True):
@@ -234,7 +250,6 @@ class Droplet(BaseAPI):
 
             Returns dict or Action
         """
-        self.mock_data = "droplet_actions/power_off.json"
         return self._perform_action({'type': 'power_off'}, return_dict)
 
     def reset_root_password(self, return_dict=True):
@@ -247,7 +262,6 @@ class Droplet(BaseAPI):
 
             Returns dict or Action
         """
-        self.mock_data = "droplet_actions/password_reset.json"
         return self._perform_action({'type': 'password_reset'}, return_dict)
 
     def resize(self, new_size_slug, return_dict=True, disk=True):
@@ -264,7 +278,6 @@ class Droplet(BaseAPI):
 
         Returns dict or Action
         """
-        self.mock_data = "droplet_actions/resize.json"
         options = {"type": "resize", "size": new_size_slug}
         if disk:
             options["disk"] = "true"
@@ -291,7 +304,6 @@ class Droplet(BaseAPI):
             action.wait()
             self.load()
 
-        self.mock_data = "droplet_actions/snapshot.json"
         return self._perform_action(
             {"type": "snapshot", "name": snapshot_name},
             return_dict
@@ -309,7 +321,6 @@ class Droplet(BaseAPI):
 
         Returns dict or Action
         """
-        self.mock_data = "droplet_actions/restore.json"
         return self._perform_action(
             {"type": "restore", "image": image_id},
             return_dict
@@ -330,7 +341,6 @@ class Droplet(BaseAPI):
         if not image_id:
             image_id = self.image['id']
 
-        self.mock_data = "droplet_actions/rebuild.json"
         return self._perform_action(
             {"type": "rebuild", "image": image_id},
             return_dict
@@ -352,7 +362,6 @@ class Droplet(BaseAPI):
 
             Returns dict or Action
         """
-        self.mock_data = "droplet_actions/disable_backups.json"
         return self._perform_action({'type': 'disable_backups'}, return_dict)
 
     def destroy(self):
@@ -361,7 +370,6 @@ class Droplet(BaseAPI):
 
             Returns dict
         """
-        self.mock_status = 204
         return self.get_data("droplets/%s" % self.id, type=DELETE)
 
     def rename(self, name, return_dict=True):
@@ -376,7 +384,6 @@ class Droplet(BaseAPI):
 
         Returns dict or Action
         """
-        self.mock_data = "droplet_actions/rename.json"
         return self._perform_action(
             {'type': 'rename', 'name': name},
             return_dict
@@ -392,7 +399,6 @@ class Droplet(BaseAPI):
 
            Returns dict or Action
         """
-        self.mock_data = "droplet_actions/enable_private_networking.json"
         return self._perform_action(
             {'type': 'enable_private_networking'},
             return_dict
@@ -408,7 +414,6 @@ class Droplet(BaseAPI):
 
             Returns dict or Action
         """
-        self.mock_data = "droplet_actions/enable_ipv6.json"
         return self._perform_action({'type': 'enable_ipv6'}, return_dict)
 
     def change_kernel(self, kernel, return_dict=True):
@@ -426,7 +431,6 @@ class Droplet(BaseAPI):
         if type(kernel) != Kernel:
             raise BadKernelObject("Use Kernel object")
 
-        self.mock_data = "droplet_actions/change_kernel.json"
         return self._perform_action(
             {'type': 'change_kernel', 'kernel': kernel.id},
             return_dict
@@ -460,8 +464,7 @@ class Droplet(BaseAPI):
 
                 else:
                     key = SSHKey()
-                    key.token = self.token
-                    key.mocked = self.mocked
+                    key._client = self._client
                     results = key.load_by_pub_key(ssh_key)
 
                     if results is None:
@@ -490,6 +493,20 @@ class Droplet(BaseAPI):
         for attr in kwargs.keys():
             setattr(self, attr, kwargs[attr])
 
+        data = self.get_data("droplets", type=POST,
+                             params=self._create_params())
+
+        if data:
+            self.id = data['droplet']['id']
+            action_id = data['links']['actions'][0]['id']
+            self.action_ids = []
+            self.action_ids.append(action_id)
+
+    def _create_params(self):
+        """
+            The body of a create request for this droplet's properties.
+            SSH public keys unknown to the account are registered first.
+        """
         # Provide backwards compatibility
         if not self.size_slug and self.size:
             self.size_slug = self.size
@@ -507,15 +524,9 @@ class Droplet(BaseAPI):
 
         if self.user_data:
             data["user_data"] = self.user_data
-
-        self.mock_data = "droplet_actions/create.json"
-        data = self.get_data("droplets", type=POST, params=data)
-
-        if data:
-            self.id = data['droplet']['id']
-            action_id = data['links']['actions'][0]['id']
-            self.action_ids = []
-            self.action_ids.append(action_id)
+        if self.tags:
+            data["tags"] = self.tags
+        return data
 
     def get_events(self):
         """
@@ -524,24 +535,54 @@ class Droplet(BaseAPI):
         """
         return self.get_actions()
 
-    def get_actions(self):
+    def get_actions(self, refresh=False):
         """
             Returns a list of Action objects
             This actions can be used to check the droplet's status
+
+            Actions are built straight from the (paginated) listing.
+
+            Optional Args:
+                refresh - bool : Reload every action on its own afterwards,
+                    at the cost of one request per action.
         """
-        self.mock_data = "actions/multi.json"
-        answer = self.get_data("droplets/%s/actions/" % self.id, type=GET)
+        answer = self.get_data("droplets/%s/actions/" % self.id, type=GET,
+                               params={'per_page': 200})
 
         actions = []
-        for action_dict in answer['actions']:
-            action = Action(**action_dict)
-            action.token = self.token
-            action.mocked = self.mocked
-            action.droplet_id = self.id
-            action.load()
-            actions.append(action)
+        while True:
+            for action_dict in answer['actions']:
+                action = Action(**action_dict)
+                action._client = self._client
+                action.droplet_id = self.id
+                if refresh:
+                    action.load()
+                actions.append(action)
+            try:
+                url = answer[u'links'][u'pages'].get(u'next')
+                if not url:
+                    break
+                answer = self.get_data(url)
+            except KeyError:  # No links.
+                break
         return actions
 
+    def wait_for_action(self, action_id, update_every_seconds=1):
+        """Wait for a single action of this droplet to finish.
+
+        Only that action is polled, however long the droplet's history.
+        It will return True in case of success, otherwise False.
+
+        Args:
+            action_id: int - id of action
+
+        Optional Args:
+            update_every_seconds - int : number of seconds to wait before
+                checking if the action is completed.
+        """
+        action = self.get_action(action_id)
+        return action.wait(update_every_seconds)
+
     def get_action(self, action_id):
         """Returns a specific Action by its ID.
 
@@ -551,7 +592,8 @@ class Droplet(BaseAPI):
         return Action.get_object(
             api_token=self.token,
             action_id=action_id,
-            mocked=self.mocked
+            mocked=self.mocked,
+            client=self._client
         )
 
     def get_snapshots(self):
@@ -563,8 +605,7 @@ class Droplet(BaseAPI):
         for id in self.snapshot_ids:
             snapshot = Image()
             snapshot.id = id
-            snapshot.token = self.token
-            snapshot.mocked = self.mocked
+            snapshot._client = self._client
             snapshots.append(snapshot)
         return snapshots
 
@@ -574,7 +615,6 @@ class Droplet(BaseAPI):
         """
 
         kernels = list()
-        self.mock_data = "kernels/list.json"
         data = self.get_data("droplets/%s/kernels/" % self.id)
         while True:
             for jsond in data[u'kernels']:
@@ -3,6 +3,9 @@ from .baseapi import BaseAPI, POST, DELETE, PUT
 
 
 class Image(BaseAPI):
+    __slots__ = ('id', 'name', 'distribution', 'slug', 'min_size', 'public',
+                 'regions', 'created_at')
+
     def __init__(self, *args, **kwargs):
         self.id = None
         self.name = None
@@ -16,12 +19,11 @@ class Image(BaseAPI):
         super(Image, self).__init__(*args, **kwargs)
 
     @classmethod
-    def get_object(cls, api_token, image_id, mocked):
+    def get_object(cls, api_token, image_id, mocked, **kwargs):
         """
-            Class method that will return an Image object by ID.
+            Class method that will return an Image object by ID or slug.
         """
-        image = cls(token=api_token, id=image_id, mocked=mocked)
-        image.mock_data = "images/single.json"
+        image = cls(token=api_token, id=image_id, mocked=mocked, **kwargs)
         image.load()
         return image
 
@@ -39,14 +41,12 @@ class Image(BaseAPI):
         """
             Destroy the image
         """
-        self.mock_status = 204
         return self.get_data("images/%s/" % self.id, type=DELETE)
 
     def transfer(self, new_region_slug):
         """
             Transfer the image
         """
-        self.mock_data = "actions/ipv6_completed.json"
         return self.get_data(
             "images/%s/actions/" % self.id,
             type=POST,
@@ -57,7 +57,6 @@ class Image(BaseAPI):
         """
             Rename an image
         """
-        self.mock_data = "actions/ipv6_completed.json"
         return self.get_data(
             "images/%s" % self.id,
             type=PUT,
@@ -3,6 +3,8 @@ from .baseapi import BaseAPI
 
 
 class Kernel(BaseAPI):
+    __slots__ = ('name', 'id', 'version')
+
     def __init__(self, *args, **kwargs):
         self.name = ""
         self.id = ""
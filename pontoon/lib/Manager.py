@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 try:
     from urlparse import urlparse, parse_qs
+    from urllib import quote
 except:
-    from urllib.parse import urlparse, parse_qs
+    from urllib.parse import urlparse, parse_qs, quote
 
-from .baseapi import BaseAPI
+from .baseapi import BaseAPI, POST
 from .Droplet import Droplet
 from .Region import Region
 from .Size import Size
@@ -16,8 +17,49 @@ from .Account import Account
 from .FloatingIP import FloatingIP
 
 
+def thread_pool(workers):
+    """
+        Return a ThreadPoolExecutor, or None where concurrent.futures isn't
+        available (Python 2 without the futures backport).
+    """
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+    except ImportError:
+        return None
+    return ThreadPoolExecutor(max_workers=workers)
+
+
 class Manager(BaseAPI):
+    """
+        Entry point for listing and looking up resources on an account.
+
+        A single Manager can be shared by any number of threads: nothing
+        about a request is stored on the instance, the parameters given to
+        a call are never modified, and the session pool, rate limiter and
+        transports it relies on are all thread-safe. Objects returned by a
+        Manager are independent of each other, but a single Droplet (or
+        Action...) should not be reloaded from two threads at once, as
+        loading replaces its attributes.
+
+        Droplets listed by a Manager share equal region, size, image and
+        kernel dicts, which should be treated as read only.
+
+        Every listing (get_all_*, iter_*, get_*_images) takes raw=True to
+        return the API's dicts as decoded instead of building an object
+        for each, for reports over thousands of resources.
+    """
+
+    # Action types the API can apply to every Droplet with a tag at once.
+    tag_action_types = ('power_cycle', 'power_on', 'power_off', 'shutdown',
+                        'enable_private_networking', 'enable_ipv6',
+                        'enable_backups', 'disable_backups', 'snapshot')
+
     def __init__(self, *args, **kwargs):
+        # Number of pages fetched concurrently when paginating.
+        self.workers = 4
+        # Region, size, image and kernel dicts shared by the Droplets.
+        self._shared = {}
+
         super(Manager, self).__init__(*args, **kwargs)
 
     def get_data(self, *args, **kwargs):
@@ -27,12 +69,9 @@ class Manager(BaseAPI):
             The default amount of elements per page defined is 200 as explained
             here: https://github.com/koalalorenzo/python-digitalocean/pull/78
         """
-        params = {}
-        if "params" in kwargs:
-            params = kwargs["params"]
-
-        if "per_page" not in params:
-            params["per_page"] = 200
+        # A copy, so the caller's dict is left alone and may be shared.
+        params = dict(kwargs.get("params") or {})
+        params.setdefault("per_page", 200)
 
         kwargs["params"] = params
         data = super(Manager, self).get_data(*args, **kwargs)
@@ -45,252 +84,441 @@ class Manager(BaseAPI):
             Perform multiple calls in order to have a full list of elements
             when the API are "paginated". (content list is divided in more
             than one page)
+
+            Once the first page tells us how many pages there are, the rest
+            are fetched by up to self.workers threads and appended in page
+            order, so the result is the same as fetching them one by one.
         """
         try:
             lastpage_url = data['links']['pages']['last']
-            pages = parse_qs(urlparse(lastpage_url).query)['page'][0]
-            key, values = data.popitem()
-            for page in range(2, int(pages) + 1):
-                params.update({'page': page})
-                new_data = super(Manager, self).get_data(url, params=params)
-
-                more_values = list(new_data.values())[0]
-                for value in more_values:
-                    values.append(value)
-            data = {}
-            data[key] = values
+            pages = int(parse_qs(urlparse(lastpage_url).query)['page'][0])
+        except KeyError:  # No pages.
+            return data
+
+        key = [k for k, v in data.items() if isinstance(v, list)][0]
+        # a new list: the first page may be shared, e.g. with a cache
+        values = list(data[key])
+
+        def fetch(page):
+            page_params = dict(params, page=page)
+            new_data = super(Manager, self).get_data(url, params=page_params)
+            return new_data[key]
+
+        for more_values in self.map(fetch, range(2, pages + 1)):
+            values.extend(more_values)
+
+        return {key: values}
+
+    def map(self, func, items):
+        """
+            Apply func to every item (page numbers, batches...) on up to
+            self.workers threads, returning the results in order.
+        """
+        items = list(items)
+        workers = min(self.workers or 1, len(items))
+        executor = thread_pool(workers) if workers > 1 else None
+        if executor is None:
+            return [func(item) for item in items]
+
+        with executor:
+            return list(executor.map(func, items))
+
+    def __iter_pages(self, url, key, params=None):
+        """
+            Yield the elements of a paginated listing one page at a time.
+
+            While the elements of a page are being consumed the next page is
+            already requested in the background, and nothing is fetched
+            past the point where the caller stops iterating.
+        """
+        params = dict(params or {})
+        params.setdefault('per_page', 200)
+
+        def fetch(page):
+            page_params = dict(params, page=page)
+            return super(Manager, self).get_data(url, params=page_params)
+
+        executor = thread_pool(1)
+
+        try:
+            page, data = 1, fetch(1)
+            while True:
+                pending = None
+                has_next = self.__next_page(data)
+                if has_next and executor is not None:
+                    pending = executor.submit(fetch, page + 1)
+
+                for value in data[key]:
+                    yield value
+
+                if not has_next:
+                    break
+                page += 1
+                data = pending.result() if pending else fetch(page)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    @staticmethod
+    def __next_page(data):
+        try:
+            return bool(data['links']['pages'].get('next'))
         except KeyError:  # No pages.
-            pass
+            return False
+
+    def __object_from(self, cls, jsoned):
+        obj = cls(**jsoned)
+        obj._client = self._client
+        return obj
+
+    def __objects(self, cls, values, raw=False):
+        """Objects built from the values of a listing, or the values"""
+        if raw:
+            return values
+        return [self.__object_from(cls, jsoned) for jsoned in values]
 
-        return data
+    def __shared(self, field, value):
+        """
+            An equal dict already held by another Droplet, or value.
+
+            Most Droplets of an account share a handful of regions, sizes
+            and images, so a listing keeps one copy of each. Shared dicts
+            must be treated as read only.
+        """
+        key = (field, value.get('slug') or value.get('id'))
+        shared = self._shared.get(key)
+        if shared == value:
+            return shared
+        self._shared[key] = value
+        return value
 
     def get_account(self):
         """
             Returns an Account object.
         """
-        return Account.get_object(api_token=self.token, mocked=self.mocked)
+        return Account.get_object(api_token=self.token, mocked=self.mocked,
+                                  client=self._client)
 
-    def get_all_regions(self):
+    def get_all_regions(self, raw=False):
         """
             This function returns a list of Region object.
         """
-        self.mock_data = "regions/all.json"
         data = self.get_data("regions/")
-        regions = list()
-        for jsoned in data['regions']:
-            region = Region(**jsoned)
-            region.token = self.token
-            region.mocked = self.mocked
-            regions.append(region)
-        return regions
+        return self.__objects(Region, data['regions'], raw)
 
-    def get_all_droplets(self):
+    def get_all_droplets(self, tag_name=None, raw=False):
         """
             This function returns a list of Droplet object.
-        """
-        self.mock_data = "droplets/all.json"
-        data = self.get_data("droplets/")
-        droplets = list()
-        for jsoned in data['droplets']:
-            droplet = Droplet(**jsoned)
-            droplet.token = self.token
-            droplet.mocked = self.mocked
-
-            for net in droplet.networks['v4']:
-                if net['type'] == 'private':
-                    droplet.private_ip_address = net['ip_address']
-                if net['type'] == 'public':
-                    droplet.ip_address = net['ip_address']
-            if droplet.networks['v6']:
-                droplet.ip_v6_address = droplet.networks['v6'][0]['ip_address']
-            droplets.append(droplet)
-        return droplets
+
+            Optional Args:
+                tag_name - str : Only the Droplets with this tag.
+                raw - bool : The API's dicts rather than Droplets.
+        """
+        params = {'tag_name': tag_name} if tag_name else None
+        data = self.get_data("droplets/", params=params)
+        if raw:
+            return data['droplets']
+        return [self.__droplet_from(jsoned) for jsoned in data['droplets']]
+
+    def iter_droplets(self, tag_name=None, raw=False):
+        """
+            This function yields Droplet objects page by page, fetching the
+            next page in the background while the current one is consumed.
+
+            Optional Args:
+                tag_name - str : Only the Droplets with this tag.
+                raw - bool : The API's dicts rather than Droplets.
+        """
+        params = {'tag_name': tag_name} if tag_name else None
+        for jsoned in self.__iter_pages("droplets/", 'droplets', params):
+            yield jsoned if raw else self.__droplet_from(jsoned)
+
+    def __droplet_from(self, jsoned):
+        droplet = self.__object_from(Droplet, jsoned)
+        for field in ('region', 'size', 'image', 'kernel'):
+            value = getattr(droplet, field, None)
+            if isinstance(value, dict):
+                setattr(droplet, field, self.__shared(field, value))
+
+        for attr, address in Droplet.addresses(droplet.networks).items():
+            setattr(droplet, attr, address)
+        return droplet
+
+    def create_droplets(self, names, batch_size=10, **kwargs):
+        """
+            Create a Droplet for every name, with the same properties.
+
+            Names are sent up to batch_size at a time with the API's
+            multiple create request, and batches are sent concurrently.
+            Returns the new Droplets in the order of names, each with the
+            id of its create action in action_ids, e.g. to wait for them
+            all with a single ActionWaiter.
+
+            Args:
+                names: list of str - hostnames
+                size_slug / size, image, region, ssh_keys, backups, ipv6,
+                private_networking, user_data: as for Droplet.create
+        """
+        template = Droplet(token=self.token, mocked=self.mocked,
+                           client=self._client, **kwargs)
+        params = template._create_params()
+        del params['name']
+
+        names = list(names)
+        batches = [names[i:i + batch_size]
+                   for i in range(0, len(names), batch_size)]
+
+        def create(batch):
+            data = super(Manager, self).get_data(
+                "droplets/", type=POST, params=dict(params, names=batch))
+            # Create actions are listed in the same order as the Droplets.
+            droplets = []
+            for jsoned, action in zip(data['droplets'],
+                                      data['links']['actions']):
+                droplet = self.__droplet_from(jsoned)
+                droplet.action_ids = [action['id']]
+                droplets.append(droplet)
+            return droplets
+
+        return [droplet for droplets in self.map(create, batches)
+                for droplet in droplets]
+
+    def perform_action_by_tag(self, tag_name, type, **params):
+        """
+            Perform an action on every Droplet with a tag and return the
+            resulting Actions.
+
+            The types in tag_action_types take a single request. The API
+            can't apply other types (e.g. reboot) by tag, so those are sent
+            to each tagged Droplet in turn, on up to self.workers threads.
+
+            Args:
+                tag_name: str - tag
+                type: str - action type, e.g. 'power_off'
+                Any other keyword argument is sent with the action, e.g.
+                name for a snapshot.
+        """
+        params = dict(params, type=type)
+        if type in self.tag_action_types:
+            data = super(Manager, self).get_data(
+                "droplets/actions?tag_name=%s" % quote(tag_name),
+                type=POST, params=params)
+            actions = []
+            for jsoned in data['actions']:
+                action = self.__object_from(Action, jsoned)
+                action.droplet_id = action.resource_id
+                actions.append(action)
+            return actions
+
+        def perform(droplet):
+            return droplet._perform_action(params, return_dict=False)
+
+        return self.map(perform, self.get_all_droplets(tag_name=tag_name))
 
     def get_droplet(self, droplet_id):
         """
             Return a Droplet by its ID.
         """
         return Droplet.get_object(api_token=self.token, droplet_id=droplet_id,
-                                  mocked=self.mocked)
+                                  mocked=self.mocked,
+                                  client=self._client)
 
-    def get_all_sizes(self):
+    def get_all_sizes(self, raw=False):
         """
             This function returns a list of Size object.
         """
-        self.mock_data = "sizes/all.json"
         data = self.get_data("sizes/")
-        sizes = list()
-        for jsoned in data['sizes']:
-            size = Size(**jsoned)
-            size.token = self.token
-            size.mocked = self.mocked
-            sizes.append(size)
-        return sizes
+        return self.__objects(Size, data['sizes'], raw)
 
-    def get_images(self, private=False, type=None):
+    def get_images(self, private=False, type=None, raw=False):
         """
             This function returns a list of Image object.
         """
         params = {}
-        self.mock_data = "images/all.json"
         if private:
             params['private'] = 'true'
-            self.mock_data = "images/private.json"
         if type:
             params['type'] = type
-            self.mock_data = "images/%s.json" % type
 
         data = self.get_data("images/", params=params)
-        images = list()
-        for jsoned in data['images']:
-            image = Image(**jsoned)
-            image.token = self.token
-            image.mocked = self.mocked
-            images.append(image)
-        return images
+        return self.__objects(Image, data['images'], raw)
 
-    def get_all_images(self):
+    def iter_images(self, private=False, type=None, raw=False):
+        """
+            This function yields Image objects page by page.
+        """
+        params = {}
+        if private:
+            params['private'] = 'true'
+        if type:
+            params['type'] = type
+
+        for jsoned in self.__iter_pages("images/", 'images', params):
+            yield jsoned if raw else self.__object_from(Image, jsoned)
+
+    def get_all_images(self, raw=False):
         """
             This function returns a list of Image objects containing all
             available DigitalOcean images, both public and private.
         """
-        self.mock_data = "images/all.json"
-        images = self.get_images()
+        images = self.get_images(raw=raw)
         return images
 
     def get_image(self, image_id):
         """
-            Return a Image by its ID.
+            Return a Image by its ID or, for public images, its slug
+            (e.g. 'ubuntu-14-04-x64').
         """
         return Image.get_object(api_token=self.token, image_id=image_id,
-                                mocked=self.mocked)
+                                mocked=self.mocked,
+                                client=self._client)
 
-    def get_my_images(self):
+    def get_my_images(self, raw=False):
         """
             This function returns a list of Image objects representing
             private DigitalOcean images (e.g. snapshots and backups).
         """
-        self.mock_data = "images/private.json"
-        images = self.get_images(private=True)
+        images = self.get_images(private=True, raw=raw)
         return images
 
-    def get_global_images(self):
+    def get_global_images(self, raw=False):
         """
             This function returns a list of Image objects representing
             public DigitalOcean images (e.g. base distribution images
             and 'One-Click' applications).
         """
-        self.mock_data = "images/all.json"
-        data = self.get_images()
-        images = list()
-        for i in data:
-            if i.public:
-                i.token = self.token
-                i.mocked = self.mocked
-                images.append(i)
-        return images
+        images = self.get_images(raw=raw)
+        return [i for i in images if (i['public'] if raw else i.public)]
 
-    def get_distro_images(self):
+    def get_distro_images(self, raw=False):
         """
             This function returns a list of Image objects representing
             public base distribution images.
         """
-        self.mock_data = "images/distro.json"
-        images = self.get_images(type='distribution')
+        images = self.get_images(type='distribution', raw=raw)
         return images
 
-    def get_app_images(self):
+    def get_app_images(self, raw=False):
         """
             This function returns a list of Image objectobjects representing
             public DigitalOcean 'One-Click' application images.
         """
-        self.mock_data = "images/app.json"
-        images = self.get_images(type='application')
+        images = self.get_images(type='application', raw=raw)
         return images
 
-    def get_all_domains(self):
+    def get_all_domains(self, raw=False):
         """
             This function returns a list of Domain object.
         """
-        self.mock_data = "domains/all.json"
         data = self.get_data("domains/")
-        domains = list()
-        for jsoned in data['domains']:
-            domain = Domain(**jsoned)
-            domain.token = self.token
-            domain.mocked = self.mocked
-            domains.append(domain)
-        return domains
+        return self.__objects(Domain, data['domains'], raw)
+
+    def iter_domains(self, raw=False):
+        """
+            This function yields Domain objects page by page.
+        """
+        for jsoned in self.__iter_pages("domains/", 'domains'):
+            yield jsoned if raw else self.__object_from(Domain, jsoned)
 
     def get_domain(self, domain_name):
         """
             Return a Domain by its domain_name
         """
         return Domain.get_object(api_token=self.token, domain_name=domain_name,
-                                 mocked=self.mocked)
+                                 mocked=self.mocked,
+                                 client=self._client)
 
-    def get_all_sshkeys(self):
+    def get_all_sshkeys(self, raw=False):
         """
             This function returns a list of SSHKey object.
         """
-        self.mock_data = "keys/all.json"
         data = self.get_data("account/keys/")
-        ssh_keys = list()
-        for jsoned in data['ssh_keys']:
-            ssh_key = SSHKey(**jsoned)
-            ssh_key.token = self.token
-            ssh_key.mocked = self.mocked
-            ssh_keys.append(ssh_key)
-        return ssh_keys
+        return self.__objects(SSHKey, data['ssh_keys'], raw)
+
+    def iter_sshkeys(self, raw=False):
+        """
+            This function yields SSHKey objects page by page.
+        """
+        for jsoned in self.__iter_pages("account/keys/", 'ssh_keys'):
+            yield jsoned if raw else self.__object_from(SSHKey, jsoned)
 
     def get_ssh_key(self, ssh_key_id):
         """
             Return a SSHKey object by its ID.
         """
         return SSHKey.get_object(api_token=self.token, ssh_key_id=ssh_key_id,
-                                 mocked=self.mocked)
+                                 mocked=self.mocked,
+                                 client=self._client)
 
     def get_action(self, action_id):
         """
             Return an Action object by a specific ID.
         """
         return Action.get_object(api_token=self.token, action_id=action_id,
-                                 mocked=self.mocked)
+                                 mocked=self.mocked,
+                                 client=self._client)
 
-    def get_all_actions(self):
+    def get_all_actions(self, raw=False):
         """
         This functions returns a list of Action objects.
         """
-        self.mock_data = "actions/multi.json"
         data = self.get_data("actions/")
-        actions = list()
-        for jsoned in data['actions']:
-            action = Action(**jsoned)
-            action.token = self.token
-            action.mocked = self.mocked
-            actions.append(action)
-        return actions
+        return self.__objects(Action, data['actions'], raw)
 
-    def get_all_floating_ips(self):
+    def iter_actions(self, raw=False):
+        """
+            This function yields Action objects page by page, newest first,
+            without holding the whole account history in memory.
+        """
+        for jsoned in self.__iter_pages("actions/", 'actions'):
+            yield jsoned if raw else self.__object_from(Action, jsoned)
+
+    def get_actions_since(self, action_id, per_page=50):
+        """
+            Return the Actions newer than action_id, newest first.
+
+            Pages are requested one at a time, and only until action_id is
+            reached, so catching up with a recent action_id costs a single
+            request. With action_id None only the latest page is returned.
+
+            Args:
+                action_id: int - newest Action already seen, or None
+                per_page: int - Actions per request
+        """
+        actions = []
+        page = 1
+        while True:
+            data = super(Manager, self).get_data(
+                "actions/", params={'page': page, 'per_page': per_page})
+            for jsoned in data['actions']:
+                if action_id is not None and jsoned['id'] <= action_id:
+                    return actions
+                actions.append(self.__object_from(Action, jsoned))
+            if action_id is None or not self.__next_page(data):
+                return actions
+            page += 1
+
+    def get_all_floating_ips(self, raw=False):
         """
             This function returns a list of FloatingIP objects.
         """
-        self.mock_data = "floatingip/list.json"
         data = self.get_data("floating_ips")
-        floating_ips = list()
-        for jsoned in data['floating_ips']:
-            floating_ip = FloatingIP(**jsoned)
-            floating_ip.token = self.token
-            floating_ip.mocked = self.mocked
-            floating_ips.append(floating_ip)
-        return floating_ips
+        return self.__objects(FloatingIP, data['floating_ips'], raw)
+
+    def iter_floating_ips(self, raw=False):
+        """
+            This function yields FloatingIP objects page by page.
+        """
+        for jsoned in self.__iter_pages("floating_ips", 'floating_ips'):
+            yield jsoned if raw else self.__object_from(FloatingIP, jsoned)
 
     def get_floating_ip(self, ip):
         """
             Returns a of FloatingIP object by its IP address.
         """
         return FloatingIP.get_object(api_token=self.token, ip=ip,
-                                     mocked=self.mocked)
+                                     mocked=self.mocked,
+                                     client=self._client)
 
     def __str__(self):
         return "%s" % (self.token)
@@ -1,5 +1,4 @@
 # -*- coding: utf-8 -*-
-import requests
 try:
     from urlparse import urljoin
 except:
@@ -28,7 +27,8 @@ class Metadata(BaseAPI):
         if "https" not in url:
             url = urljoin(self.end_point, url)
 
-        response = requests.get(url, headers=headers, params=params)
+        session = self.pool.session(None, self.end_point)
+        response = session.get(url, headers=headers, params=params)
 
         if render_json:
             return response.json()
@@ -3,6 +3,9 @@ from .baseapi import BaseAPI, POST, DELETE, PUT
 
 
 class Record(BaseAPI):
+    __slots__ = ('domain', 'id', 'type', 'name', 'data', 'priority', 'port',
+                 'weight')
+
     def __init__(self, domain_name=None, *args, **kwargs):
         self.domain = domain_name if domain_name else ""
         self.id = None
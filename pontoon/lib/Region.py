@@ -3,6 +3,8 @@ from .baseapi import BaseAPI
 
 
 class Region(BaseAPI):
+    __slots__ = ('name', 'slug', 'sizes', 'available', 'features')
+
     def __init__(self, *args, **kwargs):
         self.name = None
         self.slug = None
@@ -3,6 +3,8 @@ from .baseapi import BaseAPI, GET, POST, DELETE, PUT
 
 
 class SSHKey(BaseAPI):
+    __slots__ = ('id', 'name', 'public_key', 'fingerprint')
+
     def __init__(self, *args, **kwargs):
         self.id = ""
         self.name = None
@@ -12,12 +14,11 @@ class SSHKey(BaseAPI):
         super(SSHKey, self).__init__(*args, **kwargs)
 
     @classmethod
-    def get_object(cls, api_token, ssh_key_id, mocked):
+    def get_object(cls, api_token, ssh_key_id, mocked, **kwargs):
         """
             Class method that will return a SSHKey object by ID.
         """
-        ssh_key = cls(token=api_token, id=ssh_key_id, mocked=mocked)
-        ssh_key.mock_data = "keys/single.json"
+        ssh_key = cls(token=api_token, id=ssh_key_id, mocked=mocked, **kwargs)
         ssh_key.load()
         return ssh_key
 
@@ -33,7 +34,6 @@ class SSHKey(BaseAPI):
         elif self.fingerprint is not None:
             identifier = self.fingerprint
 
-        self.mock_data = "keys/single.json"
         data = self.get_data("account/keys/%s" % identifier, type=GET)
 
         ssh_key = data['ssh_key']
@@ -50,7 +50,6 @@ class SSHKey(BaseAPI):
             uploading the same public_key twice.
         """
 
-        self.mock_data = "keys/all.json"
         data = self.get_data("account/keys/")
         for jsoned in data['ssh_keys']:
             if jsoned.get('public_key', "") == public_key:
@@ -68,7 +67,6 @@ class SSHKey(BaseAPI):
             "public_key": self.public_key,
         }
 
-        self.mock_data = "keys/single.json"
         data = self.get_data("account/keys/", type=POST, params=input_params)
 
         if data:
@@ -83,7 +81,6 @@ class SSHKey(BaseAPI):
             "public_key": self.public_key,
         }
 
-        self.mock_data = "keys/single.json"
         data = self.get_data(
             "account/keys/%s" % self.id,
             type=PUT,
@@ -97,7 +94,6 @@ class SSHKey(BaseAPI):
         """
             Destroy the SSH Key
         """
-        self.mock_status = 204
         return self.get_data("account/keys/%s" % self.id, type=DELETE)
 
     def __str__(self):
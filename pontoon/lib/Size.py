@@ -3,6 +3,9 @@ from .baseapi import BaseAPI
 
 
 class Size(BaseAPI):
+    __slots__ = ('slug', 'memory', 'vcpus', 'disk', 'transfer',
+                 'price_monthly', 'price_hourly', 'regions')
+
     def __init__(self, *args, **kwargs):
         self.slug = None
         self.memory = None
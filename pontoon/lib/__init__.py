@@ -7,6 +7,8 @@ __author_email__ = "koalalorenzo@gmail.com"
 __license__ = "LGPL v3"
 __copyright__ = "Copyright (c) 2012, 2013, 2014 Lorenzo Setale"
 
+import sys
+
 MOCKED = False
 
 from .Manager import Manager
@@ -21,4 +23,19 @@ from .Record import Record
 from .SSHKey import SSHKey
 from .Kernel import Kernel
 from .FloatingIP import FloatingIP
-from .baseapi import Error, TokenError, DataReadError
+from .waiter import ActionWaiter, WaitResult
+from .inventory import Inventory
+from .baseapi import Error, TokenError, DataReadError, RateLimitError
+from .pool import SessionPool, default_pool
+from .ratelimit import RateLimiter
+
+# The asyncio client pulls in asyncio, which most callers never need.
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name in ('AsyncManager', 'AsyncObject'):
+            from . import aio
+            return getattr(aio, name)
+        raise AttributeError("module %r has no attribute %r" %
+                             (__name__, name))
+elif sys.version_info >= (3, 5):
+    from .aio import AsyncManager, AsyncObject
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .Manager import Manager
+from .pool import SessionPool
+from .waiter import ActionWaiter
+
+
+# The loop of the running coroutine (get_event_loop() before Python 3.7).
+running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+class AsyncObject(object):
+    """
+        Wraps any pontoon.lib object (Droplet, Action, Image, Domain...) so
+        its methods return awaitables. Attributes are read straight from the
+        wrapped object.
+    """
+
+    def __init__(self, client, obj):
+        self._client = client
+        self._obj = obj
+
+    def __getattr__(self, name):
+        attr = getattr(self._obj, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def method(*args, **kwargs):
+            return self._client.run(attr, *args, **kwargs)
+        return method
+
+    def __repr__(self):
+        return "<async %r>" % (self._obj,)
+
+
+class AsyncManager(object):
+    """
+        asyncio client with the same API as Manager.
+
+        Every Manager method is available as a coroutine, and
+        AsyncManager.wrap() gives the same treatment to model objects. The
+        model classes, JSON handling and pooled sessions are shared with
+        the synchronous library; blocking requests run on a dedicated
+        thread pool and at most `limit` of them are in flight at once.
+        Unless a `pool` is given, the client keeps its own SessionPool
+        with a connection for every request in flight.
+
+        Args:
+            token: str - api token
+
+        Optional Args:
+            limit - int : maximum number of requests in flight
+            Any other keyword argument is passed on to Manager.
+    """
+
+    def __init__(self, token, limit=32, **kwargs):
+        self._own_pool = 'pool' not in kwargs and 'client' not in kwargs
+        if self._own_pool:
+            kwargs['pool'] = SessionPool(pool_maxsize=limit)
+        self.manager = Manager(token=token, **kwargs)
+        self.limit = limit
+        # The executor's threads are what bounds the requests in flight:
+        # unlike an asyncio.Semaphore it isn't tied to (and doesn't keep
+        # alive) any event loop.
+        self._executor = ThreadPoolExecutor(max_workers=self.limit)
+
+    async def run(self, func, *args, **kwargs):
+        """
+            Run a blocking library call without blocking the event loop.
+        """
+        return await running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs))
+
+    def wrap(self, obj):
+        """
+            Return an AsyncObject for a Droplet, Action, Image, Domain...
+        """
+        return AsyncObject(self, obj)
+
+    def __getattr__(self, name):
+        attr = getattr(self.manager, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def method(*args, **kwargs):
+            return self.run(attr, *args, **kwargs)
+        return method
+
+    async def wait(self, actions, timeout=None, initial_delay=1,
+                   max_delay=30, factor=2, jitter=0.5):
+        """
+            Wait for many actions (or action ids) concurrently.
+
+            Pending actions are refreshed together each round, as
+            ActionWaiter does, sleeping on the event loop in between so no
+            thread is held while waiting. Returns a WaitResult.
+        """
+        waiter = ActionWaiter(actions, client=self.manager._client,
+                              timeout=timeout, initial_delay=initial_delay,
+                              max_delay=max_delay, factor=factor,
+                              jitter=jitter)
+        deadline = waiter.deadline()
+        await self.__load([a for a in waiter.actions if a.status is None])
+
+        pending = waiter.actions
+        delay = waiter.initial_delay
+        while True:
+            pending, _ = waiter.settle(pending)
+            if not pending:
+                return waiter.result()
+
+            wait = waiter.backoff(delay, deadline)
+            if wait is None:
+                waiter.timed_out.extend(pending)
+                return waiter.result()
+            await asyncio.sleep(wait)
+            delay = min(delay * waiter.factor, waiter.max_delay)
+
+            await self.__load(await self.run(waiter.refresh, pending))
+
+    async def __load(self, actions):
+        await asyncio.gather(*[self.run(a.load) for a in actions])
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        if self._own_pool:
+            self.manager.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
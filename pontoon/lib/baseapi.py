@@ -1,19 +1,18 @@
 # -*- coding: utf-8 -*-
-import os
-import json
+import time
+import random
 import logging
-import responses
-import requests
-try:
-    from urlparse import urljoin
-except:
-    from urllib.parse import urljoin
+import threading
+import weakref
+from . import transport as transports
+from .pool import default_pool
+from .ratelimit import default_limiters
+from .httpcache import default_responses
+from .singleflight import SingleFlight, default_flights
+from .events import (default_events, request_event, BEFORE_REQUEST,
+                     AFTER_RESPONSE, RETRY, CACHE_HIT, COALESCED)
 
-
-GET = 'GET'
-POST = 'POST'
-DELETE = 'DELETE'
-PUT = 'PUT'
+from .transport import GET, POST, DELETE, PUT
 
 
 class Error(Exception):
@@ -33,69 +32,163 @@ class JSONReadError(Error):
     pass
 
 
-class BaseAPI(object):
+class RateLimitError(DataReadError):
+    pass
+
+
+# Settings of a client, with their defaults.
+client_defaults = (
+    ('token', ""),
+    ('end_point', "https://api.digitalocean.com/v2/"),
+    ('mocked', False),
+    # Where requests go, None picks the API or the fixtures (mocked).
+    ('transport', None),
+    ('pool', default_pool),
+    ('rate_limiters', default_limiters),
+    ('response_caches', default_responses),
+    # Hooks called around requests, see events.Events.
+    ('events', default_events),
+    # Shares concurrent identical GETs, None sends each one.
+    ('flights', default_flights),
+    # Attempts after a 429, or a 5xx on an idempotent request.
+    ('retries', 3),
+)
+
+
+class Client(object):
     """
-        Basic api class for
+        What an object needs to talk to the API: the token and end point,
+        and the transport, session pool, rate limiters and response caches
+        its requests go through.
+
+        Clients are interned and never changed once created, so every
+        object with the same settings (e.g. every Droplet of a listing)
+        holds a reference to a single Client instead of its own copy of
+        each setting. Changing a setting on an object gives it another
+        Client.
     """
-    token = ""
-    end_point = "https://api.digitalocean.com/v2/"
 
-    def __init__(self, *args, **kwargs):
-        self.token = ""
-        self.end_point = "https://api.digitalocean.com/v2/"
-        self.mocked = False
-        self.mock_data = None
-        self.mock_status = 200
-        self._log = logging.getLogger(__name__)
+    __slots__ = tuple(name for name, default in client_defaults) + \
+        ('__weakref__',)
 
-        for attr in kwargs.keys():
-            setattr(self, attr, kwargs[attr])
+    _interned = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
 
-    def __perform_request(self, url, type=GET, params=None):
-        """
-            This method will perform the real request,
-            in this way we can customize only the "output" of the API call by
-            using self.__call_api method.
-            This method will return the request object.
-        """
-        if params is None:
-            params = {}
+    @classmethod
+    def get(cls, **settings):
+        """The Client with these settings, the defaults for the others"""
+        values = tuple(settings.get(name, default)
+                       for name, default in client_defaults)
+        try:
+            with cls._lock:
+                client = cls._interned.get(values)
+                if client is None:
+                    client = cls._interned[values] = cls._new(values)
+                return client
+        except TypeError:  # unhashable setting, e.g. a mock
+            return cls._new(values)
+
+    @classmethod
+    def _new(cls, values):
+        client = cls()
+        for (name, default), value in zip(client_defaults, values):
+            setattr(client, name, value)
+        return client
+
+    def replace(self, **settings):
+        """The Client with these settings changed"""
+        values = dict((name, getattr(self, name))
+                      for name, default in client_defaults)
+        values.update(settings)
+        return Client.get(**values)
+
+
+class _Setting(object):
+    """
+        A setting read from an object's Client. On the class itself it is
+        the default, e.g. BaseAPI.end_point.
+    """
 
-        if not self.token:
-            raise TokenError("No token provided. Please use a valid token")
+    def __init__(self, name):
+        self.name = name
+        self.default = dict(client_defaults)[name]
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self.default
+        return getattr(obj._client, self.name)
+
+    def __set__(self, obj, value):
+        client = getattr(obj, '_client', None) or Client.get()
+        if getattr(client, self.name) is not value:
+            obj._client = client.replace(**{self.name: value})
+
+
+def attributes(obj):
+    """
+        The API attributes of an object (not its client settings), in the
+        order they were declared. A dict, e.g. from a raw listing, is
+        copied as is.
+    """
+    if isinstance(obj, dict):
+        return dict(obj)
+    skip = getattr(obj, 'client_attrs', ())
+    names = [name for cls in reversed(type(obj).__mro__)
+             for name in cls.__dict__.get('__slots__', ())]
+    names.extend(getattr(obj, '__dict__', ()))
+    attrs = {}
+    for name in names:
+        if name.startswith('_') or name in skip or name in attrs:
+            continue
+        try:
+            attrs[name] = getattr(obj, name)
+        except AttributeError:  # slot never set
+            pass
+    return attrs
+
+
+class BaseAPI(object):
+    """
+        Basic api class for
 
-        if "https" not in url:
-            url = urljoin(self.end_point, url)
+        Models declare their API attributes in __slots__, attributes the
+        API adds later still work but are kept in a __dict__.
+    """
 
-        # lookup table to find out the apropriate requests method,
-        # headers and payload type (json or query parameters)
-        def identity(x):
-            return x
+    __slots__ = ('_client', '__dict__')
 
-        def json_dumps(x):
-            return json.dumps(x)
+    # Attributes describing the client rather than the API resource.
+    client_attrs = ('token', 'end_point', 'mocked', 'transport', 'pool',
+                    'rate_limiters', 'response_caches', 'events', 'flights',
+                    'retries')
 
-        lookup = {
-            GET: (requests.get, {}, 'params', identity),
-            POST: (requests.post, {'Content-type': 'application/json'}, 'data',
-                   json_dumps),
-            PUT: (requests.put, {'Content-type': 'application/json'}, 'data',
-                  json_dumps),
-            DELETE: (requests.delete,
-                     {'content-type': 'application/x-www-form-urlencoded'},
-                     'params', identity),
-        }
+    token = _Setting('token')
+    end_point = _Setting('end_point')
+    mocked = _Setting('mocked')
+    transport = _Setting('transport')
+    pool = _Setting('pool')
+    rate_limiters = _Setting('rate_limiters')
+    response_caches = _Setting('response_caches')
+    events = _Setting('events')
+    flights = _Setting('flights')
+    retries = _Setting('retries')
 
-        requests_method, headers, payload, transform = lookup[type]
-        headers.update({'Authorization': 'Bearer ' + self.token})
-        kwargs = {'headers': headers, payload: transform(params)}
+    _log = logging.getLogger(__name__)
 
-        # remove token from log
-        headers_str = str(headers).replace(self.token.strip(), 'TOKEN')
-        self._log.debug('%s %s %s:%s %s' %
-                        (type, url, payload, params, headers_str))
+    def __init__(self, *args, **kwargs):
+        # `client` is another object's Client, shared by the objects it
+        # creates; settings given alongside it override it.
+        client = kwargs.pop('client', None)
+        settings = dict((name, kwargs.pop(name)) for name in
+                        self.client_attrs if name in kwargs)
+        if client is not None:
+            self._client = client.replace(**settings) if settings \
+                else client
+        else:
+            self._client = Client.get(**settings)
 
-        return requests_method(url, **kwargs)
+        for attr in kwargs.keys():
+            setattr(self, attr, kwargs[attr])
 
     def get_data(self, url, type=GET, params=None):
         """
@@ -106,19 +199,36 @@ class BaseAPI(object):
         if params is None:
             params = dict()
 
-        if self.mocked:
-            # Use mock data for responses
-            self._log.debug("MOCK - returning data from %s" % self.mock_data)
-            with responses.RequestsMock() as rsps:
-                mock_data = self.load_from_file(
-                    self.mock_data) if self.mock_data else None
-                rsps.add(getattr(responses, type), self.end_point + url,
-                         body=mock_data,
-                         status=self.mock_status,
-                         content_type='application/json')
-                req = self.__perform_request(url, type, params)
-        else:
-            req = self.__perform_request(url, type, params)
+        # Catalogue responses (sizes, regions...) may be kept on disk.
+        cache = endpoint = entry = None
+        if type == GET:
+            path = url[len(self.end_point):] \
+                if url.startswith(self.end_point) else url
+            endpoint = self.response_caches.endpoint(path, params)
+            if endpoint is not None:
+                cache = self.response_caches.get(self.token)
+        if cache is not None:
+            entry = cache.get(path, params)
+            if entry is not None and cache.fresh(entry):
+                self.__cache_hit(url, params, 'hits')
+                return cache.serve(entry, 'hits')
+
+        headers = None
+        if entry is not None and entry.get('etag'):
+            headers = {'If-None-Match': entry['etag']}
+        try:
+            req = self.__coalesced(url, type, params, headers)
+        except (IOError, OSError) as e:
+            if entry is None:
+                raise
+            self._log.debug("%s unreachable (%s), using cached copy",
+                            url, e)
+            self.__cache_hit(url, params, 'stale')
+            return cache.serve(entry, 'stale')
+
+        if entry is not None and req.status_code == 304:
+            self.__cache_hit(url, params, 'revalidated')
+            return cache.serve(entry, 'revalidated')
 
         if req.status_code == 204:
             return True
@@ -132,14 +242,129 @@ class BaseAPI(object):
 
         if not req.ok:
             msg = [data[m] for m in ("id", "message") if m in data][1]
+            if req.status_code == 429:
+                raise RateLimitError(msg)
             raise DataReadError(msg)
 
+        if cache is not None:
+            cache.put(endpoint, path, params, req.headers.get('ETag'), data)
         return data
 
+    def __coalesced(self, url, type, params, headers=None):
+        """
+            Send a request, unless it's a GET identical to one in flight:
+            then wait for that one and share its response.
+        """
+        flights = self.flights
+        if type != GET or flights is None:
+            return self.__request(url, type, params, headers)
+        req, shared = flights.do(
+            SingleFlight.key(self._client, url, params, headers),
+            lambda: self.__request(url, type, params, headers))
+        if shared and self.events.listening(COALESCED):
+            self.events.emit(COALESCED, request_event(self, type, url,
+                                                      params))
+        return req
+
+    def __request(self, url, type, params, headers=None):
+        """
+            Send a request, waiting for the rate limit budget first and
+            retrying it when it was throttled or failed on the server.
+        """
+        limiter = self.rate_limiters.get(self.token)
+        events = self.events
+        # Events are only described when something listens.
+        event = None
+        if events.listening():
+            event = request_event(self, type, url, params)
+        attempt = 0
+        while True:
+            waited = limiter.acquire()
+            if event is not None:
+                event['attempt'] = attempt
+                events.emit(BEFORE_REQUEST, dict(event))
+                start = time.time()
+            req = self.__send(url, type, params, headers)
+            limiter.update(req.headers)
+            if event is not None:
+                events.emit(AFTER_RESPONSE, dict(
+                    event, status=req.status_code, bytes=len(req.content),
+                    latency=time.time() - start, waited=waited or 0,
+                    ratelimit_limit=req.headers.get('RateLimit-Limit'),
+                    ratelimit_remaining=req.headers.get(
+                        'RateLimit-Remaining'),
+                    ratelimit_reset=req.headers.get('RateLimit-Reset')))
+
+            delay = self.__retry_delay(req, type, attempt, limiter)
+            if delay is None:
+                return req
+            if event is not None:
+                events.emit(RETRY, dict(event, status=req.status_code,
+                                        delay=delay))
+            attempt += 1
+            self._log.debug("%s %s returned %s, retrying in %.1fs",
+                            type, url, req.status_code, delay)
+            time.sleep(delay)
+
+    def __cache_hit(self, url, params, outcome):
+        """Tell the event hooks a response came from the cache"""
+        if self.events.listening(CACHE_HIT):
+            self.events.emit(CACHE_HIT, dict(
+                request_event(self, GET, url, params), outcome=outcome))
+
+    def __send(self, url, type, params, headers=None):
+        """
+            Hand the request to this object's transport: the real API, or
+            the JSON fixtures when mocked.
+        """
+        if not self.token:
+            raise TokenError("No token provided. Please use a valid token")
+
+        transport = self.transport
+        if transport is None:
+            transport = transports.default_fixtures if self.mocked \
+                else transports.default_http
+        return transport.send(self, type, url, params, headers)
+
+    def __retry_delay(self, req, type, attempt, limiter):
+        """
+            Return how long to wait before retrying a failed request, or
+            None when it shouldn't be retried.
+
+            429s are always retried, since the API rejected the request
+            without acting on it. Server errors are only retried for
+            requests that are safe to repeat.
+        """
+        status = req.status_code
+        if attempt >= self.retries:
+            return None
+        if status != 429 and (status < 500 or type == POST):
+            return None
+
+        now = time.time()
+        retry_after = req.headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                return max(0, float(retry_after))
+            except ValueError:
+                pass
+        if status == 429:
+            reset = limiter.budget()['reset']
+            limiter.exhausted()
+            if reset is not None and reset > now:
+                return reset - now
+        return min(2 ** attempt, 30) * (0.5 + random.random() / 2)
+
+    def get_rate_limit(self):
+        """
+            Return the request budget left for this token: a dict with
+            limit, remaining and reset (unix timestamp), as last reported
+            by the API.
+        """
+        return self.rate_limiters.get(self.token).budget()
+
     def load_from_file(self, json_file):
-        cwd = os.path.dirname(__file__)
-        with open(os.path.join(cwd, 'data/%s' % json_file), 'r') as f:
-            return f.read()
+        return transports.default_fixtures.load(json_file)
 
     def __str__(self):
         return "%s" % self.token
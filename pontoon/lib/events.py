@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+import re
+import json
+import threading
+
+try:
+    from urlparse import urlparse, parse_qsl
+except ImportError:
+    from urllib.parse import urlparse, parse_qsl
+
+from .files import atomic_write
+
+# Events emitted by BaseAPI around its requests.
+BEFORE_REQUEST = 'before_request'
+AFTER_RESPONSE = 'after_response'
+RETRY = 'retry'
+CACHE_HIT = 'cache_hit'
+COALESCED = 'coalesced'
+
+event_names = (BEFORE_REQUEST, AFTER_RESPONSE, RETRY, CACHE_HIT, COALESCED)
+
+# Parts of a path naming a single resource, so requests for any Droplet
+# (domain, key...) are counted together.
+path_templates = [
+    (re.compile(r'^domains/[^/]+'), 'domains/{name}'),
+    (re.compile(r'^account/keys/[^/]+'), 'account/keys/{id}'),
+    (re.compile(r'^floating_ips/[^/]+'), 'floating_ips/{ip}'),
+    (re.compile(r'^images/[^/]+'), 'images/{id}'),
+    (re.compile(r'/\d+(?=/|$)'), '/{id}'),
+]
+
+
+def path_template(path):
+    """The endpoint of a path: 'droplets/123/actions' -> 'droplets/{id}/...'"""
+    path = path.split('?', 1)[0].strip('/')
+    for pattern, template in path_templates:
+        path = pattern.sub(template, path)
+    return path
+
+
+def request_event(api, type, url, params):
+    """What is known about a request before it is sent"""
+    path = url[len(api.end_point):] if url.startswith(api.end_point) \
+        else url
+    query = dict(parse_qsl(urlparse(url).query))
+    page = (params or {}).get('page') or query.get('page') or 1
+    return {'method': type, 'path': path_template(path),
+            'page': int(page)}
+
+
+class Events(object):
+    """
+        Hooks called around the requests made through a client:
+
+            before_request - a request is about to be sent
+            after_response - a response came back, with its status, size,
+                latency and the rate limit headers
+            retry - a response is retried after `delay` seconds
+            cache_hit - a response was served from the response cache
+            coalesced - a GET shared the response of an identical one
+                already in flight
+
+        Every hook is called with the event name and a dict describing the
+        request (method, path template, page...). Hooks run on the thread
+        making the request and must not raise. Nothing is built when no
+        hook listens.
+    """
+
+    def __init__(self):
+        self._hooks = dict((name, ()) for name in event_names)
+        self._lock = threading.Lock()
+
+    def on(self, name, hook):
+        """Call `hook(name, event)` on every `name` event"""
+        with self._lock:
+            self._hooks[name] = self._hooks[name] + (hook,)
+        return hook
+
+    def off(self, name, hook):
+        with self._lock:
+            self._hooks[name] = tuple(h for h in self._hooks[name]
+                                      if h is not hook)
+
+    def subscribe(self, hook, names=event_names):
+        """Call `hook(name, event)` on every event of `names`"""
+        for name in names:
+            self.on(name, hook)
+        return hook
+
+    def unsubscribe(self, hook):
+        for name in event_names:
+            self.off(name, hook)
+
+    def listening(self, name=None):
+        """Whether any hook (or any hook for `name`) is registered"""
+        if name is None:
+            return any(self._hooks.values())
+        return bool(self._hooks[name])
+
+    def emit(self, name, event):
+        for hook in self._hooks[name]:
+            hook(name, event)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    index = int(round(fraction * (len(values) - 1)))
+    return values[index]
+
+
+class Stats(object):
+    """
+        Aggregates the events of a client by endpoint: requests, statuses,
+        bytes received, latencies, time spent waiting on the rate limit,
+        retries, cache hits and requests coalesced.
+
+            stats = Stats().attach(default_events)
+            manager.get_all_droplets()
+            print(stats.table())
+    """
+
+    def __init__(self):
+        self.endpoints = {}
+        self._lock = threading.Lock()
+        self._events = None
+
+    def attach(self, events):
+        self._events = events
+        events.subscribe(self)
+        return self
+
+    def detach(self):
+        if self._events is not None:
+            self._events.unsubscribe(self)
+            self._events = None
+
+    def _endpoint(self, event):
+        key = (event['method'], event['path'])
+        endpoint = self.endpoints.get(key)
+        if endpoint is None:
+            endpoint = self.endpoints[key] = {
+                'requests': 0, 'statuses': {}, 'bytes': 0, 'latencies': [],
+                'waited': 0.0, 'retries': 0, 'cache_hits': 0,
+                'coalesced': 0}
+        return endpoint
+
+    def __call__(self, name, event):
+        if name == BEFORE_REQUEST:
+            return
+        with self._lock:
+            endpoint = self._endpoint(event)
+            if name == AFTER_RESPONSE:
+                endpoint['requests'] += 1
+                status = str(event['status'])
+                endpoint['statuses'][status] = \
+                    endpoint['statuses'].get(status, 0) + 1
+                endpoint['bytes'] += event['bytes']
+                endpoint['latencies'].append(event['latency'])
+                endpoint['waited'] += event['waited']
+            elif name == RETRY:
+                endpoint['retries'] += 1
+            elif name == CACHE_HIT:
+                endpoint['cache_hits'] += 1
+            elif name == COALESCED:
+                endpoint['coalesced'] += 1
+
+    def summary(self):
+        """One row per endpoint, the busiest first"""
+        rows = []
+        with self._lock:
+            for (method, path), endpoint in self.endpoints.items():
+                latencies = sorted(endpoint['latencies'])
+                rows.append({
+                    'method': method, 'path': path,
+                    'requests': endpoint['requests'],
+                    'statuses': dict(endpoint['statuses']),
+                    'bytes': endpoint['bytes'],
+                    'p50': percentile(latencies, 0.5),
+                    'p95': percentile(latencies, 0.95),
+                    'total': sum(latencies),
+                    'waited': endpoint['waited'],
+                    'retries': endpoint['retries'],
+                    'cache_hits': endpoint['cache_hits'],
+                    'coalesced': endpoint['coalesced'],
+                })
+        return sorted(rows, key=lambda r: (-r['total'], r['path']))
+
+    def table(self):
+        """The summary as a table, with a line of totals"""
+        rows = self.summary()
+        lines = ["%-6s %-28s %5s %7s %7s %8s %7s %5s %4s %6s" % (
+            "method", "endpoint", "reqs", "p50", "p95", "total", "kB",
+            "retry", "hits", "shared")]
+        row_format = "%-6s %-28s %5d %6.0fms %6.0fms %7.2fs %7.1f %5d %4d %6d"
+        for r in rows:
+            lines.append(row_format % (
+                r['method'], r['path'][:28], r['requests'],
+                r['p50'] * 1000, r['p95'] * 1000, r['total'],
+                r['bytes'] / 1024.0, r['retries'], r['cache_hits'],
+                r['coalesced']))
+        with self._lock:
+            latencies = sorted(latency for e in self.endpoints.values()
+                               for latency in e['latencies'])
+        lines.append(row_format % (
+            "", "total", len(latencies), percentile(latencies, 0.5) * 1000,
+            percentile(latencies, 0.95) * 1000, sum(latencies),
+            sum(r['bytes'] for r in rows) / 1024.0,
+            sum(r['retries'] for r in rows),
+            sum(r['cache_hits'] for r in rows),
+            sum(r['coalesced'] for r in rows)))
+        waited = sum(r['waited'] for r in rows)
+        if waited:
+            lines.append("%.2fs waiting on the rate limit" % waited)
+        return "\n".join(lines)
+
+    def prometheus(self):
+        """The summary in the Prometheus text exposition format"""
+        def labels(row, **extra):
+            pairs = [('method', row['method']), ('path', row['path'])]
+            pairs.extend(sorted(extra.items()))
+            return '{%s}' % ','.join('%s="%s"' % pair for pair in pairs)
+
+        rows = self.summary()
+        lines = []
+        metrics = [
+            ('pontoon_api_requests_total', 'counter',
+             'Requests sent to the API.'),
+            ('pontoon_api_request_seconds', 'summary',
+             'Latency of API requests.'),
+            ('pontoon_api_response_bytes_total', 'counter',
+             'Bytes received from the API.'),
+            ('pontoon_api_ratelimit_wait_seconds_total', 'counter',
+             'Time spent waiting on the rate limit.'),
+            ('pontoon_api_retries_total', 'counter',
+             'Requests retried after a 429 or server error.'),
+            ('pontoon_api_cache_hits_total', 'counter',
+             'Responses served from the response cache.'),
+            ('pontoon_api_coalesced_total', 'counter',
+             'Requests that shared an identical one in flight.'),
+        ]
+        for name, kind, help in metrics:
+            lines.append('# HELP %s %s' % (name, help))
+            lines.append('# TYPE %s %s' % (name, kind))
+            for r in rows:
+                if name == 'pontoon_api_requests_total':
+                    for status, count in sorted(r['statuses'].items()):
+                        lines.append('%s%s %d' % (
+                            name, labels(r, status=status), count))
+                elif name == 'pontoon_api_request_seconds':
+                    for quantile in ('0.5', '0.95'):
+                        lines.append('%s%s %.6f' % (
+                            name, labels(r, quantile=quantile),
+                            r['p%d' % int(float(quantile) * 100)]))
+                    lines.append('%s_sum%s %.6f' % (name, labels(r),
+                                                    r['total']))
+                    lines.append('%s_count%s %d' % (name, labels(r),
+                                                    r['requests']))
+                else:
+                    key = {'pontoon_api_response_bytes_total': 'bytes',
+                           'pontoon_api_ratelimit_wait_seconds_total':
+                               'waited',
+                           'pontoon_api_retries_total': 'retries',
+                           'pontoon_api_cache_hits_total': 'cache_hits',
+                           'pontoon_api_coalesced_total': 'coalesced'}[name]
+                    lines.append('%s%s %s' % (name, labels(r), r[key]))
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """
+            Write the summary to a textfile for the node exporter's
+            textfile collector, atomically so it's never read half written.
+        """
+        atomic_write(path, self.prometheus(), 0o644)
+
+
+class JSONLines(object):
+    """
+        Appends every event to a JSON lines file, one object per line with
+        the event name under 'event'.
+
+            JSONLines('requests.jsonl').attach(default_events)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+        self._events = None
+
+    def attach(self, events, names=(AFTER_RESPONSE, RETRY, CACHE_HIT)):
+        self._file = open(self.path, 'a')
+        self._events = events
+        events.subscribe(self, names)
+        return self
+
+    def detach(self):
+        if self._events is not None:
+            self._events.unsubscribe(self)
+            self._events = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __call__(self, name, event):
+        line = json.dumps(dict(event, event=name), sort_keys=True)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + '\n')
+                self._file.flush()
+
+
+default_events = Events()
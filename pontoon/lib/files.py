@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import os
+import hashlib
+import tempfile
+
+
+def token_key(token):
+    """Short, stable and non-reversible name for a token"""
+    return hashlib.sha256(token.encode('UTF-8')).hexdigest()[:16]
+
+
+def atomic_write(path, text, mode=None):
+    """
+        Replace the content of a file in one step, so other processes never
+        read it half written. Missing directories are created, private to
+        the user. Raises IOError or OSError when the file can't be written.
+
+        Args:
+            path: str - file to write
+            text: str - its new content
+            mode: int - permissions of the file, private to the user by
+                default
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory, 0o700)
+        except OSError:  # created by another process meanwhile
+            if not os.path.isdir(directory):
+                raise
+    fd, tmp = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        if mode is not None:
+            os.chmod(tmp, mode)
+        getattr(os, 'replace', os.rename)(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
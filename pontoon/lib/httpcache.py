@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import copy
+import json
+import time
+import atexit
+import threading
+
+from .files import token_key, atomic_write
+
+# Catalogue endpoints worth keeping: (name, path, condition on the params).
+# Only public image listings (filtered by type) are kept, private ones
+# change with every snapshot.
+cacheable = [
+    ('sizes', r'sizes/?', None),
+    ('regions', r'regions/?', None),
+    ('images', r'images/?', lambda params: 'type' in params),
+    ('kernels', r'droplets/\d+/kernels/?', None),
+]
+
+
+class ResponseCache(object):
+    """
+        On-disk copies of the catalogue responses seen by one token.
+
+        Each entry keeps the decoded body with its ETag. Fresh entries are
+        served without a request, stale ones are revalidated with
+        If-None-Match and served again when the API answers 304.
+
+        Args:
+            path: str - file holding the entries
+            ttl: int - seconds an entry is served without asking the API
+            refresh: bool - revalidate every entry, however recent
+    """
+
+    def __init__(self, path, ttl, refresh=False):
+        self.path = path
+        self.ttl = ttl
+        self.refresh = refresh
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    @staticmethod
+    def key(path, params):
+        return path + '?' + json.dumps(params or {}, sort_keys=True)
+
+    def get(self, path, params):
+        with self._lock:
+            return self.entries.get(self.key(path, params))
+
+    def fresh(self, entry):
+        return not self.refresh and \
+            time.time() - entry['fetched_at'] < self.ttl
+
+    def put(self, endpoint, path, params, etag, data):
+        """Store a response fetched from the API"""
+        with self._lock:
+            key = self.key(path, params)
+            entry = self.entries.get(key) or {
+                'endpoint': endpoint, 'hits': 0, 'revalidated': 0,
+                'fetched': 0, 'stale': 0}
+            entry.update(etag=etag, data=data, fetched_at=time.time())
+            entry['fetched'] += 1
+            self.entries[key] = entry
+            self._write()
+
+    def serve(self, entry, outcome):
+        """
+            Count how an entry was used ('hits', 'revalidated' or 'stale',
+            the latter when the API couldn't be reached) and return a copy
+            of its body, which callers are free to change.
+
+            Only a revalidation is written straight away; counters are
+            written with the next change, or by flush() at exit.
+        """
+        with self._lock:
+            entry[outcome] += 1
+            if outcome == 'revalidated':
+                entry['fetched_at'] = time.time()
+                self._write()
+            else:
+                self._dirty = True
+            return copy.deepcopy(entry['data'])
+
+    def flush(self):
+        """Write counters not written yet"""
+        with self._lock:
+            if self._dirty:
+                self._write()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)['responses']
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _write(self):
+        self._dirty = False
+        try:
+            atomic_write(self.path, json.dumps({'responses': self._entries}))
+        except (IOError, OSError):
+            pass
+
+
+class ResponseCaches(object):
+    """
+        One ResponseCache per token, shared by every object in the process.
+
+        Nothing is cached until enable() is called with a directory.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.ttl = 3600
+        self.refresh = False
+        self._caches = {}
+        self._lock = threading.Lock()
+        self._flush_registered = False
+        self._routes = [(name, re.compile('^%s$' % path), condition)
+                        for name, path, condition in cacheable]
+
+    def enable(self, directory, ttl=3600, refresh=False):
+        """
+            Keep catalogue responses under directory for ttl seconds,
+            revalidating them all first when refresh is set.
+        """
+        self.flush()
+        with self._lock:
+            self.directory = directory
+            self.ttl = ttl
+            self.refresh = refresh
+            self._caches.clear()
+
+    def disable(self):
+        self.flush()
+        with self._lock:
+            self.directory = None
+            self._caches.clear()
+
+    def endpoint(self, path, params):
+        """The name of a cacheable endpoint, or None"""
+        for name, pattern, condition in self._routes:
+            if pattern.match(path) and \
+                    (condition is None or condition(params)):
+                return name
+        return None
+
+    def get(self, token):
+        """The ResponseCache of a token, or None when disabled"""
+        with self._lock:
+            if self.directory is None:
+                return None
+            cache = self._caches.get(token)
+            if cache is None:
+                cache = ResponseCache(
+                    os.path.join(self.directory,
+                                 'responses-%s.json' % token_key(token)),
+                    self.ttl, self.refresh)
+                self._caches[token] = cache
+                if not self._flush_registered:
+                    atexit.register(self.flush)
+                    self._flush_registered = True
+            return cache
+
+    def flush(self):
+        """Write the counters of every cache in use"""
+        with self._lock:
+            caches = list(self._caches.values())
+        for cache in caches:
+            cache.flush()
+
+    def files(self):
+        """Paths of the response caches of every token"""
+        if self.directory is None or not os.path.isdir(self.directory):
+            return []
+        return [os.path.join(self.directory, f)
+                for f in sorted(os.listdir(self.directory))
+                if f.startswith('responses-') and f.endswith('.json')]
+
+    def stats(self):
+        """
+            Per endpoint totals over every token: entries, bytes, hits,
+            revalidated, fetched and stale.
+        """
+        self.flush()
+        totals = {}
+        for path in self.files():
+            cache = ResponseCache(path, self.ttl)
+            for entry in cache.entries.values():
+                stats = totals.setdefault(entry['endpoint'], dict(
+                    entries=0, bytes=0, hits=0, revalidated=0, fetched=0,
+                    stale=0))
+                stats['entries'] += 1
+                stats['bytes'] += len(json.dumps(entry['data']))
+                for counter in ('hits', 'revalidated', 'fetched', 'stale'):
+                    stats[counter] += entry[counter]
+        return totals
+
+    def clear(self):
+        """Remove every response cache, returning how many were removed"""
+        removed = 0
+        with self._lock:
+            for path in self.files():
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+            self._caches.clear()
+        return removed
+
+
+default_responses = ResponseCaches()
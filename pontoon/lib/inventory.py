@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import threading
+
+from .baseapi import DataReadError, RateLimitError, attributes
+from .Droplet import Droplet
+from .Image import Image
+from .Domain import Domain
+from .Record import Record
+from .SSHKey import SSHKey
+from .FloatingIP import FloatingIP
+from .Action import Action
+
+
+def _slug(value):
+    # Objects not loaded from the API default to an empty list.
+    return value.get('slug') if isinstance(value, dict) else value or None
+
+
+def _droplet_id(value):
+    return value.get('id') if isinstance(value, dict) else value
+
+
+# Indexed columns of every table, besides `attrs` (the JSON encoded
+# attributes of the object): (column, type, attrs -> value).
+columns = {
+    'droplets': (
+        ('id', 'INTEGER', lambda a: a['id']),
+        ('name', 'TEXT', lambda a: a.get('name')),
+        ('region', 'TEXT', lambda a: _slug(a.get('region'))),
+        ('status', 'TEXT', lambda a: a.get('status')),
+        ('ip_address', 'TEXT', lambda a: a.get('ip_address')),
+        ('private_ip_address', 'TEXT',
+         lambda a: a.get('private_ip_address')),
+        ('ip_v6_address', 'TEXT', lambda a: a.get('ip_v6_address')),
+    ),
+    'images': (
+        ('id', 'INTEGER', lambda a: a['id']),
+        ('name', 'TEXT', lambda a: a.get('name')),
+        ('slug', 'TEXT', lambda a: a.get('slug')),
+        ('distribution', 'TEXT', lambda a: a.get('distribution')),
+        ('public', 'INTEGER', lambda a: int(bool(a.get('public')))),
+    ),
+    'domains': (
+        ('name', 'TEXT', lambda a: a['name']),
+    ),
+    'records': (
+        ('domain', 'TEXT', lambda a: a['domain']),
+        ('id', 'INTEGER', lambda a: a['id']),
+        ('type', 'TEXT', lambda a: a.get('type')),
+        ('name', 'TEXT', lambda a: a.get('name')),
+    ),
+    'keys': (
+        ('id', 'INTEGER', lambda a: a['id']),
+        ('name', 'TEXT', lambda a: a.get('name')),
+        ('fingerprint', 'TEXT', lambda a: a.get('fingerprint')),
+    ),
+    'floating_ips': (
+        ('ip', 'TEXT', lambda a: a['ip']),
+        ('region', 'TEXT', lambda a: _slug(a.get('region'))),
+        ('droplet_id', 'INTEGER', lambda a: _droplet_id(a.get('droplet'))),
+    ),
+    'actions': (
+        ('id', 'INTEGER', lambda a: a['id']),
+        ('type', 'TEXT', lambda a: a.get('type')),
+        ('status', 'TEXT', lambda a: a.get('status')),
+        ('resource_type', 'TEXT', lambda a: a.get('resource_type')),
+        ('resource_id', 'INTEGER', lambda a: a.get('resource_id')),
+    ),
+}
+
+primary_keys = {
+    'droplets': 'id',
+    'images': 'id',
+    'domains': 'name',
+    'records': 'domain, id',
+    'keys': 'id',
+    'floating_ips': 'ip',
+    'actions': 'id',
+}
+
+indexes = (
+    ('droplets', 'name'),
+    ('droplets', 'region'),
+    ('droplets', 'status'),
+    ('droplets', 'ip_address'),
+    ('droplets', 'private_ip_address'),
+    ('droplets', 'ip_v6_address'),
+    ('droplet_tags', 'droplet_id'),
+    ('images', 'name'),
+    ('images', 'slug'),
+    ('records', 'name'),
+    ('keys', 'name'),
+    ('floating_ips', 'droplet_id'),
+    ('actions', 'status'),
+    ('actions', 'resource_id'),
+)
+
+models = {
+    'droplets': Droplet,
+    'images': Image,
+    'domains': Domain,
+    'records': Record,
+    'keys': SSHKey,
+    'floating_ips': FloatingIP,
+    'actions': Action,
+}
+
+
+def _schema():
+    statements = ['CREATE TABLE IF NOT EXISTS meta '
+                  '(key TEXT PRIMARY KEY, value TEXT)',
+                  'CREATE TABLE IF NOT EXISTS droplet_tags '
+                  '(tag TEXT, droplet_id INTEGER, '
+                  'PRIMARY KEY (tag, droplet_id))']
+    for table, cols in sorted(columns.items()):
+        statements.append(
+            'CREATE TABLE IF NOT EXISTS %s (%s, attrs TEXT NOT NULL, '
+            'PRIMARY KEY (%s))' % (
+                table, ', '.join('%s %s' % (c, t) for c, t, f in cols),
+                primary_keys[table]))
+    for table, column in indexes:
+        statements.append('CREATE INDEX IF NOT EXISTS %s_%s ON %s (%s)' % (
+                          table, column, table, column))
+    return statements
+
+
+class Inventory(object):
+    """
+        Local SQLite mirror of the Droplets, images, domains and their
+        records, SSH keys, floating IPs and actions of an account.
+
+        Lookups by name, tag, region, status or IP address are answered
+        from indexed tables instead of listing the account. sync() keeps
+        the mirror up to date: it reads the actions started since the last
+        sync, refetches the Droplets they touched, and lists a kind of
+        resource again only when an action changed it (private images,
+        floating IPs) or when its listing is older than `ttl`. Changes that
+        don't go through actions (tags, SSH keys, domains, a Droplet shut
+        down from inside) show up after `ttl` seconds, or with full=True.
+
+        Args:
+            manager: Manager - account to mirror
+            path: str - database file, or ':memory:'
+            ttl: int - seconds before a kind of resource is listed again
+    """
+
+    # Kinds of resources that sync() can be limited to. Records are
+    # listed along with their domains, actions on every sync.
+    kinds = ('droplets', 'images', 'domains', 'keys', 'floating_ips')
+
+    def __init__(self, manager, path=':memory:', ttl=3600):
+        # sqlite3 is only needed by the commands keeping an inventory.
+        import sqlite3
+
+        self.manager = manager
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.RLock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            for statement in _schema():
+                self._db.execute(statement)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def sync(self, kinds=None, full=False):
+        """
+            Bring the mirror up to date and return what was done: the
+            number of new actions, the kinds listed again and the number of
+            Droplets refetched.
+
+            Args:
+                kinds: tuple - the kinds to update, every kind by default.
+                    Others touched by new actions are listed again on
+                    their next sync.
+                full: bool - list every kind again, however recent
+        """
+        kinds = self.kinds if kinds is None else kinds
+        with self._lock:
+            last = self._meta('last_action_id')
+            new = self.manager.get_actions_since(
+                None if last is None else int(last))
+            # Actions still running last time may have changed things since.
+            seen = set(a.id for a in new)
+            pending = [i for i in self._ids('actions', status='in-progress')
+                       if i not in seen]
+            actions = new + [a for a in self.manager.map(self._action, pending)
+                             if a is not None]
+
+            stale = set(k for k in kinds if full or not self._fresh(k))
+            droplet_ids, touched = self._touched(actions)
+            if droplet_ids:
+                touched.add('droplets')
+            for kind in touched.difference(kinds):
+                self._expire(kind)
+
+            if 'droplets' in stale:
+                self._replace('droplets', self.manager.get_all_droplets())
+            elif 'droplets' in kinds and droplet_ids:
+                self._refetch(sorted(droplet_ids))
+            if 'images' in stale:
+                self._replace('images', self.manager.get_global_images()
+                              + self.manager.get_my_images())
+            elif 'images' in kinds and 'images' in touched:
+                self._replace('images', self.manager.get_my_images(),
+                              where=('public = 0', ()))
+            if 'floating_ips' in stale or \
+                    'floating_ips' in kinds and 'floating_ips' in touched:
+                self._replace('floating_ips',
+                              self.manager.get_all_floating_ips())
+                stale.add('floating_ips')
+            if 'domains' in stale:
+                domains = self.manager.get_all_domains()
+                records = self.manager.map(lambda d: d.get_records(), domains)
+                self._replace('domains', domains)
+                self._replace('records', [r for rs in records for r in rs])
+            if 'keys' in stale:
+                self._replace('keys', self.manager.get_all_sshkeys())
+
+            with self._db:
+                self._store('actions', actions)
+                if new:
+                    self._set_meta('last_action_id', max(seen))
+                elif last is None:
+                    self._set_meta('last_action_id', 0)
+                for kind in stale:
+                    self._set_meta('synced_at:%s' % kind, time.time())
+
+            return {'actions': len(new), 'listed': sorted(stale),
+                    'droplets': 0 if 'droplets' in stale
+                    else len(droplet_ids)}
+
+    def put(self, obj):
+        """
+            Store a single object just fetched from the API, e.g. a Droplet
+            reloaded for its current status.
+        """
+        kind = [k for k, cls in models.items() if isinstance(obj, cls)][0]
+        with self._lock:
+            with self._db:
+                self._store(kind, [obj])
+
+    def droplets(self, name=None, tag=None, region=None, status=None,
+                 ip=None, raw=False):
+        """
+            Return the Droplets matching every given filter. `ip` may be a
+            public, private or IPv6 address. Like the other lookups, raw
+            returns the stored attributes as dicts rather than objects.
+        """
+        where = self._where(name=name, region=region, status=status)
+        if tag is not None:
+            where.append(('id IN (SELECT droplet_id FROM droplet_tags '
+                          'WHERE tag = ?)', (tag,)))
+        if ip is not None:
+            where.append(('(ip_address = ? OR private_ip_address = ? OR '
+                          'ip_v6_address = ?)', (ip, ip, ip)))
+        return self._select('droplets', where, raw=raw)
+
+    def images(self, name=None, slug=None, distribution=None, public=None,
+               raw=False):
+        """Return the images matching every given filter"""
+        return self._select('images', self._where(
+            name=name, slug=slug, distribution=distribution,
+            public=None if public is None else int(bool(public))), raw=raw)
+
+    def domains(self, name=None, raw=False):
+        return self._select('domains', self._where(name=name), raw=raw)
+
+    def records(self, domain=None, name=None, type=None, raw=False):
+        return self._select('records', self._where(
+            domain=domain, name=name, type=type), raw=raw)
+
+    def keys(self, name=None, fingerprint=None, raw=False):
+        return self._select('keys', self._where(
+            name=name, fingerprint=fingerprint), raw=raw)
+
+    def floating_ips(self, ip=None, region=None, droplet_id=None,
+                     raw=False):
+        return self._select('floating_ips', self._where(
+            ip=ip, region=region, droplet_id=droplet_id), raw=raw)
+
+    def actions(self, resource_id=None, status=None, type=None, raw=False):
+        """Return the actions seen by sync(), newest first"""
+        return self._select('actions', self._where(
+            resource_id=resource_id, status=status, type=type),
+            order='id DESC', raw=raw)
+
+    def counts(self):
+        """Number of objects mirrored, by table"""
+        with self._lock:
+            return dict((table, self._db.execute(
+                'SELECT COUNT(*) FROM %s' % table).fetchone()[0])
+                for table in columns)
+
+    def _touched(self, actions):
+        """Droplets and other kinds changed by actions"""
+        droplet_ids, touched = set(), set()
+        for action in actions:
+            if action.resource_type == 'droplet':
+                droplet_ids.add(action.resource_id)
+                if action.type in ('snapshot', 'destroy'):
+                    touched.add('images')
+                if action.type == 'destroy':
+                    touched.add('floating_ips')
+            elif action.resource_type == 'image':
+                touched.add('images')
+            elif action.resource_type == 'floating_ip':
+                touched.add('floating_ips')
+        return droplet_ids, touched
+
+    def _refetch(self, droplet_ids):
+        """Reload Droplets, forgetting the ones that no longer exist"""
+        def fetch(droplet_id):
+            try:
+                return self.manager.get_droplet(droplet_id)
+            except RateLimitError:
+                raise
+            except DataReadError:  # destroyed
+                return None
+
+        droplets = self.manager.map(fetch, droplet_ids)
+        with self._db:
+            for droplet_id, droplet in zip(droplet_ids, droplets):
+                if droplet is None:
+                    self._delete('droplets', droplet_id)
+            self._store('droplets', [d for d in droplets if d is not None])
+
+    def _action(self, action_id):
+        try:
+            return self.manager.get_action(action_id)
+        except RateLimitError:
+            raise
+        except DataReadError:
+            return None
+
+    def _replace(self, table, objs, where=None):
+        """Replace the content of a table (or of its rows matching where)"""
+        clause, args = where or ('1', ())
+        with self._db:
+            if table == 'droplets':
+                self._db.execute('DELETE FROM droplet_tags')
+            self._db.execute('DELETE FROM %s WHERE %s' % (table, clause),
+                             args)
+            self._store(table, objs)
+
+    def _store(self, table, objs):
+        cols = columns[table]
+        rows = []
+        for obj in objs:
+            attrs = attributes(obj)
+            rows.append([f(attrs) for c, t, f in cols]
+                        + [json.dumps(attrs)])
+            if table == 'droplets':
+                self._db.execute('DELETE FROM droplet_tags '
+                                 'WHERE droplet_id = ?', (attrs['id'],))
+                self._db.executemany(
+                    'INSERT OR IGNORE INTO droplet_tags VALUES (?, ?)',
+                    [(tag, attrs['id']) for tag in attrs.get('tags') or []])
+        self._db.executemany(
+            'INSERT OR REPLACE INTO %s (%s, attrs) VALUES (%s)' % (
+                table, ', '.join(c for c, t, f in cols),
+                ', '.join('?' * (len(cols) + 1))), rows)
+
+    def _delete(self, table, id):
+        if table == 'droplets':
+            self._db.execute('DELETE FROM droplet_tags WHERE droplet_id = ?',
+                             (id,))
+        self._db.execute('DELETE FROM %s WHERE id = ?' % table, (id,))
+
+    @staticmethod
+    def _where(**filters):
+        return [('%s = ?' % column, (value,))
+                for column, value in sorted(filters.items())
+                if value is not None]
+
+    def _select(self, table, where, order='rowid', raw=False):
+        query = 'SELECT attrs FROM %s' % table
+        args = []
+        if where:
+            query += ' WHERE ' + ' AND '.join(clause for clause, a in where)
+            for clause, a in where:
+                args.extend(a)
+        with self._lock:
+            rows = self._db.execute(query + ' ORDER BY ' + order,
+                                    args).fetchall()
+        if raw:
+            return [json.loads(attrs) for attrs, in rows]
+        cls = models[table]
+        return [cls(token=self.manager.token, mocked=self.manager.mocked,
+                    client=self.manager._client, **json.loads(attrs))
+                for attrs, in rows]
+
+    def _ids(self, table, **filters):
+        where = self._where(**filters)
+        query = 'SELECT id FROM %s' % table
+        if where:
+            query += ' WHERE ' + ' AND '.join(clause for clause, a in where)
+        return [row[0] for row in self._db.execute(
+            query, [a for clause, args in where for a in args])]
+
+    def _meta(self, key):
+        row = self._db.execute('SELECT value FROM meta WHERE key = ?',
+                               (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self._db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                         (key, str(value)))
+
+    def _fresh(self, kind):
+        synced_at = self._meta('synced_at:%s' % kind)
+        return synced_at is not None and \
+            time.time() - float(synced_at) < self.ttl
+
+    def _expire(self, kind):
+        with self._db:
+            self._db.execute('DELETE FROM meta WHERE key = ?',
+                             ('synced_at:%s' % kind,))
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+
+class SessionPool(object):
+    """
+        Shared pool of keep-alive HTTP sessions.
+
+        One requests.Session is kept for every (token, end_point) pair, so
+        every object talking to the same account reuses the same TCP/TLS
+        connections instead of performing a new handshake per request.
+
+        Args:
+            pool_maxsize: int - connections kept open per host
+            max_sessions: int - sessions kept before the least recently
+                used one is dropped
+            idle_timeout: int - seconds a session may stay unused before it
+                is dropped
+    """
+
+    def __init__(self, pool_maxsize=10, max_sessions=8, idle_timeout=60):
+        self.pool_maxsize = pool_maxsize
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def configure(self, pool_maxsize=None, max_sessions=None,
+                  idle_timeout=None):
+        """
+            Change the pool limits. Sessions already open are dropped so
+            the new limits apply to every subsequent request.
+        """
+        with self._lock:
+            if pool_maxsize is not None:
+                self.pool_maxsize = pool_maxsize
+            if max_sessions is not None:
+                self.max_sessions = max_sessions
+            if idle_timeout is not None:
+                self.idle_timeout = idle_timeout
+            self._sessions.clear()
+
+    def session(self, token, end_point):
+        """
+            Return the session shared by every caller using this token
+            against this end point, creating it when needed.
+        """
+        key = (token, end_point)
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            entry = self._sessions.get(key)
+            if entry is None:
+                if len(self._sessions) >= self.max_sessions:
+                    oldest = min(self._sessions,
+                                 key=lambda k: self._sessions[k][1])
+                    del self._sessions[oldest]
+                entry = [self._new_session(), now]
+                self._sessions[key] = entry
+            entry[1] = now
+            return entry[0]
+
+    def close(self):
+        """
+            Close every open session.
+        """
+        with self._lock:
+            self._close_all()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _new_session(self):
+        # requests is slow to import, only pay for it when it's used
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1,
+                              pool_maxsize=self.pool_maxsize)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _evict(self, now):
+        # Sessions are dropped rather than closed: another thread may be
+        # in the middle of a request with one. Their connections are
+        # closed once nobody holds them any more.
+        if not self.idle_timeout:
+            return
+        for key, (session, last_used) in list(self._sessions.items()):
+            if now - last_used > self.idle_timeout:
+                del self._sessions[key]
+
+    def _close_all(self):
+        for session, last_used in self._sessions.values():
+            session.close()
+        self._sessions.clear()
+
+
+# Process wide pool used by every BaseAPI object unless told otherwise.
+default_pool = SessionPool()
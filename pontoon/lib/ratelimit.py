@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from .files import token_key
+
+
+class RateLimiter(object):
+    """
+        Request budget of a single token, as reported by the API.
+
+        DigitalOcean sends RateLimit-Limit, RateLimit-Remaining and
+        RateLimit-Reset with every response. The limiter mirrors them,
+        spends one request from the budget before each call, and once only
+        `reserve` requests are left it makes callers wait for the reset
+        instead of letting them run into 429s.
+
+        Args:
+            reserve: int - requests kept in hand before throttling
+    """
+
+    def __init__(self, reserve=10):
+        self.reserve = reserve
+        self.limit = None
+        self.remaining = None
+        self.reset = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+            Take one request from the budget, sleeping first when the
+            budget is exhausted. Returns the seconds waited.
+        """
+        with self._shared():
+            wait = self._delay(time.time())
+            if self.remaining is not None:
+                self.remaining -= 1
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def update(self, headers):
+        """
+            Record the budget reported in a response's headers.
+        """
+        try:
+            limit = int(headers['RateLimit-Limit'])
+            remaining = int(headers['RateLimit-Remaining'])
+            reset = int(headers['RateLimit-Reset'])
+        except (KeyError, TypeError, ValueError):
+            return
+        with self._shared():
+            self.limit, self.remaining, self.reset = limit, remaining, reset
+
+    def exhausted(self, reset=None):
+        """
+            Mark the budget as spent, e.g. after a 429.
+        """
+        with self._shared():
+            self.remaining = 0
+            if reset is not None:
+                self.reset = reset
+
+    def budget(self):
+        """
+            Return the current budget as a dict with limit, remaining and
+            reset (a unix timestamp). Values are None until the API has
+            reported them.
+        """
+        with self._shared(write=False):
+            return {'limit': self.limit, 'remaining': self.remaining,
+                    'reset': self.reset}
+
+    def _shared(self, write=True):
+        """
+            Context guarding the figures while they are read or changed.
+        """
+        return self._lock
+
+    def _delay(self, now):
+        if self.remaining is None or self.reset is None:
+            return 0
+        if now >= self.reset:
+            # A new window started, the API will report the real figures.
+            if self.limit is not None:
+                self.remaining = self.limit
+            return 0
+        if self.remaining > self.reserve:
+            return 0
+        return self.reset - now
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+        RateLimiter whose budget lives in a file, so every process using
+        the same token paces itself against the same figures.
+
+        The file is locked for the duration of each read-modify-write, and
+        every request taken by any process is deducted from the budget
+        until the API reports a new one. When the file can't be opened
+        the limiter carries on with its own figures, like a RateLimiter.
+
+        Args:
+            path: str - file holding the shared budget
+            reserve: int - requests kept in hand before throttling
+    """
+
+    def __init__(self, path, reserve=10):
+        super(SharedRateLimiter, self).__init__(reserve=reserve)
+        self.path = path
+
+    def _shared(self, write=True):
+        return _SharedState(self, write)
+
+
+class _SharedState(object):
+    """
+        Context manager loading a SharedRateLimiter's figures from its file
+        under an exclusive lock, and saving them back on exit.
+    """
+
+    def __init__(self, limiter, write):
+        self.limiter = limiter
+        self.write = write
+        self.f = None
+
+    def __enter__(self):
+        limiter = self.limiter
+        limiter._lock.acquire()
+        try:
+            self.f = self._open(limiter.path)
+        except (IOError, OSError):
+            # No shared file (e.g. the cache directory can't be written):
+            # carry on with the figures this process already has.
+            self.f = None
+            return self
+        except BaseException:
+            limiter._lock.release()
+            raise
+        try:
+            state = json.loads(self.f.read() or '{}')
+        except ValueError:
+            state = {}
+        limiter.limit = state.get('limit')
+        limiter.remaining = state.get('remaining')
+        limiter.reset = state.get('reset')
+        return self
+
+    @staticmethod
+    def _open(path):
+        """The budget file, opened and exclusively locked"""
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory, 0o700)
+            except OSError:  # created by another process meanwhile
+                pass
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        f = os.fdopen(fd, 'r+')
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            f.close()
+            raise
+        return f
+
+    def __exit__(self, *exc):
+        limiter = self.limiter
+        try:
+            if self.f is not None and self.write:
+                self.f.seek(0)
+                self.f.truncate()
+                self.f.write(json.dumps({'limit': limiter.limit,
+                                         'remaining': limiter.remaining,
+                                         'reset': limiter.reset}))
+                self.f.flush()
+        except (IOError, OSError):
+            pass
+        finally:
+            if self.f is not None:
+                fcntl.flock(self.f.fileno(), fcntl.LOCK_UN)
+                self.f.close()
+                self.f = None
+            limiter._lock.release()
+
+
+class RateLimiters(object):
+    """
+        One RateLimiter per token, shared by every object in the process.
+
+        After share() is called, new limiters keep their budget in a file
+        under the given directory, shared with every other process that
+        does the same.
+    """
+
+    def __init__(self, reserve=10):
+        self.reserve = reserve
+        self.directory = None
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def share(self, directory):
+        """
+            Share budgets with other processes through files in directory.
+            Returns False where file locking isn't available.
+        """
+        if fcntl is None:
+            return False
+        with self._lock:
+            self.directory = directory
+            self._limiters.clear()
+        return True
+
+    def get(self, token):
+        with self._lock:
+            limiter = self._limiters.get(token)
+            if limiter is None:
+                if self.directory is not None:
+                    path = os.path.join(self.directory, 'ratelimit-%s.json'
+                                        % token_key(token))
+                    limiter = SharedRateLimiter(path, reserve=self.reserve)
+                else:
+                    limiter = RateLimiter(reserve=self.reserve)
+                self._limiters[token] = limiter
+            return limiter
+
+
+default_limiters = RateLimiters()
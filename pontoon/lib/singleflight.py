@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+
+
+class FlightAborted(Exception):
+    """The identical request a caller was waiting on was interrupted"""
+
+
+class _Flight(object):
+    """
+        A request in flight, and its outcome once it lands. `landed` is
+        held by the caller sending it until then: a plain lock is much
+        cheaper to create than an Event, and this is done per request.
+    """
+
+    __slots__ = ('landed', 'response', 'error')
+
+    def __init__(self):
+        self.landed = threading.Lock()
+        self.landed.acquire()
+        self.response = None
+        self.error = None
+
+    def wait(self):
+        self.landed.acquire()
+        self.landed.release()
+
+
+class SingleFlight(object):
+    """
+        Lets identical GETs made at the same time share one request.
+
+        The first caller sends the request; callers asking for the same
+        url, parameters and headers with the same client before it returns
+        wait for it and get the same response (or exception) instead of
+        sending their own. Only the response is shared: each caller
+        decodes its own copy of the body.
+
+        Args:
+            enabled: bool - coalesce requests, otherwise every caller
+                sends its own
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._sent = 0
+        self._coalesced = 0
+
+    @staticmethod
+    def key(client, url, params, headers):
+        """Requests are identical when made with the same Client"""
+        key = (client, url,
+               frozenset(params.items()) if params else None,
+               frozenset(headers.items()) if headers else None)
+        try:
+            hash(key)
+        except TypeError:  # a list or dict parameter
+            key = (client, url, json.dumps(params, sort_keys=True,
+                                           default=str),
+                   json.dumps(headers, sort_keys=True))
+        return key
+
+    def do(self, key, send):
+        """
+            Return send(), or the response of the identical request
+            already in flight. Returns (response, shared).
+        """
+        if not self.enabled:
+            return send(), False
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.response, True
+
+        try:
+            flight.response = send()
+        except Exception as e:
+            flight.error = e
+            raise
+        except BaseException:
+            # KeyboardInterrupt, SystemExit...: only the leader's thread
+            # should see those, its followers just lose their response.
+            flight.error = FlightAborted()
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                self._sent += 1
+            flight.landed.release()
+        return flight.response, False
+
+    def stats(self):
+        """
+            Requests sent through the coalescer, calls that shared one of
+            them instead, and requests in flight right now.
+        """
+        with self._lock:
+            return {'sent': self._sent, 'coalesced': self._coalesced,
+                    'in_flight': len(self._flights)}
+
+    def reset(self):
+        with self._lock:
+            self._sent = self._coalesced = 0
+
+
+# Process wide coalescer used by every BaseAPI object unless told otherwise.
+default_flights = SingleFlight()
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import json
+import logging
+import threading
+
+try:
+    from urlparse import urljoin
+except ImportError:
+    from urllib.parse import urljoin
+
+GET = 'GET'
+POST = 'POST'
+DELETE = 'DELETE'
+PUT = 'PUT'
+
+
+class Response(object):
+    """
+        The parts of requests.Response that BaseAPI relies on, for
+        transports that don't go over HTTP.
+    """
+
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.text = body or ''
+        self.headers = headers or {}
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def content(self):
+        return self.text.encode('UTF-8')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class HTTPTransport(object):
+    """
+        Sends requests to the API over the caller's pooled session.
+    """
+
+    def send(self, api, type, url, params, headers=None):
+        if "https" not in url:
+            url = urljoin(api.end_point, url)
+
+        # keep-alive session shared by every object using this token
+        session = api.pool.session(api.token, api.end_point)
+
+        # lookup table to find out the apropriate requests method,
+        # headers and payload type (json or query parameters)
+        def identity(x):
+            return x
+
+        def json_dumps(x):
+            return json.dumps(x)
+
+        lookup = {
+            GET: (session.get, {}, 'params', identity),
+            POST: (session.post, {'Content-type': 'application/json'}, 'data',
+                   json_dumps),
+            PUT: (session.put, {'Content-type': 'application/json'}, 'data',
+                  json_dumps),
+            DELETE: (session.delete,
+                     {'content-type': 'application/x-www-form-urlencoded'},
+                     'params', identity),
+        }
+
+        requests_method, extra_headers, payload, transform = lookup[type]
+        headers = dict(extra_headers, **(headers or {}))
+        headers.update({'Authorization': 'Bearer ' + api.token})
+        kwargs = {'headers': headers, payload: transform(params)}
+        log_request(api, type, url, payload, params, headers)
+
+        return requests_method(url, **kwargs)
+
+
+def log_request(api, type, url, payload, params, headers):
+    """Log a request at debug level, without its token"""
+    if not api._log.isEnabledFor(logging.DEBUG):
+        return
+    headers_str = str(headers).replace(api.token.strip(), 'TOKEN')
+    api._log.debug('%s %s %s:%s %s', type, url, payload, params,
+                   headers_str, extra={'trace': {
+                       'method': type, 'url': url, 'params': params}})
+
+
+def _path(api, url):
+    """Path of a request relative to the API end point, without query"""
+    if url.startswith(api.end_point):
+        url = url[len(api.end_point):]
+    return url.split('?', 1)[0]
+
+
+def _param(name, value):
+    return lambda params: params.get(name) == value
+
+
+def _has_param(name):
+    return lambda params: name in params
+
+
+# (method, path, condition on the parameters, fixture, status)
+# The first matching route wins.
+fixture_routes = [
+    (GET, r'account/?', None, 'account/account.json', 200),
+    (GET, r'actions/?', None, 'actions/multi.json', 200),
+    (GET, r'actions/\d+/?', None, 'actions/ipv6_completed.json', 200),
+    (GET, r'droplets/?', None, 'droplets/all.json', 200),
+    (GET, r'droplets/\d+/?', None, 'droplets/single.json', 200),
+    (GET, r'droplets/\d+/actions/?', None, 'actions/multi.json', 200),
+    (GET, r'droplets/\d+/actions/\d+/?', None,
+     'actions/ipv6_completed.json', 200),
+    (GET, r'droplets/\d+/kernels/?', None, 'kernels/list.json', 200),
+    (GET, r'images/?', _param('private', 'true'), 'images/private.json', 200),
+    (GET, r'images/?', _param('type', 'distribution'),
+     'images/distro.json', 200),
+    (GET, r'images/?', _param('type', 'application'), 'images/app.json', 200),
+    (GET, r'images/?', None, 'images/all.json', 200),
+    (GET, r'images/[^/]+/?', None, 'images/single.json', 200),
+    (GET, r'domains/?', None, 'domains/all.json', 200),
+    (GET, r'domains/[^/]+/?', None, 'domains/single.json', 200),
+    (GET, r'domains/[^/]+/records/?', None, 'domains/records.json', 200),
+    (GET, r'account/keys/?', None, 'keys/all.json', 200),
+    (GET, r'account/keys/[^/]+/?', None, 'keys/single.json', 200),
+    (GET, r'regions/?', None, 'regions/all.json', 200),
+    (GET, r'sizes/?', None, 'sizes/all.json', 200),
+    (GET, r'floating_ips/?', None, 'floatingip/list.json', 200),
+    (GET, r'floating_ips/[^/]+/?', None, 'floatingip/single.json', 200),
+    (POST, r'droplets/?', _has_param('names'),
+     'droplet_actions/create_multiple.json', 202),
+    (POST, r'droplets/?', None, 'droplet_actions/create.json', 202),
+    (POST, r'droplets/actions/?', None, 'droplet_actions/tagged.json', 201),
+    (POST, r'droplets/\d+/actions/?', None, 'droplet_actions/%(type)s.json',
+     201),
+    (POST, r'images/\d+/actions/?', None, 'actions/ipv6_completed.json', 201),
+    (POST, r'domains/?', None, 'domains/create.json', 201),
+    (POST, r'domains/[^/]+/records/?', None, 'domains/create_record.json',
+     201),
+    (POST, r'account/keys/?', None, 'keys/single.json', 201),
+    (POST, r'floating_ips/?', None, 'floatingip/single.json', 202),
+    (POST, r'floating_ips/[^/]+/actions/?', None,
+     'floatingip/%(type)s.json', 201),
+    (PUT, r'images/\d+/?', None, 'images/single.json', 200),
+    (PUT, r'account/keys/[^/]+/?', None, 'keys/single.json', 200),
+    (DELETE, r'.*', None, None, 204),
+]
+
+
+class FixtureTransport(object):
+    """
+        Answers requests from the JSON fixtures in pontoon/lib/data.
+
+        Fixtures are picked by method and path (and, for a few listings
+        and actions, by parameter) from a routing table, and each file is
+        read from disk only once. Nothing is stored on the objects making
+        the requests, so it is safe to use from many threads at once.
+    """
+
+    data_dir = os.path.join(os.path.dirname(__file__), 'data')
+
+    def __init__(self, routes=None):
+        self.routes = [
+            (method, re.compile('^%s$' % path), condition, fixture, status)
+            for method, path, condition, fixture, status in
+            (fixture_routes if routes is None else routes)]
+        self._fixtures = {}
+        self._lock = threading.Lock()
+
+    def route(self, type, path, params):
+        """
+            Return the fixture and status answering a request, or
+            (None, 404) when no route matches.
+        """
+        for method, pattern, condition, fixture, status in self.routes:
+            if method != type or not pattern.match(path):
+                continue
+            if condition is not None and not condition(params):
+                continue
+            if fixture is not None and '%(' in fixture:
+                fixture = fixture % params
+            return fixture, status
+        return None, 404
+
+    def load(self, fixture):
+        """
+            Return the content of a fixture file, cached after first use.
+        """
+        with self._lock:
+            if fixture not in self._fixtures:
+                path = os.path.join(self.data_dir, fixture)
+                with open(path, 'r') as f:
+                    self._fixtures[fixture] = f.read()
+            return self._fixtures[fixture]
+
+    def send(self, api, type, url, params, headers=None):
+        path = _path(api, url)
+        fixture, status = self.route(type, path, params or {})
+        api._log.debug("MOCK - %s %s returning data from %s",
+                       type, path, fixture)
+
+        if status == 404:
+            body = json.dumps({'id': 'not_found', 'message':
+                               'No fixture for %s %s' % (type, path)})
+            return Response(404, body)
+        try:
+            body = self.load(fixture) if fixture else None
+        except IOError:
+            body = json.dumps({'id': 'not_found', 'message':
+                               'No fixture %s' % fixture})
+            return Response(404, body)
+        return Response(status, body)
+
+
+def _key(type, path, params):
+    return json.dumps([type, path, params or {}], sort_keys=True)
+
+
+class RecordingTransport(object):
+    """
+        Sends requests through another transport and appends every
+        exchange to a JSON lines file that ReplayTransport can serve.
+
+        Args:
+            path: str - file to append to
+            inner: transport actually sending the requests
+    """
+
+    def __init__(self, path, inner=None):
+        self.path = path
+        self.inner = inner or HTTPTransport()
+        self._lock = threading.Lock()
+
+    def send(self, api, type, url, params, headers=None):
+        response = self.inner.send(api, type, url, params, headers)
+        path = _path(api, url)
+        record = {
+            'method': type,
+            'path': path,
+            'params': params or {},
+            'status': response.status_code,
+            'headers': dict((k, v) for k, v in response.headers.items()
+                            if k.lower().startswith('ratelimit')),
+            'body': response.text,
+        }
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record, sort_keys=True) + '\n')
+        return response
+
+
+class ReplayTransport(object):
+    """
+        Serves the exchanges saved by RecordingTransport.
+
+        Identical requests get their recorded responses in order, the
+        last one being repeated once they run out.
+
+        Args:
+            path: str - file written by RecordingTransport
+    """
+
+    def __init__(self, path):
+        self._responses = {}
+        self._lock = threading.Lock()
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                key = _key(record['method'], record['path'],
+                           record['params'])
+                self._responses.setdefault(key, []).append(record)
+
+    def send(self, api, type, url, params, headers=None):
+        path = _path(api, url)
+        with self._lock:
+            recorded = self._responses.get(_key(type, path, params))
+            if not recorded:
+                body = json.dumps({'id': 'not_found', 'message':
+                                   'Nothing recorded for %s %s' %
+                                   (type, path)})
+                return Response(404, body)
+            record = recorded.pop(0) if len(recorded) > 1 else recorded[0]
+        return Response(record['status'], record['body'], record['headers'])
+
+
+# Used by every BaseAPI object without a transport of its own.
+default_http = HTTPTransport()
+default_fixtures = FixtureTransport()
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+import random
+import time
+
+from .Action import Action
+from .baseapi import BaseAPI
+
+IN_PROGRESS = u'in-progress'
+COMPLETED = u'completed'
+ERRORED = u'errored'
+
+
+class WaitResult(object):
+    """
+        Outcome of an ActionWaiter: every action ends up in exactly one of
+        completed, errored or timed_out.
+    """
+
+    def __init__(self, completed, errored, timed_out):
+        self.completed = completed
+        self.errored = errored
+        self.timed_out = timed_out
+
+    @property
+    def ok(self):
+        return not self.errored and not self.timed_out
+
+    def __str__(self):
+        return "%s completed, %s errored, %s timed out" % (
+            len(self.completed), len(self.errored), len(self.timed_out))
+
+
+class ActionWaiter(BaseAPI):
+    """
+        Wait for many actions at once.
+
+        Pending actions are polled together once per round, with a jittered
+        exponential delay between rounds. When many actions are pending, a
+        single request for the account's most recent actions refreshes all
+        of those it contains, and only the remaining ones are requested one
+        by one.
+
+        Args:
+            actions: [Action or int] - actions, or action ids, to wait for
+
+        Optional Args:
+            timeout - int : seconds before giving up on pending actions,
+                None waits forever.
+            initial_delay - float : seconds to wait before the first poll
+            max_delay - float : upper bound of the delay between polls
+            factor - float : growth of the delay after each round
+            jitter - float : fraction of the delay randomly taken off, so
+                many waiters don't poll in lockstep.
+            coalesce_over - int : pending actions above which they are
+                refreshed from the account's action listing.
+            sleep - callable : called with the seconds to wait between
+                rounds.
+    """
+
+    def __init__(self, actions, *args, **kwargs):
+        self.timeout = None
+        self.initial_delay = 1
+        self.max_delay = 30
+        self.factor = 2
+        self.jitter = 0.5
+        self.coalesce_over = 10
+        self.sleep = time.sleep
+
+        super(ActionWaiter, self).__init__(*args, **kwargs)
+
+        self.actions = [self.__action(a) for a in actions]
+        self.completed = []
+        self.errored = []
+        self.timed_out = []
+
+    def __action(self, action):
+        if isinstance(action, Action):
+            return action
+        return Action(token=self.token, id=action, mocked=self.mocked,
+                      client=self._client)
+
+    def as_completed(self):
+        """
+            Yield actions as soon as each one completes or errors. Once the
+            timeout is reached, the actions still in progress are left in
+            self.timed_out.
+        """
+        deadline = self.deadline()
+
+        # Actions known only by id have to be fetched before anything else.
+        for action in self.actions:
+            if action.status is None:
+                action.load()
+
+        pending = self.actions
+        delay = self.initial_delay
+        while True:
+            pending, landed = self.settle(pending)
+            for action in landed:
+                yield action
+            if not pending:
+                return
+
+            wait = self.backoff(delay, deadline)
+            if wait is None:
+                self.timed_out.extend(pending)
+                return
+            self.sleep(wait)
+            delay = min(delay * self.factor, self.max_delay)
+
+            for action in self.refresh(pending):
+                action.load()
+
+    def wait(self, callback=None):
+        """
+            Wait for every action and return a WaitResult.
+
+            Optional Args:
+                callback - callable : called with each action as it
+                    completes or errors.
+        """
+        for action in self.as_completed():
+            if callback is not None:
+                callback(action)
+        return self.result()
+
+    def result(self):
+        return WaitResult(self.completed, self.errored, self.timed_out)
+
+    def deadline(self):
+        """Time at which pending actions are given up on, or None"""
+        if self.timeout is None:
+            return None
+        return time.time() + self.timeout
+
+    def settle(self, pending):
+        """
+            File the actions that completed or errored, and return those
+            still in progress and those that just landed.
+        """
+        still_pending, landed = [], []
+        for action in pending:
+            if action.status == IN_PROGRESS:
+                still_pending.append(action)
+                continue
+            if action.status == COMPLETED:
+                self.completed.append(action)
+            else:
+                self.errored.append(action)
+            landed.append(action)
+        return still_pending, landed
+
+    def backoff(self, delay, deadline):
+        """
+            Seconds to wait before the next round, jittered, or None once
+            the deadline has passed.
+        """
+        wait = delay * (1 - self.jitter * random.random())
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            wait = min(wait, remaining)
+        return wait
+
+    def refresh(self, pending):
+        """
+            Refresh pending actions from the account's most recent actions
+            when there are many of them. Returns the actions that still
+            have to be loaded one by one.
+        """
+        if len(pending) <= self.coalesce_over:
+            return pending
+        recent = self.get_data("actions/", params={'per_page': 200})
+        by_id = dict((a.id, a) for a in pending)
+        for action_dict in recent.get('actions', []):
+            action = by_id.pop(action_dict['id'], None)
+            if action is not None:
+                for attr in action_dict.keys():
+                    setattr(action, attr, action_dict[attr])
+        return [a for a in pending if a.id in by_id]
@@ -1,15 +1,80 @@
 # -*- coding: utf-8 -*-
 
+import sys
+import json
 import logging
 import functools
 
+DEBUG = logging.DEBUG
+
 
 def debug(obj):
     logger = logging.getLogger(obj.__module__)
 
     @functools.wraps(obj)
     def log(*args, **kwargs):
-        key = str(args) + str(kwargs)
-        logger.debug("%s: %s" % (obj.__name__, key))
+        # Arguments are only formatted when the message will be seen.
+        if logger.isEnabledFor(DEBUG):
+            logger.debug("%s: %s%s", obj.__name__, args, kwargs)
         return obj(*args, **kwargs)
     return log
+
+
+class TraceFormatter(logging.Formatter):
+    """One JSON object per record, with the fields of its `trace` extra"""
+
+    def format(self, record):
+        entry = {
+            'time': round(record.created, 6),
+            'logger': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'trace', None) or {})
+        return json.dumps(entry, sort_keys=True, default=str)
+
+
+_trace = {}
+
+
+def trace(enabled=True, stream=None, path=None):
+    """Switch the structured trace on or off, at any time.
+
+    While it is on, every pontoon debug message and every API request
+    event (see pontoon.lib.events) is written to `stream` (stderr by
+    default), or appended to the file at `path`, as a line of JSON.
+    Switching it off restores the previous log level and closes the file;
+    logging closes it at exit otherwise.
+    """
+    logger = logging.getLogger('pontoon')
+    if 'handler' in _trace:
+        from .lib.events import default_events
+        default_events.unsubscribe(_trace.pop('hook'))
+        handler = _trace.pop('handler')
+        logger.removeHandler(handler)
+        if isinstance(handler, logging.FileHandler):
+            handler.close()
+        logger.setLevel(_trace.pop('level'))
+    if not enabled:
+        return False
+
+    from .lib.events import default_events
+    if path is not None:
+        handler = logging.FileHandler(path)
+    else:
+        handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(TraceFormatter())
+    events = logging.getLogger('pontoon.trace')
+
+    def hook(name, event):
+        events.debug(name, extra={'trace': event})
+
+    _trace.update(handler=handler, hook=hook, level=logger.level)
+    logger.addHandler(handler)
+    logger.setLevel(DEBUG)
+    default_events.subscribe(hook)
+    return True
+
+
+def tracing():
+    return 'handler' in _trace
@@ -2,14 +2,7 @@
 
 from __future__ import print_function
 
-# Windows / missing-readline compat
-try:
-    import readline
-except ImportError:
-    pass
-
 import socket
-import yaml
 import textwrap
 from os.path import (isfile, expanduser,
                      basename, splitext, join)
@@ -29,8 +22,21 @@ except NameError:
     user_input = input
 
 
+def enable_readline():
+    """Line editing for interactive prompts, where available"""
+    # Windows / missing-readline compat
+    try:
+        import readline
+    except ImportError:
+        pass
+
+
 # Borrowed from http://stackoverflow.com/questions/5121931
-def ordered_dump(data, stream=None, Dumper=yaml.Dumper, **kwds):
+def ordered_dump(data, stream=None, Dumper=None, **kwds):
+    import yaml
+    if Dumper is None:
+        Dumper = yaml.Dumper
+
     class OrderedDumper(Dumper):
         pass
 
@@ -42,18 +48,19 @@ def ordered_dump(data, stream=None, Dumper=yaml.Dumper, **kwds):
     return yaml.dump(data, stream, OrderedDumper, **kwds)
 
 
-def ticker():
+def ticker(seconds=1):
     """A loading/waiting indicator.
 
     Sends a '.' to the screen, resets, and sleeps.
     """
     stdout.write('.')
     stdout.flush()
-    sleep(1)
+    sleep(seconds)
 
 
 def ask_yesno(question):
     """Present a string as a yes/no question on an interactive prompt"""
+    enable_readline()
     question = "%s (y/n)" % question
     if user_input("%-15s: " % question).strip().lower() == 'y':
         return True
@@ -62,6 +69,7 @@ def ask_yesno(question):
 
 def ask(question):
     """Present a question with freeform input on an interactive prompt"""
+    enable_readline()
     question += ':'
     response = user_input("%-15s " % question)
     return response
@@ -106,26 +114,27 @@ def mask(text, masker='*'):
 
 
 def format_droplet_info(machine):
-    """Present Droplet information in a more human parseable format"""
+    """Present Droplet information in a more human parseable format
+
+    `machine` is a Droplet, or a Droplet from a raw listing: the API's
+    dict with its addresses added.
+    """
+    from .lib.baseapi import attributes
+    details = attributes(machine)
 
     d = OrderedDict()
-    d['id'] = machine.id
-    d['size'] = machine.size_slug
-    d['image'] = machine.image['slug']
-    d['region'] = machine.region['slug']
-    d['ip_address'] = machine.ip_address
-    d['status'] = machine.status
+    d['id'] = details['id']
+    d['size'] = details['size_slug']
+    d['image'] = details['image']['slug']
+    d['region'] = details['region']['slug']
+    d['ip_address'] = details.get('ip_address')
+    d['status'] = details['status']
 
     # Fields we want to remove / replace
-    redacted = ['token', 'end_point', 'image', 'region',
-                'size', 'mock_data', 'mock_status', 'mocked']
-    details = machine.__dict__.copy()
-    for k, v in machine.__dict__.items():
-        if k.startswith('_') or k in redacted:
-            del details[k]
-
+    redacted = ['image', 'region', 'size']
     for k, v in details.items():
-        d[k] = v
+        if not k.startswith('_') and k not in redacted:
+            d[k] = v
     return d
 
 
@@ -138,10 +147,11 @@ def format_event(action):
     e['started_at'] = action.started_at
     e['completed_at'] = action.completed_at
 
-    redacted = ['token', 'end_point', 'region',
-                'mock_data', 'mock_status', 'mocked']
-    details = action.__dict__.copy()
-    for k, v in action.__dict__.items():
+    redacted = ['region']
+    redacted.extend(getattr(action, 'client_attrs', ()))
+    from .lib.baseapi import attributes
+    details = attributes(action)
+    for k, v in list(details.items()):
         if k.startswith('_') or k in redacted:
             del details[k]
 
@@ -157,10 +167,10 @@ def format_item(item):
     i['id'] = item.id
     i['name'] = item.name
 
-    redacted = ['token', 'end_point',
-                'mock_data', 'mock_status', 'mocked']
-    details = item.__dict__.copy()
-    for k, v in item.__dict__.items():
+    redacted = list(getattr(item, 'client_attrs', ()))
+    from .lib.baseapi import attributes
+    details = attributes(item)
+    for k, v in list(details.items()):
         if k.startswith('_') or k in redacted:
             del details[k]
 
@@ -178,6 +188,7 @@ def message(text):
 
 def yaml_message(data):
     """ Formats output as ordered YAML """
+    import yaml
     message(ordered_dump(data,
                          Dumper=yaml.SafeDumper,
                          default_flow_style=False))
@@ -29,6 +29,7 @@ setup(
     entry_points={
         "console_scripts": [
             "pontoon = pontoon.cmd.pontoon:main",
+            "pontoon-cache = pontoon.cmd.pontoon_cache:main",
             "pontoon-configure = pontoon.cmd.pontoon_configure:main",
             "pontoon-droplet = pontoon.cmd.pontoon_droplet:main",
             "pontoon-event = pontoon.cmd.pontoon_event:main",
@@ -0,0 +1,14 @@
+#!/usr/bin/env bats
+
+export MOCK=1
+export XDG_CACHE_HOME="$BATS_TMPDIR"
+
+@test "Show cache statistics" {
+	run pontoon cache stats
+	[ "$status" = 0 ]
+}
+
+@test "Clear the caches" {
+	run pontoon cache clear
+	[ "$status" = 0 ]
+}
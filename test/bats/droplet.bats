@@ -28,6 +28,15 @@ export MOCK=1
 	[ "$status" = 0 ]
 }
 
+@test "Create several Droplets at once" {
+	run pontoon droplet create 'web-{01..12}' \
+	--size="512mb" \
+	--image="ubuntu-14-04-x64" \
+	--region="nyc3"
+	[ "$status" = 0 ]
+	[ "${lines[0]}" = "Creating 12 Droplets web-01 to web-12 (512mb using ubuntu-14-04-x64 in nyc3)..." ]
+}
+
 @test "SSH into a Droplet" {
 	skip "can't test SSH yet"
 	run pontoon ssh example.com
@@ -105,6 +114,16 @@ export MOCK=1
 	[ "$status" = 0 ]
 }
 
+@test "Reboot every Droplet with a tag" {
+	run pontoon droplet reboot --tag=web
+	[ "$status" = 0 ]
+}
+
+@test "Power off every Droplet with a tag" {
+	run pontoon droplet poweroff --tag=web --yes
+	[ "$status" = 0 ]
+}
+
 @test "Powercycling a Droplet should create a warning" {
 	skip "this really needs an expect script"
 	run sh -c 'yes | pontoon droplet powercycle example.com'
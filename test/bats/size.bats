@@ -8,3 +8,8 @@ export MOCK=1
 	[ "${lines[1]}" = " - 512mb" ]
 	[ "${lines[2]}" = " - 1gb" ]
 }
+
+@test "List sizes, bypassing the cache" {
+	run pontoon size list --refresh
+	[ "$status" = 0 ]
+}
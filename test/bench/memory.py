@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Memory held by a large Droplet listing.
+
+Usage:
+    memory.py [--droplets=<n>] [--check]
+
+Manager.get_all_droplets() lists <n> Droplets, 200 per page, from a
+transport generating them in memory, and the memory still allocated
+afterwards (the Droplets and everything they reference) is measured with
+tracemalloc. The footprint per Droplet is compared with the budget and
+the baseline (the footprint before models were slotted) in
+memory_budget.json.
+
+Options:
+    --droplets=<n>  Droplets listed [default: 10000].
+    --check         Exit non-zero when the budget is exceeded.
+"""
+
+from __future__ import print_function
+
+import os
+import gc
+import sys
+import json
+import tracemalloc
+
+bench_dir = os.path.dirname(os.path.realpath(__file__))
+root_dir = os.path.dirname(os.path.dirname(bench_dir))
+budget_file = os.path.join(bench_dir, 'memory_budget.json')
+sys.path.insert(0, root_dir)
+
+from pontoon.lib import Manager  # noqa: E402
+from pontoon.lib.transport import Response  # noqa: E402
+
+per_page = 200
+
+
+def droplet(i):
+    """A Droplet as listed by the API, every one in the same region"""
+    ip_address = "10.%d.%d.%d" % (i >> 16, i >> 8 & 255, i & 255)
+    return {
+        "id": 3000000 + i, "name": "web-%05d" % i, "memory": 512,
+        "vcpus": 1, "disk": 20, "locked": False, "status": "active",
+        "kernel": {"id": 2233, "name": "Ubuntu 14.04 x64 vmlinuz-3.13.0-37",
+                   "version": "3.13.0-37-generic"},
+        "created_at": "2014-11-14T16:36:31Z", "features": ["virtio"],
+        "backup_ids": [], "snapshot_ids": [],
+        "image": {"id": 6918990, "name": "14.04 x64",
+                  "distribution": "Ubuntu", "slug": "ubuntu-14-04-x64",
+                  "public": True,
+                  "regions": ["nyc1", "ams1", "sfo1", "nyc2", "ams2",
+                              "sgp1", "lon1", "nyc3", "ams3", "nyc3"],
+                  "created_at": "2014-10-17T20:24:33Z", "min_disk_size": 20},
+        "size_slug": "512mb",
+        "size": {"slug": "512mb", "memory": 512, "vcpus": 1, "disk": 20,
+                 "transfer": 1.0, "price_monthly": 5.0,
+                 "price_hourly": 0.00744,
+                 "regions": ["nyc1", "ams1", "sfo1", "nyc2", "ams2",
+                             "sgp1", "lon1", "nyc3", "ams3", "nyc3"]},
+        "networks": {
+            "v4": [{"ip_address": ip_address,
+                    "netmask": "255.255.0.0", "gateway": "10.0.0.1",
+                    "type": "public"}],
+            "v6": []},
+        "region": {"name": "New York 3", "slug": "nyc3",
+                   "sizes": ["32gb", "16gb", "2gb", "1gb", "4gb", "8gb",
+                             "512mb", "64gb", "48gb"],
+                   "features": ["virtio", "private_networking", "backups",
+                                "ipv6", "metadata"],
+                   "available": True},
+        "tags": [],
+    }
+
+
+class ListingTransport(object):
+    """Serves a listing of n Droplets, generated page by page"""
+
+    def __init__(self, n):
+        self.n = n
+
+    def send(self, api, type, url, params, headers=None):
+        page = int(params.get('page', 1))
+        pages = (self.n + per_page - 1) // per_page
+        start = (page - 1) * per_page
+        body = {'droplets': [droplet(i) for i in
+                             range(start, min(start + per_page, self.n))],
+                'links': {'pages': {
+                    'last': 'https://api.digitalocean.com/v2/droplets/'
+                            '?page=%d&per_page=%d' % (pages, per_page)}},
+                'meta': {'total': self.n}}
+        return Response(200, json.dumps(body))
+
+
+def measure(n):
+    """Bytes still allocated per Droplet once n of them are listed"""
+    manager = Manager(token='bench', transport=ListingTransport(n))
+    manager.workers = 1
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    droplets = manager.get_all_droplets()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(droplets) == n
+    return (after - before) / float(n)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    n = 10000
+    for arg in argv:
+        if arg.startswith('--droplets='):
+            n = int(arg.split('=', 1)[1])
+
+    with open(budget_file) as f:
+        budget = json.load(f)
+    footprint = measure(n)
+    print("%-24s %12s %12s %12s" % (
+        "listing", "per droplet", "baseline", "budget"))
+    print("%-24s %10.0f B %10.0f B %10.0f B %s" % (
+        "%d droplets" % n, footprint, budget['baseline'], budget['budget'],
+        "OVER BUDGET" if footprint > budget['budget'] else ""))
+    if '--check' in argv and footprint > budget['budget']:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
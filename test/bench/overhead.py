@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Per-call overhead of logging with debug output off.
+
+Usage:
+    overhead.py [--calls=<n>]
+
+Times BaseAPI.get_data() through a transport that answers straight away,
+so what's measured is pontoon's own work per request, and a function
+decorated with @debug against the same function undecorated. Both run
+with the pontoon loggers at their default level (debug off), then again
+with debug on into a handler that drops everything.
+
+Options:
+    --calls=<n>  Calls timed [default: 20000].
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import logging
+from timeit import default_timer as timer
+
+bench_dir = os.path.dirname(os.path.realpath(__file__))
+root_dir = os.path.dirname(os.path.dirname(bench_dir))
+sys.path.insert(0, root_dir)
+
+from pontoon.log import debug  # noqa: E402
+from pontoon.lib.baseapi import BaseAPI  # noqa: E402
+from pontoon.lib.ratelimit import RateLimiters  # noqa: E402
+from pontoon.lib.transport import Response  # noqa: E402
+
+
+class InstantTransport(object):
+
+    def send(self, api, type, url, params, headers=None):
+        return Response(200, '{}')
+
+
+class HTTPishTransport(InstantTransport):
+    """Logs the request like HTTPTransport does, without sending it"""
+
+    def send(self, api, type, url, params, headers=None):
+        from pontoon.lib import transport
+        authorization = 'Bearer ' + api.token
+        transport.log_request(api, type, url, 'params', params,
+                              dict(headers or {}, Authorization=authorization))
+        return Response(200, '{}')
+
+
+def plain(droplet, name, size='512mb', region='nyc3'):
+    return name
+
+
+# Logged like the functions of the pontoon package.
+plain.__module__ = 'pontoon.bench'
+decorated = debug(plain)
+
+
+def per_call(function, calls):
+    """Microseconds per call, best of three"""
+    best = None
+    for _ in range(3):
+        start = timer()
+        for _ in range(calls):
+            function()
+        elapsed = (timer() - start) / calls * 10 ** 6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure(calls=20000):
+    """Microseconds per call of each case, with debug off then on"""
+    api = BaseAPI(token='bench', transport=HTTPishTransport(),
+                  rate_limiters=RateLimiters())
+    params = {'page': 3, 'per_page': 200, 'tag_name': 'web'}
+    cases = [
+        ('get_data', lambda: api.get_data('droplets/', params=params)),
+        ('@debug call', lambda: decorated(api, 'web-1', region='ams3')),
+        ('undecorated call', lambda: plain(api, 'web-1', region='ams3')),
+    ]
+
+    logger = logging.getLogger('pontoon')
+    level, propagate = logger.level, logger.propagate
+    results = []
+    try:
+        for debug_on in (False, True):
+            handler = logging.NullHandler()
+            if debug_on:
+                logger.addHandler(handler)
+                logger.setLevel(logging.DEBUG)
+                logger.propagate = False
+            for name, function in cases:
+                results.append((name, debug_on, per_call(function, calls)))
+            logger.removeHandler(handler)
+    finally:
+        logger.setLevel(level)
+        logger.propagate = propagate
+    return results
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    calls = 20000
+    for arg in argv:
+        if arg.startswith('--calls='):
+            calls = int(arg.split('=', 1)[1])
+    print("%-20s %10s %10s" % ("per call", "debug off", "debug on"))
+    results = measure(calls)
+    debug_on = dict((name, us) for name, on, us in results if on)
+    for name, on, us in results:
+        if not on:
+            print("%-20s %8.2fus %8.2fus" % (name, us, debug_on[name]))
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Cold-start import time of the pontoon entry points.
+
+Usage:
+    startup.py [--runs=<n>] [--check]
+
+Every entry point is imported in a fresh interpreter, timing the import
+and listing the modules it loaded, keeping the best of several runs, and
+compared against the budget in startup_budget.json. This works on every
+Python the package supports.
+
+Options:
+    --runs=<n>  Interpreters started per entry point [default: 3].
+    --check     Exit non-zero when a budget is exceeded.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import json
+import subprocess
+
+bench_dir = os.path.dirname(os.path.realpath(__file__))
+root_dir = os.path.dirname(os.path.dirname(bench_dir))
+budget_file = os.path.join(bench_dir, 'startup_budget.json')
+
+# Run in the new interpreter: microseconds spent importing the module,
+# then the name of every module loaded.
+profile_code = """
+import sys
+from timeit import default_timer
+start = default_timer()
+import %s
+print(int((default_timer() - start) * 10 ** 6))
+print(' '.join(sys.modules))
+"""
+
+
+def import_profile(module):
+    """Import a module in a new interpreter.
+
+    Returns the microseconds spent importing it and the set of every
+    module loaded along the way.
+    """
+    env = dict(os.environ, PYTHONPATH=root_dir)
+    out = subprocess.check_output(
+        [sys.executable, '-c', profile_code % module], env=env, cwd=root_dir)
+    elapsed, loaded = out.decode('UTF-8').splitlines()[-2:]
+    return int(elapsed), set(loaded.split())
+
+
+def forbidden_imports():
+    """Entry point -> modules it loads that it shouldn't, if any"""
+    with open(budget_file) as f:
+        budget = json.load(f)
+    found = {}
+    for module in sorted(budget['modules']):
+        loaded = import_profile(module)[1]
+        forbidden = sorted(loaded & set(budget['forbidden']))
+        if forbidden:
+            found[module] = forbidden
+    return found
+
+
+def measure(runs=3):
+    """Best import time per entry point, and any forbidden imports"""
+    with open(budget_file) as f:
+        budget = json.load(f)
+
+    results = []
+    for module, allowed in sorted(budget['modules'].items()):
+        best, loaded = None, set()
+        for _ in range(runs):
+            elapsed, loaded = import_profile(module)
+            best = elapsed if best is None else min(best, elapsed)
+        forbidden = sorted(loaded & set(budget['forbidden']))
+        results.append((module, best, allowed, forbidden))
+    return results
+
+
+def report(results):
+    failed = False
+    print("%-32s %10s %10s" % ("entry point", "import", "budget"))
+    for module, elapsed, allowed, forbidden in results:
+        over = elapsed > allowed or forbidden
+        failed = failed or over
+        print("%-32s %8.1fms %8.1fms %s" % (
+            module, elapsed / 1000.0, allowed / 1000.0,
+            "OVER BUDGET" if elapsed > allowed else ""))
+        if forbidden:
+            print("    imports %s" % ", ".join(forbidden))
+    return failed
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    runs = 3
+    for arg in argv:
+        if arg.startswith('--runs='):
+            runs = int(arg.split('=', 1)[1])
+    failed = report(measure(runs))
+    if '--check' in argv and failed:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Timings of the library's hot paths and of the CLI entry points.
+
+Usage:
+    suite.py [options] [<benchmark>...]
+
+Runs each benchmark (all of them by default) several times against a local
+fake API (pontoon.fakeapi) and keeps the best time. Results are compared
+with the baselines in baselines.json, recorded per release with --save:
+anything slower than the tolerance is reported as a regression. Baselines
+are only comparable on the machine they were recorded on.
+
+Benchmarks:
+    paginate        list every Droplet over HTTP, 200 per page
+    construct       build the Droplet objects of a listing
+    render          format 1000 Droplets and dump them as YAML
+    lookup-cold     `droplet` command lookup by name, empty cache
+    lookup-warm     100 lookups by name from the Droplet cache
+    wait            wait for 100 actions to complete
+    startup         cold start of every pontoon-* entry point (--help)
+
+Options:
+    -h --help               Show this page.
+    --droplets=<n>          Droplets on the account. [default: 10000]
+    --repeat=<n>            Runs per benchmark, the best is kept.
+                            [default: 3]
+    --against=<version>     Baseline compared with, the latest release
+                            recorded when not given.
+    --tolerance=<ratio>     Slowdown reported as a regression.
+                            [default: 1.25]
+    --save                  Record the results as the current release's
+                            baseline.
+    --check                 Exit non-zero on a regression.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+from timeit import default_timer as timer
+
+bench_dir = os.path.dirname(os.path.realpath(__file__))
+root_dir = os.path.dirname(os.path.dirname(bench_dir))
+baselines_file = os.path.join(bench_dir, 'baselines.json')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, bench_dir)
+
+from docopt import docopt  # noqa: E402
+from pontoon import ui  # noqa: E402
+from pontoon.meta import __version__  # noqa: E402
+from pontoon.mocking import capture_stdout  # noqa: E402
+from pontoon.fakeapi import Account, FakeAPI, FakeServer  # noqa: E402
+from pontoon.lib import Manager, ActionWaiter  # noqa: E402
+from memory import ListingTransport  # noqa: E402
+
+entry_points = ('pontoon', 'pontoon_cache', 'pontoon_configure',
+                'pontoon_droplet', 'pontoon_event', 'pontoon_image',
+                'pontoon_region', 'pontoon_size', 'pontoon_snapshot',
+                'pontoon_sshkey')
+
+
+class Bench(object):
+    """
+        What the benchmarks share: a fake API serving `droplets` Droplets,
+        and a scratch directory for the command caches.
+    """
+
+    token = 'bench'
+
+    def __init__(self, droplets):
+        self.droplets = droplets
+        self.api = FakeAPI(Account(droplets=droplets, action_time=0.2),
+                           rate_limit=10 ** 9)
+        self.server = FakeServer(self.api).start()
+        self.scratch = tempfile.mkdtemp(prefix='pontoon-bench-')
+
+    def close(self):
+        self.server.stop()
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+    def manager(self, **kwargs):
+        return Manager(token=self.token, end_point=self.server.url,
+                       **kwargs)
+
+    def requests(self):
+        return sum(self.api.stats().values())
+
+    # Each benchmark returns the function timed, after any setup.
+
+    def paginate(self):
+        manager = self.manager()
+        return lambda: manager.get_all_droplets(raw=True)
+
+    def construct(self):
+        manager = Manager(token=self.token,
+                          transport=ListingTransport(self.droplets))
+        manager.workers = 1
+        return manager.get_all_droplets
+
+    def render(self):
+        droplets = Manager(token=self.token,
+                           transport=ListingTransport(1000)).get_all_droplets()
+
+        def render():
+            with capture_stdout():
+                ui.yaml_message([ui.format_droplet_info(d)
+                                 for d in droplets])
+        return render
+
+    def _command(self):
+        from pontoon.cache import DropletCache
+        from pontoon.cmd.pontoon_droplet import DropletCommand
+        command = DropletCommand({'api_token': self.token}, {})
+        command.manager = self.manager()
+        command.cache = DropletCache(self.token, directory=self.scratch)
+        return command
+
+    def lookup_cold(self):
+        from pontoon.cache import clear
+        name = 'droplet-%05d' % (self.droplets - 1)
+
+        def lookup():
+            clear(self.scratch)
+            self._command()._get_droplet(name)
+        return lookup
+
+    def lookup_warm(self):
+        command = self._command()
+        names = ['droplet-%05d' % (i * self.droplets // 100)
+                 for i in range(100)]
+        command._get_droplet(names[0])
+
+        def lookup():
+            for name in names:
+                command._get_droplet(name)
+        return lookup
+
+    def wait(self):
+        account = self.api.account
+        with account.lock:
+            droplets = sorted(account.droplets.values(),
+                              key=lambda d: d['id'])[:100]
+
+        def wait():
+            with account.lock:
+                actions = [account.start('reboot', d)['id']
+                           for d in droplets]
+            result = ActionWaiter(actions, token=self.token,
+                                  end_point=self.server.url,
+                                  initial_delay=0.05).wait()
+            assert result.ok
+        return wait
+
+    def startup(self):
+        env = dict(os.environ, PYTHONPATH=root_dir, MOCK='1')
+        commands = [[sys.executable, '-c',
+                     'import sys; from pontoon.cmd.%s import main; '
+                     'sys.argv = ["%s", "--help"]; main()' % (module, module)]
+                    for module in entry_points]
+
+        def startup():
+            for command in commands:
+                with open(os.devnull, 'w') as devnull:
+                    subprocess.call(command, stdout=devnull, stderr=devnull,
+                                    env=env, cwd=root_dir)
+        return startup
+
+
+benchmarks = ('paginate', 'construct', 'render', 'lookup-cold',
+              'lookup-warm', 'wait', 'startup')
+
+
+def measure(names, droplets=10000, repeat=3):
+    """Best time and requests made, by benchmark"""
+    bench = Bench(droplets)
+    results = {}
+    try:
+        for name in names:
+            run = getattr(bench, name.replace('-', '_'))()
+            best = requests = None
+            for _ in range(repeat):
+                before = bench.requests()
+                start = timer()
+                run()
+                elapsed = timer() - start
+                best = elapsed if best is None else min(best, elapsed)
+                requests = bench.requests() - before
+            results[name] = {'seconds': round(best, 4),
+                             'requests': requests}
+    finally:
+        bench.close()
+    return results
+
+
+def load_baselines():
+    try:
+        with open(baselines_file) as f:
+            return json.load(f)
+    except IOError:
+        return {}
+
+
+def version_key(version):
+    return [int(part) if part.isdigit() else part
+            for part in version.split('.')]
+
+
+def report(results, baseline, version, tolerance):
+    """Print the results next to the baseline, True on a regression"""
+    regressed = False
+    print("%-14s %10s %9s %10s %8s" % (
+        "benchmark", "time", "requests", version or "baseline", "change"))
+    for name in benchmarks:
+        if name not in results:
+            continue
+        seconds = results[name]['seconds']
+        line = "%-14s %9.3fs %9d" % (name, seconds,
+                                     results[name]['requests'])
+        if name in baseline:
+            before = baseline[name]['seconds']
+            ratio = seconds / before if before else 1.0
+            slower = ratio > tolerance
+            regressed = regressed or slower
+            line += " %9.3fs %+7.0f%% %s" % (
+                before, (ratio - 1) * 100, "REGRESSION" if slower else "")
+        print(line.rstrip())
+    return regressed
+
+
+def main(argv=None):
+    args = docopt(__doc__, argv=argv)
+    names = args['<benchmark>'] or list(benchmarks)
+    unknown = set(names) - set(benchmarks)
+    if unknown:
+        print("Unknown benchmark: %s" % ", ".join(sorted(unknown)))
+        return 1
+
+    results = measure(names, droplets=int(args['--droplets']),
+                      repeat=int(args['--repeat']))
+
+    baselines = load_baselines()
+    version = args['--against'] or (
+        sorted(baselines, key=version_key)[-1] if baselines else None)
+    regressed = report(results, baselines.get(version, {}), version,
+                       float(args['--tolerance']))
+
+    if args['--save']:
+        baselines.setdefault(__version__, {}).update(results)
+        with open(baselines_file, 'w') as f:
+            json.dump(baselines, f, indent=4, sort_keys=True)
+            f.write('\n')
+        print("Saved as the baseline of %s" % __version__)
+
+    if args['--check'] and regressed:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+import json
+
+import pytest
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+
+# The asyncio client's tests use async syntax, which older Pythons can't
+# even compile.
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore.append('test_aio.py')
+
+
+@pytest.fixture
+def mocked_manager():
+    """A Manager answered from the JSON fixtures"""
+    from pontoon.lib import Manager
+    return Manager(token='foo', mocked=True)
+
+
+@pytest.fixture
+def recording():
+    """
+    Factory of Managers answered from the JSON fixtures, each returned
+    with the (type, url, params) of the requests it sent. Extra routes
+    are tried before the fixtures' own.
+    """
+    from pontoon.lib import Manager
+    from pontoon.lib.transport import FixtureTransport, fixture_routes
+
+    def manager(routes=()):
+        sent = []
+
+        class Transport(FixtureTransport):
+            def send(self, api, type, url, params, headers=None):
+                sent.append((type, url, params))
+                return super(Transport, self).send(api, type, url, params,
+                                                   headers)
+
+        transport = Transport(list(routes) + fixture_routes)
+        return Manager(token='foo', transport=transport), sent
+    return manager
+
+
+@pytest.fixture
+def recorded(recording):
+    """A recording Manager, and the requests it sent"""
+    return recording()
+
+
+@pytest.fixture
+def scripted():
+    """
+    Factory of transports answering with scripted (status, body) pairs,
+    in order, and the same response headers every time. A status that is
+    an exception is raised instead. Each request's headers are kept in
+    the transport's `sent`.
+    """
+    from pontoon.lib.transport import Response
+
+    class Transport(object):
+        def __init__(self, responses, headers=None):
+            self.responses = responses
+            self.headers = headers or {}
+            self.sent = []
+
+        def send(self, api, type, url, params, headers=None):
+            self.sent.append(headers)
+            status, body = self.responses.pop(0)
+            if isinstance(status, Exception):
+                raise status
+            return Response(status, body, dict(self.headers))
+    return Transport
+
+
+@pytest.fixture
+def droplet_pages():
+    """
+    Adds a paginated droplet listing to a responses.RequestsMock: `pages`
+    pages of `per_page` Droplets, with ids page * 100 + n.
+    """
+    import responses
+    from pontoon.lib.baseapi import BaseAPI
+    url = BaseAPI.end_point + 'droplets/'
+
+    def add(rsps, pages, per_page=2):
+        def callback(request):
+            try:
+                from urlparse import urlparse, parse_qs
+            except ImportError:
+                from urllib.parse import urlparse, parse_qs
+            query = parse_qs(urlparse(request.url).query)
+            page = int(query.get('page', ['1'])[0])
+            droplets = [{'id': page * 100 + n, 'name': 'web-%s-%s' % (page, n),
+                         'networks': {'v4': [], 'v6': []}}
+                        for n in range(per_page)]
+            links = {'last': url + '?page=%s' % pages}
+            if page < pages:
+                links['next'] = url + '?page=%s' % (page + 1)
+            body = {'droplets': droplets,
+                    'links': {'pages': links},
+                    'meta': {'total': pages * per_page}}
+            return (200, {}, json.dumps(body))
+
+        rsps.add_callback(responses.GET, url, callback=callback,
+                          content_type='application/json')
+    return add
+
+
+@pytest.fixture
+def bench_modules(monkeypatch):
+    """Makes the scripts in test/bench importable"""
+    monkeypatch.syspath_prepend(os.path.join(test_dir, 'bench'))
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+from mock import patch
+
+
+class TestDropletActions:
+
+    def test_get_actions_from_listing(self):
+        from pontoon.lib import Droplet, Action
+        droplet = Droplet(token='foo', id=3164494, mocked=True)
+        with patch.object(Action, 'load') as load:
+            actions = droplet.get_actions()
+            assert load.call_count == 0
+            assert len(actions) == 3
+            assert all(a.droplet_id == 3164494 for a in actions)
+            droplet.get_actions(refresh=True)
+            assert load.call_count == 3
+
+    def test_wait_for_action(self):
+        from pontoon.lib import Droplet
+        droplet = Droplet(token='foo', id=3164494, mocked=True)
+        assert droplet.wait_for_action(39388122) is True
+
+
+class TestActionWaiter:
+
+    def _actions(self, statuses):
+        from pontoon.lib import Action
+        actions = []
+        for n, sequence in enumerate(statuses):
+            action = Action(token='foo', id=n, status='in-progress')
+            action._statuses = list(sequence)
+
+            def load(action=action):
+                action.status = action._statuses.pop(0)
+            action.load = load
+            actions.append(action)
+        return actions
+
+    def test_completions_in_order_of_finishing(self):
+        from pontoon.lib import ActionWaiter
+        actions = self._actions([
+            ['in-progress', 'completed'],
+            ['completed'],
+            ['in-progress', 'in-progress', 'errored'],
+        ])
+        delays = []
+        waiter = ActionWaiter(actions, token='foo', jitter=0,
+                              sleep=delays.append)
+        assert [a.id for a in waiter.as_completed()] == [1, 0, 2]
+        assert delays == [1, 2, 4]
+        assert [a.id for a in waiter.completed] == [1, 0]
+        assert [a.id for a in waiter.errored] == [2]
+
+    def test_timeout(self):
+        from pontoon.lib import ActionWaiter
+        actions = self._actions([['completed'], ['in-progress'] * 10])
+        clock = [0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+
+        with patch('pontoon.lib.waiter.time.time', lambda: clock[0]):
+            result = ActionWaiter(actions, token='foo', timeout=5,
+                                  sleep=sleep).wait()
+        assert not result.ok
+        assert [a.id for a in result.completed] == [0]
+        assert [a.id for a in result.timed_out] == [1]
+        assert clock[0] <= 5
+
+    def test_coalesced_polling(self):
+        from pontoon.lib import ActionWaiter
+        actions = self._actions([['completed']] * 3)
+        for action, id in zip(actions, [39388122, 39290099, 1]):
+            action.id = id
+        waiter = ActionWaiter(actions, token='foo', mocked=True,
+                              coalesce_over=1, sleep=lambda s: None)
+        result = waiter.wait()
+        assert result.ok
+        # only the action missing from the listing was loaded on its own
+        assert [len(a._statuses) for a in actions] == [1, 1, 0]
+
+
+class TestTags:
+
+    def test_listing_filter(self, recorded):
+        manager, sent = recorded
+        manager.get_all_droplets(tag_name='web')
+        assert sent[0][2]['tag_name'] == 'web'
+
+    def test_bulk_action(self, recorded):
+        manager, sent = recorded
+        actions = manager.perform_action_by_tag('web tier', 'power_off')
+        assert len(sent) == 1
+        assert sent[0][1] == 'droplets/actions?tag_name=web%20tier'
+        assert sent[0][2] == {'type': 'power_off'}
+        assert [a.droplet_id for a in actions] == [3164444, 3164494]
+
+    def test_action_per_droplet(self, recorded):
+        manager, sent = recorded
+        actions = manager.perform_action_by_tag('web', 'reboot')
+        # the tagged listing, then one reboot per Droplet
+        assert sent[0][2]['tag_name'] == 'web'
+        assert [s[1] for s in sent[1:]] == ['droplets/3164444/actions/']
+        assert [a.type for a in actions] == ['reboot']
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import asyncio
+from mock import patch
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+
+class TestAsyncManager:
+
+    def test_mirrors_manager(self):
+        from pontoon.lib import AsyncManager
+
+        async def scenario():
+            async with AsyncManager(token='foo', mocked=True) as client:
+                droplets = await client.get_all_droplets()
+                droplet = client.wrap(droplets[0])
+                action = await droplet.power_cycle(return_dict=False)
+                result = await client.wait([action, 39388122],
+                                           initial_delay=0)
+                return droplet.name, result
+
+        name, result = asyncio.new_event_loop().run_until_complete(
+            scenario())
+        assert name == 'example.com'
+        assert result.ok
+        assert len(result.completed) == 2
+
+    def test_own_pool_and_client(self):
+        from pontoon.lib import AsyncManager, default_pool
+        from pontoon.lib.Action import Action
+        maxsize = default_pool.pool_maxsize
+        client = AsyncManager(token='foo', limit=64, mocked=True,
+                              retries=7)
+        assert client.manager.pool is not default_pool
+        assert client.manager.pool.pool_maxsize == 64
+        assert default_pool.pool_maxsize == maxsize
+
+        loaded = []
+
+        def load(action):
+            loaded.append(action._client)
+            action.status = 'completed'
+
+        with patch.object(Action, 'load', load):
+            result = asyncio.new_event_loop().run_until_complete(
+                client.wait([39388122], initial_delay=0))
+        client.close()
+        assert result.ok
+        assert loaded == [client.manager._client]
+
+    def test_wait_holds_no_thread(self):
+        from pontoon.lib import AsyncManager
+        from pontoon.lib.Action import Action
+        client = AsyncManager(token='foo', limit=1, mocked=True)
+        loads = []
+
+        def load(action):
+            loads.append(action.id)
+            action.status = 'completed' if len(loads) > 3 else 'in-progress'
+
+        async def scenario():
+            waiting = asyncio.ensure_future(
+                client.wait([1], initial_delay=0.05, jitter=0))
+            await asyncio.sleep(0.01)
+            # the only request slot is free while the wait sleeps
+            sizes = await asyncio.wait_for(client.get_all_sizes(), 1)
+            assert not waiting.done()
+            return sizes, await waiting
+
+        with patch.object(Action, 'load', load):
+            sizes, result = asyncio.new_event_loop().run_until_complete(
+                scenario())
+        client.close()
+        assert sizes and result.ok and len(loads) == 4
+
+    def test_loops_not_kept(self):
+        import gc
+        import weakref
+        from pontoon.lib import AsyncManager
+        client = AsyncManager(token='foo', limit=1, mocked=True)
+        loops = []
+
+        async def calls():
+            await asyncio.gather(client.get_all_sizes(),
+                                 client.get_all_sizes())
+
+        for _ in range(3):
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(calls())
+            loop.close()
+            loops.append(weakref.ref(loop))
+        del loop
+        gc.collect()
+        client.close()
+        assert [ref() for ref in loops] == [None, None, None]
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+import json
+import pytest
+from pontoon.mocking import capture_stdout
+
+
+# Timings and budgets depend on the machine: run with PONTOON_BENCH=1.
+bench = pytest.mark.skipif(not os.environ.get('PONTOON_BENCH'),
+                           reason="set PONTOON_BENCH to run benchmarks")
+
+
+@pytest.mark.usefixtures('bench_modules')
+class TestStartup:
+
+    def test_no_forbidden_imports(self):
+        import startup
+        assert startup.forbidden_imports() == {}
+
+    @bench
+    def test_startup_budget(self):
+        import startup
+        results = startup.measure(runs=3)
+        assert [(m, f) for m, e, a, f in results if f] == []
+        assert [(m, e, a) for m, e, a, f in results if e > a] == []
+
+    @bench
+    def test_memory_budget(self):
+        pytest.importorskip('tracemalloc')
+        import memory
+        with open(memory.budget_file) as f:
+            budget = json.load(f)['budget']
+        assert memory.measure(1000) < budget
+
+    @bench
+    def test_bench_suite(self):
+        import suite
+        names = [n for n in suite.benchmarks if n != 'startup']
+        results = suite.measure(names, droplets=300, repeat=1)
+        assert sorted(results) == sorted(names)
+        assert results['paginate']['requests'] == 2
+        assert results['lookup-warm']['requests'] == 0
+        with capture_stdout():
+            assert not suite.report(results, results, 'same', 1.25)
+            assert suite.report(results, dict(
+                (n, {'seconds': r['seconds'] / 2}) for n, r in
+                results.items()), 'faster', 1.25)
+
+    def test_shared_client(self):
+        from pontoon.lib import Manager, Droplet
+        import memory
+        manager = Manager(token='foo',
+                          transport=memory.ListingTransport(2))
+        a, b = manager.get_all_droplets()
+        assert a._client is b._client is manager._client
+        assert a.region is b.region and a.image is b.image
+        assert not hasattr(a, '__dict__') or not a.__dict__
+
+        a.token = 'bar'
+        other = Droplet(token='foo', transport=manager.transport)
+        assert (a.token, b.token, other._client) == ('bar', 'foo', b._client)
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+import json
+from mock import patch
+from pontoon.mocking import capture_stdout
+
+
+class TestDropletCache:
+
+    def _droplet(self, id, name):
+        from pontoon.lib import Droplet
+        return Droplet(token='foo', id=id, name=name,
+                       ip_address='10.0.0.%s' % id)
+
+    def test_round_trip(self, tmpdir):
+        from pontoon.cache import DropletCache
+        cache = DropletCache('foo', directory=str(tmpdir))
+        cache.replace([self._droplet(1, 'web-1'), self._droplet(2, 'web-2')])
+
+        cache = DropletCache('foo', directory=str(tmpdir))
+        entry, = cache.lookup('web-2')
+        assert cache.fresh(entry)
+        droplet = cache.droplet(entry, token='foo')
+        assert (droplet.id, droplet.ip_address) == (2, '10.0.0.2')
+        assert droplet.token == 'foo'
+        assert cache.lookup('web-3') == []
+        assert DropletCache('bar', directory=str(tmpdir)).lookup('web-2') == []
+
+    def test_remove_and_ttl(self, tmpdir):
+        from pontoon.cache import DropletCache
+        cache = DropletCache('foo', directory=str(tmpdir), ttl=60)
+        cache.put(self._droplet(1, 'web-1'))
+        entry, = cache.lookup('web-1')
+        with patch('pontoon.cache.time.time', lambda: 10 ** 10):
+            assert not cache.fresh(entry)
+        cache.remove(1)
+        assert DropletCache('foo', directory=str(tmpdir)).lookup('web-1') == []
+
+    def test_name_index(self, tmpdir):
+        from pontoon.cache import DropletCache
+        cache = DropletCache('foo', directory=str(tmpdir))
+        cache.replace([self._droplet(1, 'web-1'), self._droplet(2, 'web-1')])
+        cache.put(self._droplet(2, 'web-2'))
+        cache.put(self._droplet(3, 'web-2'))
+
+        cache = DropletCache('foo', directory=str(tmpdir))
+        with open(cache.path) as f:
+            assert json.load(f)['names'] == {'web-1': ['1'],
+                                             'web-2': ['2', '3']}
+        assert [e['attrs']['id'] for e in cache.lookup('web-2')] == [2, 3]
+        cache.remove(2)
+        assert [e['attrs']['id'] for e in cache.lookup('web-2')] == [3]
+        assert cache.names == {'web-1': ['1'], 'web-2': ['3']}
+
+    def test_disabled(self, tmpdir):
+        from pontoon.cache import DropletCache
+        cache = DropletCache('foo', directory=str(tmpdir), ttl=0)
+        cache.put(self._droplet(1, 'web-1'))
+        assert tmpdir.listdir() == []
+
+
+class TestImageCatalogue:
+
+    def test_global_images(self, recorded):
+        manager, sent = recorded
+        images = manager.get_global_images()
+        assert [i.name for i in images] == ['14.04 x64', '14.04 x32']
+        # a single listing, private images included
+        assert [(u, p.get('type')) for t, u, p in sent] == [('images/', None)]
+
+    def test_oses(self, tmpdir):
+        from pontoon.cmd.pontoon_image import ImageCommand
+        from pontoon.cache import ImageCatalogue
+        command = ImageCommand({'api_token': 'foo'},
+                               {'oses': True, '--refresh': False})
+        command.images = ImageCatalogue('foo', directory=str(tmpdir))
+        images = [dict(id=1, name='14.04 x64', distribution='Ubuntu',
+                       public=True),
+                  dict(id=2, name='7.0 x64', distribution='Debian',
+                       public=True),
+                  dict(id=3, name='Old box', distribution='CentOS',
+                       public=False)]
+        with patch.object(command.manager, 'get_all_images',
+                          return_value=images) as get_all_images, \
+                capture_stdout() as capture:
+            assert command.run() == 0
+            # snapshots count too, and both sections are now fresh
+            assert command.run() == 0
+        assert get_all_images.call_count == 1
+        assert capture.result == ("Available Operating Systems:\n"
+                                  " - Ubuntu\n - Debian\n - CentOS\n") * 2
+
+    def test_lookup(self, tmpdir, recorded):
+        from pontoon.cache import ImageCatalogue
+        manager, sent = recorded
+        catalogue = ImageCatalogue('foo', directory=str(tmpdir))
+        image, = catalogue.lookup(manager, '14.04 x64')
+        assert image.slug == 'ubuntu-14-04-x64'
+        fetched = len(sent)
+
+        catalogue = ImageCatalogue('foo', directory=str(tmpdir))
+        image, = catalogue.lookup(manager, 'ubuntu-14-04-x64')
+        assert image.name == '14.04 x64'
+        assert image.transport is manager.transport
+        assert catalogue.lookup(manager, 'My Snapshot', ('public',)) == []
+        assert catalogue.lookup(manager, 'My Snapshot')[0].public is False
+        # served from disk, apart from refreshing the public images when a
+        # name isn't among them
+        assert len(sent) == fetched + 1
+
+    def test_slug(self, tmpdir, recorded):
+        from pontoon.cache import ImageCatalogue
+        manager, sent = recorded
+        catalogue = ImageCatalogue('foo', directory=str(tmpdir))
+        image, = catalogue.lookup(manager, 'ubuntu-14-04-x64')
+        assert [u for t, u, p in sent] == ['images/ubuntu-14-04-x64']
+
+    def test_invalidate(self, tmpdir, recorded):
+        from pontoon.cache import ImageCatalogue
+        manager, sent = recorded
+        catalogue = ImageCatalogue('foo', directory=str(tmpdir))
+        catalogue.refresh(manager, 'private')
+        catalogue.invalidate('private')
+        assert not ImageCatalogue('foo', directory=str(tmpdir)).fresh(
+            'private')
+
+
+class TestFiles:
+
+    def test_atomic_write(self, tmpdir):
+        from pontoon.lib.files import atomic_write
+        path = tmpdir.join('new', 'metrics.prom')
+        atomic_write(str(path), 'one')
+        atomic_write(str(path), 'two', 0o644)
+        assert path.read() == 'two'
+        assert oct(path.stat().mode & 0o777) == oct(0o644)
+        assert tmpdir.join('new').listdir() == [path]
+
+    def test_token_key_names_every_cache(self, tmpdir):
+        from pontoon import cache
+        from pontoon.lib.files import token_key
+        from pontoon.lib.httpcache import ResponseCaches
+        from pontoon.lib.ratelimit import RateLimiters
+        caches, limiters = ResponseCaches(), RateLimiters()
+        caches.enable(str(tmpdir))
+        limiters.share(str(tmpdir))
+        name = token_key('foo')
+        assert caches.get('foo').path.endswith('responses-%s.json' % name)
+        assert limiters.get('foo').path.endswith('ratelimit-%s.json' % name)
+        assert cache.inventory_path('foo').endswith(
+            'inventory-%s.sqlite' % name)
+
+
+class TestResponseCache:
+
+    def _manager(self, transport, tmpdir, **kwargs):
+        from pontoon.lib import Manager
+        from pontoon.lib.httpcache import ResponseCaches
+        caches = ResponseCaches()
+        caches.enable(str(tmpdir), **kwargs)
+        manager = Manager(token='foo', transport=transport,
+                          response_caches=caches)
+        return manager, caches
+
+    def test_fresh_and_revalidated(self, tmpdir, scripted):
+        body = '{"sizes": [{"slug": "512mb"}]}'
+        transport = scripted([(200, body), (304, '')], {'ETag': '"v1"'})
+        manager, caches = self._manager(transport, tmpdir, ttl=60)
+        sent = transport.sent
+        assert manager.get_all_sizes()[0].slug == '512mb'
+        assert manager.get_all_sizes()[0].slug == '512mb'
+        assert sent == [None]
+
+        with patch('pontoon.lib.httpcache.time.time', lambda: 10 ** 10):
+            assert manager.get_all_sizes()[0].slug == '512mb'
+        assert sent[1] == {'If-None-Match': '"v1"'}
+        stats = caches.stats()['sizes']
+        assert (stats['fetched'], stats['hits'], stats['revalidated']) == \
+            (1, 1, 1)
+
+    def test_offline_and_refresh(self, tmpdir, scripted):
+        body = '{"regions": [{"slug": "nyc3"}]}'
+        transport = scripted([(200, body), (IOError('offline'), '')],
+                             {'ETag': '"v1"'})
+        manager, caches = self._manager(transport, tmpdir, refresh=True)
+        manager.get_all_regions()
+        assert manager.get_all_regions()[0].slug == 'nyc3'
+        assert caches.stats()['regions']['stale'] == 1
+
+    def test_paginated_entries_unchanged(self, tmpdir, scripted):
+        def page(n, pages=3):
+            return json.dumps({
+                'images': [{'id': n * 10}, {'id': n * 10 + 1}],
+                'links': {'pages': {'last': 'https://api.digitalocean.com'
+                                            '/v2/images?page=%d' % pages}}})
+        transport = scripted([(200, page(n)) for n in (1, 2, 3, 2, 3, 2, 3)],
+                             {'ETag': '"v1"'})
+        manager, caches = self._manager(transport, tmpdir, ttl=60)
+        manager.workers = 1
+        ids = [10, 11, 20, 21, 30, 31]
+        for _ in range(3):
+            assert [i.id for i in manager.get_distro_images()] == ids
+        caches.flush()
+        caches.enable(str(tmpdir), ttl=60)
+        assert [i.id for i in manager.get_distro_images()] == ids
+
+    def test_only_catalogue(self, tmpdir, scripted):
+        body = '{"images": []}'
+        transport = scripted([(200, body), (200, body)], {'ETag': '"v1"'})
+        manager, caches = self._manager(transport, tmpdir)
+        manager.get_my_images()
+        manager.get_my_images()
+        assert len(transport.sent) == 2
+        assert caches.stats() == {}
+
+    def test_clear(self, tmpdir):
+        from pontoon import cache
+        tmpdir.join('responses-abc.json').write('{}')
+        tmpdir.join('droplets-abc.json').write('{}')
+        tmpdir.join('ratelimit-abc.json').write('{}')
+        assert cache.clear(str(tmpdir)) == 2
+        assert tmpdir.listdir() == [tmpdir.join('ratelimit-abc.json')]
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+from pytest import raises
+from mock import patch
+from pontoon import configure
+from pontoon.mocking import capture_stdout
+
+
+class TestDispatch:
+
+    def test_in_process(self):
+        from pontoon.cmd import pontoon, pontoon_size
+        with patch.object(pontoon_size, 'main', return_value=0) as main, \
+                patch.object(pontoon, 'call') as call:
+            assert pontoon.main(['size', 'list']) == 0
+            main.assert_called_once_with(['size', 'list'])
+            pontoon.main(['help', 'size'])
+            main.assert_called_with(['size', '--help'])
+            assert call.call_count == 0
+
+    def test_external_command(self):
+        from pontoon.cmd import pontoon
+        with patch.object(pontoon, 'call', return_value=3) as call:
+            assert pontoon.main(['plugin', 'foo']) == 3
+            call.assert_called_once_with(['pontoon-plugin', 'plugin', 'foo'])
+
+    def test_errors(self):
+        from pontoon.cmd import pontoon, pontoon_size
+        with patch.object(pontoon, 'call', side_effect=OSError), \
+                capture_stdout() as capture:
+            assert pontoon.main(['plugin', 'foo']) == 1
+        assert capture.result == "No command 'plugin'\n"
+        # only a missing executable means there's no such command
+        with patch.object(pontoon_size, 'main', side_effect=OSError):
+            with raises(OSError):
+                pontoon.main(['size', 'list'])
+
+
+class TestCreateDroplets:
+
+    def test_expand_names(self):
+        from pontoon.cmd.pontoon_droplet import expand_names
+        assert expand_names(['web-{01..03}']) == ['web-01', 'web-02',
+                                                  'web-03']
+        assert expand_names(['{app,db}-{1..2}', 'x{}']) == [
+            'app-1', 'app-2', 'db-1', 'db-2', 'x{}']
+        assert len(expand_names(['web-{1..40}'])) == 40
+
+    def test_batches(self, recorded):
+        manager, sent = recorded
+        names = ['web-%02d' % n for n in range(1, 24)]
+        droplets = manager.create_droplets(names, size='512mb',
+                                           image='ubuntu-14-04-x64',
+                                           region='nyc3')
+        assert sorted(p['names'] for t, u, p in sent) == [
+            names[:10], names[10:20], names[20:]]
+        # two Droplets per response in the fixture
+        assert len(droplets) == 6
+        assert [d.action_ids for d in droplets[:2]] == [
+            [36805096], [36805097]]
+
+    def test_command(self):
+        from pontoon.cmd import pontoon_droplet
+        with patch.object(configure, 'combined',
+                          return_value={'api_token': 'foo'}), \
+                patch.object(pontoon_droplet, 'MOCK', True), \
+                capture_stdout() as capture:
+            assert not pontoon_droplet.main(
+                ['droplet', 'create', 'web-{01..12}', '--size=512mb',
+                 '--image=ubuntu-14-04-x64', '--region=nyc3', '--no-wait'])
+        assert capture.result.startswith('Creating 12 Droplets web-01 to '
+                                         'web-12 (512mb using ')
+
+    def test_failed_wait(self):
+        from pontoon.cmd import pontoon_droplet
+        from pontoon.lib import Action, ActionWaiter, WaitResult
+        errored = Action(token='foo', status='errored')
+        create = ['droplet', 'create', 'web-1', '--size=512mb',
+                  '--image=ubuntu-14-04-x64', '--region=nyc3']
+        for result, message in ((WaitResult([], [], [errored]), 'timed out'),
+                                (WaitResult([], [errored], []), 'errored'),
+                                (WaitResult([errored], [], []), 'active')):
+            with patch.object(configure, 'combined',
+                              return_value={'api_token': 'foo'}), \
+                    patch.object(pontoon_droplet, 'MOCK', True), \
+                    patch.object(ActionWaiter, 'wait', return_value=result), \
+                    capture_stdout() as capture:
+                assert pontoon_droplet.main(create) == \
+                    (0 if result.ok else 1)
+                assert pontoon_droplet.main(
+                    ['droplet', 'reboot', 'example.com']) == \
+                    (0 if result.ok else 1)
+            assert capture.result.splitlines()[1] == message
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+import json
+from mock import patch
+from pontoon.mocking import capture_stdout
+
+
+class TestEvents:
+
+    def test_path_template(self):
+        from pontoon.lib.events import path_template
+        assert path_template('droplets/123/actions/456/') == \
+            'droplets/{id}/actions/{id}'
+        assert path_template('domains/example.com/records/7') == \
+            'domains/{name}/records/{id}'
+        assert path_template('floating_ips/1.2.3.4?page=2') == \
+            'floating_ips/{ip}'
+
+    def test_stats(self, scripted):
+        from pontoon.lib import Manager
+        from pontoon.lib.events import Events, Stats
+        body = '{"droplet": {"id": 3164444, "name": "foo"}}'
+        transport = scripted([(429, '{"id": "too_many_requests", '
+                                    '"message": "slow down"}'),
+                              (200, body)],
+                             {'Retry-After': '0', 'RateLimit-Remaining': '9'})
+        events = Events()
+        manager = Manager(token='foo', transport=transport, events=events)
+        seen = []
+        hook = events.on('before_request', lambda name, e: seen.append(e))
+        stats = Stats().attach(events)
+        manager.get_droplet(3164444)
+
+        assert [e['attempt'] for e in seen] == [0, 1]
+        row, = stats.summary()
+        assert (row['path'], row['requests'], row['retries']) == \
+            ('droplets/{id}', 2, 1)
+        assert row['statuses'] == {'429': 1, '200': 1}
+        assert 'droplets/{id}' in stats.table()
+        assert 'pontoon_api_retries_total{method="GET",' \
+            'path="droplets/{id}"} 1' in stats.prometheus()
+
+        stats.detach()
+        events.off('before_request', hook)
+        assert not events.listening()
+
+    def test_cli_stats(self, tmpdir):
+        from pontoon.cmd import pontoon
+        prom, jsonl = str(tmpdir.join('pontoon.prom')), \
+            str(tmpdir.join('events.jsonl'))
+        with capture_stdout(), \
+                patch('pontoon.configure.MOCK', True), \
+                patch('pontoon.cmd.pontoon_droplet.MOCK', True):
+            assert not pontoon.main(['--prometheus=%s' % prom,
+                                     '--events=%s' % jsonl,
+                                     'droplet', 'list'])
+        with open(prom) as f:
+            assert 'pontoon_api_requests_total{method="GET",' \
+                'path="droplets",status="200"} 1' in f.read()
+        with open(jsonl) as f:
+            event = json.loads(f.readline())
+        assert (event['event'], event['path']) == \
+            ('after_response', 'droplets')
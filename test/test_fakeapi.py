@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+
+class TestFakeAPI:
+
+    def setup_method(self, method):
+        from pontoon.fakeapi import Account, FakeAPI, FakeServer
+        self.api = FakeAPI(Account(droplets=450, action_time=0.2), seed=1)
+        self.server = FakeServer(self.api).start()
+
+    def teardown_method(self, method):
+        self.server.stop()
+
+    def manager(self, token):
+        from pontoon.lib import Manager
+        return Manager(token=token, end_point=self.server.url)
+
+    def test_listing(self):
+        manager = self.manager('fake-listing')
+        droplets = manager.get_all_droplets()
+        assert len(droplets) == 450
+        assert droplets[0].name == 'droplet-00000'
+        assert droplets[0].ip_address
+        assert len(manager.get_all_droplets(tag_name='web')) == 225
+        assert self.api.stats()['GET droplets'] == 3 + 2
+        assert sorted(r.slug for r in manager.get_all_regions()) == \
+            sorted(r['slug'] for r in self.api.account.regions)
+
+    def test_image_types(self):
+        manager = self.manager('fake-images')
+        types = dict((t, [i.slug for i in manager.get_images(type=t)])
+                     for t in ('distribution', 'application'))
+        assert types == {'distribution': ['ubuntu-14-04-x64',
+                                          'ubuntu-14-04-x32'],
+                         'application': ['mean', 'dokku']}
+        assert [i.public for i in manager.get_images(private=True)] == \
+            [False]
+
+    def test_actions_complete(self):
+        manager = self.manager('fake-actions')
+        droplet = manager.get_droplet(4000001)
+        action = droplet.power_off(return_dict=False)
+        assert action.status == 'in-progress'
+        assert action.wait(update_every_seconds=0.1)
+        droplet.load()
+        assert droplet.status == 'off'
+
+    def test_throttled(self):
+        self.api.throttle_rate = 0.5
+        self.api.retry_after = 0
+        manager = self.manager('fake-throttled')
+        manager.retries = 20
+        assert len(manager.get_all_droplets()) == 450
+        assert manager.get_rate_limit()['limit'] == 5000
+
+    def test_rate_limit(self):
+        self.api.rate_limit = 2
+        self.api.rate_window = 1
+        manager = self.manager('fake-limit')
+        manager.get_all_regions()
+        manager.get_all_sizes()
+        # The budget is spent: the client waits for the window to reset
+        # rather than being throttled.
+        assert len(manager.get_all_sshkeys()) == 1
+        assert self.api.stats()['GET account/keys'] == 1
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+
+class TestInventory:
+
+    def _inventory(self, recording, path=':memory:', routes=()):
+        from pontoon.lib import Inventory
+        manager, sent = recording(routes)
+        return Inventory(manager, path), sent
+
+    def test_sync_and_lookups(self, recording):
+        inventory, sent = self._inventory(recording)
+        assert inventory.sync()['actions'] == 3
+        assert inventory.counts()['records'] == 5
+        del sent[:]
+
+        # Nothing happened since: a single request.
+        assert inventory.sync() == {'actions': 0, 'listed': [],
+                                    'droplets': 0}
+        assert [u for t, u, p in sent] == ['actions/']
+
+        droplet = inventory.droplets(name='example.com')[0]
+        assert droplet.id == 3164444
+        assert droplet.token == 'foo'
+        assert inventory.droplets(ip=droplet.ip_address)[0].id == 3164444
+        assert inventory.droplets(region='nyc3', status='off') == []
+        assert inventory.images(slug='ubuntu-14-04-x64')[0].public
+        assert inventory.keys()[0].name == 'Example Key'
+        assert inventory.floating_ips(region='nyc3')[0].ip == '45.55.96.47'
+
+    def test_changed_droplets_only(self, recording):
+        from pontoon.lib import Droplet
+        inventory, sent = self._inventory(recording, routes=[
+            ('GET', r'droplets/12345/?', None, None, 404)])
+        inventory.sync()
+        inventory.put(Droplet(id=12345, name='gone'))
+        with inventory._db:
+            inventory._set_meta('last_action_id', 39290099)
+            inventory._db.execute("UPDATE actions SET status = "
+                                  "'in-progress' WHERE id = 54321")
+        del sent[:]
+
+        # Action 54321 was in progress, so it is loaded again. Both
+        # actions are on Droplet 12345, the only one fetched, and gone.
+        result = inventory.sync()
+        assert result == {'actions': 1, 'listed': [], 'droplets': 1}
+        assert sorted(u for t, u, p in sent) == [
+            'actions/', 'actions/54321', 'droplets/12345']
+        assert [d.id for d in inventory.droplets()] == [3164444]
+        assert inventory.actions(status='in-progress') == []
+
+    def test_tags_and_expiry(self, tmpdir, recording):
+        path = str(tmpdir.join('inventory-foo.sqlite'))
+        inventory, sent = self._inventory(recording, path)
+        inventory.sync(kinds=('keys',))
+        assert inventory.counts()['droplets'] == 0
+
+        droplet = inventory.manager.get_droplet(12345)
+        droplet.tags = ['web']
+        inventory.put(droplet)
+        inventory.close()
+
+        inventory, sent = self._inventory(recording, path)
+        assert [d.id for d in inventory.droplets(tag='web')] == [12345]
+        assert inventory.droplets(tag='db') == []
+        assert inventory.sync(kinds=('keys', 'droplets'))['listed'] == \
+            ['droplets']
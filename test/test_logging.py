@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+import io
+import json
+from mock import patch
+from pontoon import configure
+
+
+class TestLogging:
+
+    class Counted(object):
+        formatted = 0
+
+        def __repr__(self):
+            TestLogging.Counted.formatted += 1
+            return 'Counted()'
+
+    def test_debug_is_lazy(self, caplog):
+        import logging
+        from pontoon.log import debug
+
+        def show(droplet, name=None):
+            return name
+        show.__module__ = 'pontoon.test'
+        show = debug(show)
+
+        counted = self.Counted()
+        TestLogging.Counted.formatted = 0
+        assert show(counted, name='foo') == 'foo'
+        assert TestLogging.Counted.formatted == 0
+
+        with caplog.at_level(logging.DEBUG, logger='pontoon.test'):
+            show(counted, name='foo')
+        assert caplog.records[-1].getMessage() == \
+            "show: (Counted(),){'name': 'foo'}"
+
+    def test_request_logging_is_lazy(self, mocked_manager):
+        from pontoon.lib.transport import log_request
+        counted = self.Counted()
+        TestLogging.Counted.formatted = 0
+        log_request(mocked_manager, 'GET', 'droplets', 'params', {},
+                    {'Authorization': counted})
+        assert TestLogging.Counted.formatted == 0
+
+    def test_trace(self, mocked_manager):
+        import logging
+        from pontoon.lib.events import default_events
+        from pontoon.log import trace, tracing
+        logger = logging.getLogger('pontoon')
+        level = logger.level
+        stream = io.StringIO() if sys.version_info[0] > 2 else io.BytesIO()
+
+        assert trace(stream=stream)
+        try:
+            mocked_manager.get_all_sizes()
+        finally:
+            trace(False)
+        lines = [json.loads(line) for line in
+                 stream.getvalue().splitlines()]
+        response, = [e for e in lines if e['message'] == 'after_response']
+        assert (response['path'], response['status']) == ('sizes', 200)
+        assert not tracing() and not default_events.listening()
+        assert logger.level == level
+
+    def test_trace_file(self, tmpdir, mocked_manager):
+        from pontoon.log import trace, _trace
+        path = str(tmpdir.join('trace.jsonl'))
+        assert trace(path=path)
+        handler = _trace['handler']
+        try:
+            mocked_manager.get_all_sizes()
+        finally:
+            trace(False)
+        assert handler.stream is None  # closed
+        with open(path) as f:
+            assert 'after_response' in [json.loads(line)['message']
+                                        for line in f]
+
+    def test_logger_once(self):
+        import logging
+        logger = logging.getLogger('pontoon')
+        handlers, level = list(logger.handlers), logger.level
+        try:
+            with patch.object(configure, '_handler', []):
+                configure.logger()
+                configure.logger()
+                assert len(logger.handlers) == len(handlers) + 1
+        finally:
+            logger.handlers[:] = handlers
+            logger.setLevel(level)
+
+    def test_overhead_bench(self, bench_modules):
+        import overhead
+        results = overhead.measure(calls=100)
+        assert sorted(set(name for name, on, us in results)) == \
+            ['@debug call', 'get_data', 'undecorated call']
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+from pontoon import ui
+
+
+class TestPagination:
+
+    def test_pages_in_order(self, droplet_pages):
+        import responses
+        from pontoon.lib import Manager
+        for workers in (1, 4):
+            with responses.RequestsMock() as rsps:
+                droplet_pages(rsps, pages=5)
+                manager = Manager(token='foo', workers=workers)
+                ids = [d.id for d in manager.get_all_droplets()]
+            assert ids == [p * 100 + n for p in range(1, 6) for n in (0, 1)]
+
+    def test_map(self):
+        from pontoon.lib import Manager
+
+        def square(n):
+            return n * n
+
+        for workers in (1, 4):
+            manager = Manager(token='foo', workers=workers)
+            assert manager.map(square, iter(range(8))) == \
+                [n * n for n in range(8)]
+        assert manager.map(square, []) == []
+
+    def test_iter_stops_early(self, droplet_pages):
+        import responses
+        from pontoon.lib import Manager
+        with responses.RequestsMock(assert_all_requests_are_fired=False) \
+                as rsps:
+            droplet_pages(rsps, pages=5)
+            droplets = Manager(token='foo').iter_droplets()
+            ids = [next(droplets).id for _ in range(3)]
+            droplets.close()
+            fetched = len(rsps.calls)
+        assert ids == [100, 101, 200]
+        # the current page and at most one page prefetched ahead
+        assert fetched <= 3
+
+
+class TestRawListings:
+
+    def test_dicts(self, mocked_manager):
+        manager = mocked_manager
+        droplets = manager.get_all_droplets(raw=True)
+        assert isinstance(droplets[0], dict)
+        assert droplets[0]['id'] == manager.get_all_droplets()[0].id
+        assert [i['slug'] for i in manager.iter_images(raw=True)] == \
+            [i.slug for i in manager.get_all_images()]
+        assert [s['slug'] for s in manager.get_global_images(raw=True)] == \
+            [s.slug for s in manager.get_global_images()]
+
+    def test_format_droplet_info(self, mocked_manager):
+        from pontoon.lib import Droplet
+        manager = mocked_manager
+        droplet = manager.get_all_droplets()[0]
+        raw = manager.get_all_droplets(raw=True)[0]
+        raw.update(Droplet.addresses(raw['networks']))
+
+        details = ui.format_droplet_info(raw)
+        assert list(details.items())[:6] == \
+            list(ui.format_droplet_info(droplet).items())[:6]
+        assert details['ip_v6_address'] == droplet.ip_v6_address
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+from mock import MagicMock, patch
+
+
+class TestSessionPool:
+
+    def test_session_reused_per_token(self):
+        from pontoon.lib import SessionPool
+        pool = SessionPool()
+        first = pool.session('foo', 'https://example.com/')
+        assert pool.session('foo', 'https://example.com/') is first
+        assert pool.session('bar', 'https://example.com/') is not first
+        assert len(pool) == 2
+
+    def test_max_sessions(self):
+        from pontoon.lib import SessionPool
+        pool = SessionPool(max_sessions=2)
+        first = pool.session('foo', 'https://example.com/')
+        pool.session('bar', 'https://example.com/')
+        pool.session('baz', 'https://example.com/')
+        assert len(pool) == 2
+        assert pool.session('foo', 'https://example.com/') is not first
+
+    def test_idle_eviction(self):
+        from pontoon.lib import SessionPool
+        pool = SessionPool(idle_timeout=60)
+        first = pool.session('foo', 'https://example.com/')
+        with patch('pontoon.lib.pool.time.time', lambda: 10 ** 10):
+            assert pool.session('foo', 'https://example.com/') is not first
+
+    def test_eviction_spares_sessions_in_use(self):
+        import threading
+        from pontoon.lib import SessionPool
+        pool = SessionPool(max_sessions=1, idle_timeout=60)
+        requesting, release = threading.Event(), threading.Event()
+        results = []
+
+        def new_session():
+            session = MagicMock(name='Session')
+
+            def get(url):
+                requesting.set()
+                release.wait(5)
+                results.append(session.close.called)
+            session.get.side_effect = get
+            return session
+
+        def slow_listing():
+            pool.session('foo', 'https://example.com/').get('droplets/')
+
+        with patch.object(pool, '_new_session', new_session):
+            listing = threading.Thread(target=slow_listing)
+            listing.start()
+            requesting.wait(5)
+            # evicted while its request is still running: over the limit,
+            # then idle for too long
+            first = pool._sessions[('foo', 'https://example.com/')][0]
+            pool.session('bar', 'https://example.com/')
+            with patch('pontoon.lib.pool.time.time', lambda: 10 ** 10):
+                pool.session('baz', 'https://example.com/')
+            release.set()
+            listing.join(5)
+        assert results == [False]
+        assert not first.close.called
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+from pytest import raises
+from mock import patch
+
+
+class TestRateLimit:
+
+    def test_limiter_throttles_on_reserve(self):
+        from pontoon.lib import RateLimiter
+        limiter = RateLimiter(reserve=1)
+        limiter.update({'RateLimit-Limit': '5000',
+                        'RateLimit-Remaining': '2',
+                        'RateLimit-Reset': '1010'})
+        with patch('pontoon.lib.ratelimit.time.time', lambda: 1000), \
+                patch('pontoon.lib.ratelimit.time.sleep') as sleep:
+            assert limiter.acquire() == 0
+            assert limiter.acquire() == 10
+            sleep.assert_called_once_with(10)
+        assert limiter.budget() == {'limit': 5000, 'remaining': 0,
+                                    'reset': 1010}
+
+    def test_retry_after_429(self):
+        import responses
+        from pontoon.lib import Manager, RateLimitError
+        from pontoon.lib.ratelimit import RateLimiters
+        url = Manager.end_point + 'sizes/'
+        headers = {'RateLimit-Limit': '5000', 'RateLimit-Remaining': '0',
+                   'RateLimit-Reset': '0', 'Retry-After': '3'}
+        manager = Manager(token='foo', rate_limiters=RateLimiters())
+        with responses.RequestsMock() as rsps, \
+                patch('pontoon.lib.baseapi.time.sleep') as sleep:
+            rsps.add(responses.GET, url, status=429, headers=headers,
+                     json={'id': 'too_many_requests', 'message': 'slow'})
+            rsps.add(responses.GET, url, json={'sizes': []},
+                     headers=dict(headers, **{'RateLimit-Remaining': '9'}))
+            assert manager.get_all_sizes() == []
+            sleep.assert_called_once_with(3.0)
+        assert manager.get_rate_limit()['remaining'] == 9
+
+        manager.retries = 0
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.GET, url, status=429, headers=headers,
+                     json={'id': 'too_many_requests', 'message': 'slow'})
+            with raises(RateLimitError):
+                manager.get_all_sizes()
+
+    def test_shared_budget(self, tmpdir):
+        from pontoon.lib.ratelimit import RateLimiters, SharedRateLimiter
+        first, second = RateLimiters(), RateLimiters()
+        for limiters in (first, second):
+            assert limiters.share(str(tmpdir))
+        one, other = first.get('foo'), second.get('foo')
+        assert isinstance(one, SharedRateLimiter)
+        one.update({'RateLimit-Limit': '5000',
+                    'RateLimit-Remaining': '100',
+                    'RateLimit-Reset': '9999999999'})
+        other.acquire()
+        one.acquire()
+        assert other.budget()['remaining'] == 98
+        assert second.get('bar').budget()['remaining'] is None
+
+    def test_shared_budget_unavailable(self, tmpdir):
+        from pontoon.lib.ratelimit import SharedRateLimiter
+        blocker = tmpdir.join('file')
+        blocker.write('')
+        limiter = SharedRateLimiter(str(blocker.join('budget.json')))
+        limiter.update({'RateLimit-Limit': '5000',
+                        'RateLimit-Remaining': '100',
+                        'RateLimit-Reset': '9999999999'})
+        limiter.acquire()
+        assert limiter.budget()['remaining'] == 99
+        assert limiter._lock.acquire(False)
+        limiter._lock.release()
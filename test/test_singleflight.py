@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+from pytest import raises
+
+
+class TestSingleFlight:
+
+    def _manager(self, flights):
+        import threading
+        from pontoon.lib import Manager
+        from pontoon.lib.transport import Response
+        sent = []
+        release = threading.Event()
+
+        class Transport(object):
+            def send(self, api, type, url, params, headers=None):
+                sent.append((type, url))
+                release.wait(5)
+                return Response(200, '{"droplet": {"id": 3164444, '
+                                     '"name": "foo"}}')
+
+        manager = Manager(token='foo', transport=Transport(),
+                          flights=flights)
+        return manager, sent, release
+
+    def test_concurrent_gets(self):
+        import time
+        import threading
+        from pontoon.lib.singleflight import SingleFlight
+        flights = SingleFlight()
+        manager, sent, release = self._manager(flights)
+        droplets = []
+
+        def get():
+            droplets.append(manager.get_droplet(3164444))
+        threads = [threading.Thread(target=get) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        deadline = time.time() + 5
+        while flights.stats()['coalesced'] < 4 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(sent) == 1
+        assert flights.stats() == {'sent': 1, 'coalesced': 4,
+                                   'in_flight': 0}
+        assert [d.name for d in droplets] == ['foo'] * 5
+        assert len(set(id(d) for d in droplets)) == 5
+
+    def test_only_gets(self):
+        from pontoon.lib.singleflight import SingleFlight
+        flights = SingleFlight()
+        manager, sent, release = self._manager(flights)
+        release.set()
+        manager.get_droplet(3164444)
+        manager.get_droplet(3164444)
+        manager.get_data('droplets/3164444/actions/', type='POST',
+                         params={'type': 'reboot'})
+        assert len(sent) == 3
+        assert flights.stats()['sent'] == 2
+
+    def test_errors_shared(self):
+        from pontoon.lib.singleflight import SingleFlight
+        flights = SingleFlight()
+        key = ('client', 'droplets/1')
+
+        def fail():
+            raise IOError('offline')
+        with raises(IOError):
+            flights.do(key, fail)
+        assert flights.stats()['in_flight'] == 0
+        assert flights.do(key, lambda: 'ok') == ('ok', False)
+
+    def test_leader_interrupted(self):
+        import time
+        import threading
+        from pontoon.lib.singleflight import SingleFlight, FlightAborted
+        flights = SingleFlight()
+        key = ('client', 'droplets/1')
+        sending, release = threading.Event(), threading.Event()
+        outcome = []
+
+        def interrupted():
+            sending.set()
+            release.wait(5)
+            raise KeyboardInterrupt
+
+        def follow():
+            try:
+                outcome.append(flights.do(key, lambda: 'not sent'))
+            except FlightAborted as e:
+                outcome.append(e)
+
+        leader = threading.Thread(
+            target=lambda: raises(KeyboardInterrupt, flights.do, key,
+                                  interrupted))
+        leader.start()
+        sending.wait(5)
+        follower = threading.Thread(target=follow)
+        follower.start()
+        while not flights.stats()['coalesced']:
+            time.sleep(0.001)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+        assert len(outcome) == 1 and isinstance(outcome[0], FlightAborted)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+# Put lib dir into path so can be tested without installing
+lib_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, lib_dir)
+
+from pytest import raises
+
+
+class TestTransport:
+
+    def test_fixture_routes(self):
+        from pontoon.lib.transport import FixtureTransport, GET, POST
+        transport = FixtureTransport()
+        assert transport.route(GET, 'images/', {'private': 'true'}) == \
+            ('images/private.json', 200)
+        assert transport.route(GET, 'images/', {}) == ('images/all.json', 200)
+        assert transport.route(POST, 'droplets/3164494/actions/',
+                               {'type': 'reboot'}) == \
+            ('droplet_actions/reboot.json', 201)
+        assert transport.route(GET, 'nowhere/', {}) == (None, 404)
+
+    def test_unknown_route(self, mocked_manager):
+        from pontoon.lib import DataReadError
+        with raises(DataReadError):
+            mocked_manager.get_data('nowhere/')
+
+    def test_concurrent_mocked_calls(self, mocked_manager):
+        import threading
+        manager = mocked_manager
+        results, errors = [], []
+
+        def call(private):
+            try:
+                images = manager.get_images(private=private)
+                results.append((private, len(images)))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call, args=(n % 2 == 0,))
+                   for n in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors
+        assert len(set(results)) == 2
+
+    def test_record_and_replay(self, tmpdir):
+        from pontoon.lib import Manager
+        from pontoon.lib.transport import (FixtureTransport,
+                                           RecordingTransport,
+                                           ReplayTransport)
+        path = str(tmpdir.join('session.jsonl'))
+        recorder = RecordingTransport(path, inner=FixtureTransport())
+        recorded = Manager(token='foo', transport=recorder).get_all_sizes()
+
+        replayer = ReplayTransport(path)
+        manager = Manager(token='foo', transport=replayer)
+        replayed = manager.get_all_sizes()
+        assert [s.slug for s in replayed] == [s.slug for s in recorded]
+        assert replayed[0].transport is replayer
+
+
+class TestConcurrency:
+
+    def test_shared_manager(self, mocked_manager):
+        from concurrent.futures import ThreadPoolExecutor
+        manager = mocked_manager
+        params = {'page': 1}
+        calls = {
+            'droplets': lambda: [d.id for d in manager.get_all_droplets()],
+            'private': lambda: [i.id for i in manager.get_images(
+                private=True)],
+            'distro': lambda: [i.id for i in manager.get_distro_images()],
+            'sizes': lambda: [s.slug for s in manager.get_all_sizes()],
+            'raw': lambda: manager.get_data('regions/', params=params),
+            'reboot': lambda: manager.get_droplet(3164494).reboot(
+                return_dict=False).type,
+        }
+        expected = dict((name, call()) for name, call in calls.items())
+        names = sorted(calls) * 50
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda n: calls[n](), names))
+
+        assert results == [expected[n] for n in names]
+        assert params == {'page': 1}